@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Fibonacci implementations and find the fast-doubling crossover.
+
+For each n, every implementation is timed cold (caches cleared, fresh memo
+dict) and the median of several rounds is reported. A warm fibonacci_lru
+lookup is shown for reference but not ranked. The O(n) implementations are
+skipped above their size cap (the memo tables hold every F(k) <= F(n)).
+
+With --many, fibonacci_many is compared against a per-element loop over
+fibonacci() on large random index arrays (plus the NumPy path if installed).
+The loop is timed on a sample and scaled to the full size.
+
+With --mod, fibonacci_mod is timed per query for modular doubling against a
+cached Pisano-period table, and against reducing the exact F(n).
+
+Usage:
+    python bench_fibonacci.py
+    python bench_fibonacci.py --n 100 1000 100000 1000000 --rounds 5
+    python bench_fibonacci.py --many 1000000
+    python bench_fibonacci.py --mod 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+import fibonacci as fibonacci_module
+from fibonacci import (
+    UINT64_MAX_N,
+    fibonacci,
+    fibonacci_fast_doubling,
+    fibonacci_iterative,
+    fibonacci_lru,
+    fibonacci_many,
+    fibonacci_manual_memo,
+    fibonacci_mod,
+    fibonacci_mod_many,
+)
+
+DEFAULT_N = [10, 50, 100, 200, 300, 500, 800, 1_000, 10_000, 100_000, 1_000_000]
+
+def cold_lru(n: int) -> int:
+    fibonacci_lru.cache_clear()
+    return fibonacci_lru(n)
+
+
+def cold_manual_memo(n: int) -> int:
+    return fibonacci_manual_memo(n, {})
+
+
+# name -> (function, largest n to time; None for no cap)
+IMPLEMENTATIONS = {
+    "lru": (cold_lru, 10_000),
+    "manual_memo": (cold_manual_memo, 10_000),
+    "iterative": (fibonacci_iterative, 100_000),
+    "fast_doubling": (fibonacci_fast_doubling, None),
+}
+
+
+def time_call(func, n: int, rounds: int) -> float:
+    """Median seconds per call, repeating tiny calls so the timer resolves them."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func(n)
+        if time.perf_counter() - started > 0.01 or loops >= 100_000:
+            break
+        loops *= 10
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func(n)
+        samples.append((time.perf_counter() - started) / loops)
+    return statistics.median(samples)
+
+
+# The per-element loop is timed on at most this many indices and scaled up
+LOOP_SAMPLE = 20_000
+
+
+def bench_many(size: int) -> None:
+    """Time fibonacci_many against a loop over fibonacci() for `size` random indices."""
+    np = fibonacci_module.np
+    print(f"{'indices':<28}{'loop':>12}{'many':>12}{'ndarray':>12}{'speedup':>10}")
+    for label, upper in ((f"0..{UINT64_MAX_N}", UINT64_MAX_N), ("0..1_000", 1_000), ("0..10_000", 10_000)):
+        indices = [random.randrange(upper + 1) for _ in range(size)]
+
+        sample = indices[:LOOP_SAMPLE]
+        fibonacci_lru.cache_clear()
+        started = time.perf_counter()
+        expected = [fibonacci(n) for n in sample]
+        loop = (time.perf_counter() - started) * len(indices) / len(sample)
+
+        started = time.perf_counter()
+        result = fibonacci_many(indices)
+        many = time.perf_counter() - started
+        assert result[:LOOP_SAMPLE] == expected
+
+        array = f"{'-':>12}"
+        if np is not None:
+            as_array = np.array(indices)
+            started = time.perf_counter()
+            fibonacci_many(as_array)
+            array = f"{time.perf_counter() - started:>11.3f}s"
+
+        print(f"{f'{size:,} in {label}':<28}{loop:>11.3f}s{many:>11.3f}s{array}{loop / many:>9.1f}x")
+
+
+def bench_mod(size: int) -> None:
+    """Time `size` random F(n) mod m queries per modulus: exact, doubling, Pisano table."""
+    print(f"{'modulus':>14}{'exact':>12}{'doubling':>12}{'table':>12}{'many':>12}")
+    for m in (97, 10_007, 100_000, 10**9 + 7):
+        indices = [random.randrange(10**18) for _ in range(size)]
+
+        # Exact F(n) is only feasible for small n; time it on n < 10_000 as a reference
+        small = [n % 10_000 for n in indices[:1_000]]
+        started = time.perf_counter()
+        for n in small:
+            fibonacci_fast_doubling(n) % m
+        exact = (time.perf_counter() - started) / len(small)
+
+        started = time.perf_counter()
+        expected = [fibonacci_mod(n, m) for n in indices]
+        doubling = (time.perf_counter() - started) / size
+
+        started = time.perf_counter()
+        result = [fibonacci_mod(n, m, use_table=True) for n in indices]
+        table = (time.perf_counter() - started) / size
+        assert result == expected
+
+        started = time.perf_counter()
+        assert fibonacci_mod_many([(n, m) for n in indices]) == expected
+        many = (time.perf_counter() - started) / size
+
+        print(f"{m:>14}" + "".join(f"{t * 1e6:>10.2f}us" for t in (exact, doubling, table, many)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=DEFAULT_N, help="indices to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per measurement")
+    parser.add_argument("--many", type=int, metavar="SIZE", help="benchmark fibonacci_many on SIZE random indices")
+    parser.add_argument("--mod", type=int, metavar="SIZE", help="benchmark fibonacci_mod on SIZE random queries")
+    args = parser.parse_args()
+
+    if args.mod:
+        bench_mod(args.mod)
+        return
+    if args.many:
+        bench_many(args.many)
+        return
+
+    names = list(IMPLEMENTATIONS)
+    print(f"{'n':>10}" + "".join(f"{name:>16}" for name in names) + f"{'lru warm':>16}{'fastest':>16}")
+
+    crossover = None
+    for n in args.n:
+        row = {}
+        for name, (func, max_n) in IMPLEMENTATIONS.items():
+            if max_n is not None and n > max_n:
+                continue
+            row[name] = time_call(func, n, args.rounds)
+
+        warm = f"{'-':>16}"
+        if "lru" in row:
+            fibonacci_lru(n)
+            warm = f"{time_call(fibonacci_lru, n, args.rounds) * 1e6:>14.2f}us"
+
+        fastest = min(row, key=row.get)
+        if crossover is None and fastest == "fast_doubling":
+            crossover = n
+        cells = "".join(f"{row[name] * 1e6:>14.2f}us" if name in row else f"{'-':>16}" for name in names)
+        print(f"{n:>10}{cells}{warm}{fastest:>16}")
+
+    print(f"\nfast doubling is fastest from n = {crossover}" if crossover else "\nno crossover in the tested range")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark fibonacci_parallel scaling across worker counts.
+
+For each n, fast doubling (one core, three products per step) is the
+baseline. fibonacci_parallel is then timed with 1, 2, 4 and 8 workers using
+one pre-started ProcessPoolExecutor per worker count, so pool start-up is
+not included. With 1 worker the Lucas steps run in-process. Speedups are
+relative to fast doubling.
+
+Scaling can only be observed up to os.cpu_count(); on a machine with fewer
+cores the extra workers time-slice and add pickling overhead.
+
+Usage:
+    python bench_fibonacci_parallel.py
+    python bench_fibonacci_parallel.py --n 10000000 50000000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fibonacci import fibonacci_fast_doubling
+from fibonacci_parallel import PARALLEL_THRESHOLD, fibonacci_parallel
+
+DEFAULT_N = [1_000_000, 10_000_000, 30_000_000]
+DEFAULT_WORKERS = [1, 2, 4, 8]
+
+
+def median_seconds(func, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=DEFAULT_N, help="indices to benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS, help="worker counts")
+    parser.add_argument("--threshold", type=int, default=PARALLEL_THRESHOLD, help="parallel threshold")
+    parser.add_argument("--rounds", type=int, default=3, help="timed rounds per measurement")
+    args = parser.parse_args()
+
+    print(f"cpu_count={os.cpu_count()} threshold={args.threshold:,}\n")
+    print(f"{'n':>12}{'doubling':>12}" + "".join(f"{f'{w} workers':>20}" for w in args.workers))
+
+    pools = {w: ProcessPoolExecutor(max_workers=w) for w in args.workers if w > 1}
+    try:
+        for n in args.n:
+            expected = fibonacci_fast_doubling(n)
+            baseline = median_seconds(lambda: fibonacci_fast_doubling(n), args.rounds)
+            cells = []
+            for workers in args.workers:
+                pool = pools.get(workers)
+                assert fibonacci_parallel(n, workers, args.threshold, pool) == expected
+                seconds = median_seconds(lambda: fibonacci_parallel(n, workers, args.threshold, pool), args.rounds)
+                cells.append(f"{seconds:>11.3f}s ({baseline / seconds:>4.2f}x)")
+            print(f"{n:>12}{baseline:>11.3f}s" + "".join(cells))
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark warm-start latency of a freshly forked worker with the shared cache.
+
+The parent fills a SharedFibonacciCache file and then forks one worker per
+measurement, the way a pre-fork server starts its workers. Each worker
+clears the inherited fibonacci_lru state and times its first query for F(n):
+
+- compute:  fibonacci(n) in the new worker, as every worker does today
+- shared:   open the cache file and read F(n) from the mapping
+
+The median over several forked workers is reported.
+
+Usage:
+    python bench_fibonacci_shared.py
+    python bench_fibonacci_shared.py --n 10000 1000000 10000000 --rounds 7
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from fibonacci import fibonacci, fibonacci_lru
+from fibonacci_shared import SharedFibonacciCache
+
+DEFAULT_N = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def first_query(path: str, n: int, mode: str, queue) -> None:
+    """Worker body: time the first F(n) lookup after fork."""
+    fibonacci_lru.cache_clear()
+    started = time.perf_counter()
+    if mode == "compute":
+        fibonacci(n)
+    else:
+        with SharedFibonacciCache(path) as cache:
+            assert cache.get(n) is not None
+    queue.put(time.perf_counter() - started)
+
+
+def fork_and_time(context, path: str, n: int, mode: str, rounds: int) -> float:
+    """Median first-query seconds over `rounds` forked workers."""
+    samples = []
+    for _ in range(rounds):
+        queue = context.Queue()
+        worker = context.Process(target=first_query, args=(path, n, mode, queue))
+        worker.start()
+        samples.append(queue.get())
+        worker.join()
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=DEFAULT_N, help="indices to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="forked workers per measurement")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fib.cache")
+        with SharedFibonacciCache(path, max_bytes=256 * 1024 * 1024) as cache:
+            started = time.perf_counter()
+            for n in args.n:
+                cache(n)
+            print(f"filled {cache.stats().entries} entries ({cache.stats().bytes:,} bytes) "
+                  f"in {time.perf_counter() - started:.3f}s\n")
+
+        print(f"{'n':>12}{'bytes':>14}{'compute':>14}{'shared':>14}{'speedup':>10}")
+        for n in args.n:
+            compute = fork_and_time(context, path, n, "compute", args.rounds)
+            shared = fork_and_time(context, path, n, "shared", args.rounds)
+            size = (fibonacci(n).bit_length() + 7) // 8
+            print(f"{n:>12}{size:>14,}{compute * 1e3:>12.3f}ms{shared * 1e3:>12.3f}ms{compute / shared:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
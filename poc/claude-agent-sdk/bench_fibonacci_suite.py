@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark suite for the Fibonacci implementations.
+
+Every implementation is timed at small, medium and huge n, cold (caches
+cleared before each call) and warm (cache already holding the answer) where
+that distinction exists. Implementations whose memo tables hold every F(k)
+up to n are capped below the huge size.
+
+Timing uses perf_counter_ns. Each case is calibrated so that one round takes
+at least --min-round-ms, run for --warmup untimed rounds, then for --rounds
+timed rounds; the median ns per call is the headline number. For cold cases
+the cache is reset outside the timed region before every call, so each call
+is timed on its own and includes the timer overhead (tens of ns).
+
+Results are written as JSON and can be compared against a saved baseline.
+A case regresses when its median exceeds the baseline median by more than
+--threshold (a fraction, default 0.10); the process then exits with status 1.
+
+Usage:
+    python bench_fibonacci_suite.py --save baseline.json
+    python bench_fibonacci_suite.py --compare baseline.json --threshold 0.15
+    python bench_fibonacci_suite.py --filter lru --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional
+
+from fibonacci import (
+    fibonacci,
+    fibonacci_fast_doubling,
+    fibonacci_iterative,
+    fibonacci_lru,
+    fibonacci_manual_memo,
+    fibonacci_many,
+    fibonacci_mod,
+    fibonacci_range,
+)
+from fibonacci_cache import FibonacciCache
+from fibonacci_parallel import fibonacci_parallel
+from fibonacci_shared import SharedFibonacciCache
+from fibonacci_snapshot import FibonacciSnapshot, write_snapshot
+
+FORMAT = "fibonacci-bench"
+VERSION = 1
+
+SIZES = {"small": 20, "medium": 1_000, "huge": 1_000_000}
+
+# Largest size each O(n)-memory or O(n^2)-time implementation is run at
+MEDIUM_ONLY = SIZES["medium"]
+
+# reset runs untimed before every call (cold cases); prime runs once before timing (warm cases)
+Case = namedtuple("Case", ["name", "func", "reset", "prime"], defaults=(None, None))
+
+
+def build_cases(directory: str) -> List[Case]:
+    """All benchmark cases, named <implementation>/<cold|warm>/<size>; files go in directory."""
+    cases = []
+    memo: Dict[int, int] = {}
+    lru_cache = FibonacciCache(policy="lru")
+    checkpoint_cache = FibonacciCache(policy="checkpoint")
+    shared = SharedFibonacciCache(os.path.join(directory, "fib.cache"), max_bytes=16 * 1024 * 1024)
+    snapshot = FibonacciSnapshot(write_snapshot(os.path.join(directory, "fib.snapshot"), max_n=SIZES["huge"]))
+
+    for size, n in SIZES.items():
+        def at(func: Callable[[int], object], n: int = n) -> Callable[[], object]:
+            return lambda: func(n)
+
+        if n <= MEDIUM_ONLY:
+            cases += [
+                Case(f"manual_memo/cold/{size}", at(fibonacci_manual_memo)),
+                Case(f"manual_memo/warm/{size}", lambda n=n: fibonacci_manual_memo(n, memo),
+                     prime=lambda n=n: fibonacci_manual_memo(n, memo)),
+                Case(f"lru/cold/{size}", at(fibonacci_lru), reset=fibonacci_lru.cache_clear),
+                Case(f"lru/warm/{size}", at(fibonacci_lru), prime=at(fibonacci_lru)),
+                Case(f"iterative/{size}", at(fibonacci_iterative)),
+            ]
+        cases += [
+            Case(f"fast_doubling/{size}", at(fibonacci_fast_doubling)),
+            Case(f"fibonacci/cold/{size}", at(fibonacci), reset=fibonacci_lru.cache_clear),
+            Case(f"fibonacci_cache_lru/cold/{size}", at(lru_cache), reset=lru_cache.cache_clear),
+            Case(f"fibonacci_cache_lru/warm/{size}", at(lru_cache), prime=at(lru_cache)),
+            Case(f"fibonacci_cache_checkpoint/cold/{size}", at(checkpoint_cache),
+                 reset=checkpoint_cache.cache_clear),
+            Case(f"fibonacci_cache_checkpoint/warm/{size}", at(checkpoint_cache), prime=at(checkpoint_cache)),
+            Case(f"shared/warm/{size}", at(shared.get), prime=at(shared)),
+            Case(f"snapshot/{size}", at(snapshot.get)),
+            Case(f"parallel_1_worker/{size}", lambda n=n: fibonacci_parallel(n, workers=1),
+                 reset=fibonacci_lru.cache_clear),
+            Case(f"mod_doubling/{size}", lambda n=n: fibonacci_mod(n, 10**9 + 7)),
+            Case(f"mod_table/warm/{size}", lambda n=n: fibonacci_mod(n, 10_007, use_table=True),
+                 prime=lambda n=n: fibonacci_mod(n, 10_007, use_table=True)),
+        ]
+
+    batch = list(range(0, 10_000, 7))
+    cases += [
+        Case("many/1429_indices_below_10000", lambda: fibonacci_many(batch)),
+        Case("range/0_to_10000", lambda: sum(1 for _ in fibonacci_range(0, 10_000))),
+        # Furthest possible from a checkpoint: the slowest snapshot lookup
+        Case("snapshot/worst_offset/huge", lambda: snapshot.get(SIZES["huge"] - 1)),
+    ]
+    return cases
+
+
+def measure(case: Case, rounds: int, warmup: int, min_round_ns: int) -> Dict[str, float]:
+    """Time one case; returns per-call statistics in nanoseconds."""
+    if case.prime is not None:
+        case.prime()
+
+    def run(loops: int) -> int:
+        if case.reset is None:
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                case.func()
+            return time.perf_counter_ns() - started
+        elapsed = 0
+        for _ in range(loops):
+            case.reset()
+            started = time.perf_counter_ns()
+            case.func()
+            elapsed += time.perf_counter_ns() - started
+        return elapsed
+
+    loops = 1
+    while run(loops) < min_round_ns and loops < 1_000_000:
+        loops *= 10
+    for _ in range(warmup):
+        run(loops)
+    samples = [run(loops) / loops for _ in range(rounds)]
+    return {
+        "median_ns": statistics.median(samples),
+        "min_ns": min(samples),
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "rounds": rounds,
+        "loops": loops,
+    }
+
+
+def run_suite(rounds: int, warmup: int, min_round_ns: int, name_filter: Optional[str] = None) -> Dict:
+    """Run every (matching) case and return the JSON-ready report."""
+    with tempfile.TemporaryDirectory() as directory:
+        cases = build_cases(directory)
+        results = {}
+        for case in cases:
+            if name_filter and name_filter not in case.name:
+                continue
+            results[case.name] = measure(case, rounds, warmup, min_round_ns)
+            print(f"{case.name:<44}{format_ns(results[case.name]['median_ns']):>14}", file=sys.stderr)
+    fibonacci_lru.cache_clear()
+    return {
+        "format": FORMAT,
+        "version": VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare median times case by case.
+
+    Returns one row per case in current with its ratio to the baseline and a
+    status of "ok", "regression", "improvement" or "new".
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            rows.append({"name": name, "baseline_ns": None, "current_ns": result["median_ns"],
+                         "ratio": None, "status": "new"})
+            continue
+        ratio = result["median_ns"] / before["median_ns"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline_ns": before["median_ns"], "current_ns": result["median_ns"],
+                     "ratio": ratio, "status": status})
+    return rows
+
+
+def load_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a {FORMAT} report")
+    if report.get("version") != VERSION:
+        raise ValueError(f"unsupported report version: {report.get('version')}")
+    return report
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f}{unit}"
+    return f"{ns:.0f}ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=7, help="timed rounds per case")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed warmup rounds per case")
+    parser.add_argument("--min-round-ms", type=float, default=5.0, help="minimum duration of one round")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--save", metavar="BASELINE", help="write the JSON report as a new baseline")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    baseline = load_report(args.compare) if args.compare else None
+    report = run_suite(args.rounds, args.warmup, int(args.min_round_ms * 1e6), args.filter)
+    for path in filter(None, (args.output, args.save)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        return
+
+    rows = compare(report, baseline, args.threshold)
+    print(f"\n{'case':<44}{'baseline':>12}{'current':>12}{'ratio':>8}  status")
+    for row in rows:
+        before = format_ns(row["baseline_ns"]) if row["baseline_ns"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        print(f"{row['name']:<44}{before:>12}{format_ns(row['current_ns']):>12}{ratio:>8}  {row['status']}")
+
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
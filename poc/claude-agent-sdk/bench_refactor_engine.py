@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark batched refactoring: backends, pool sizes and response size.
+
+Writes --files synthetic modules (see bench_review_engine.py) to a temporary
+directory and applies print-to-logging plus a rename of an imported module to
+all of them with refactor_files(), once per backend and pool size. Also
+compares the size of the unified diffs returned with echoing every
+refactored file in full, as the old refactor_code tool did.
+
+Usage:
+    python bench_refactor_engine.py
+    python bench_refactor_engine.py --files 400 --workers 1 2 4
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import refactor_engine
+from bench_review_engine import generate_module
+from refactor_engine import PrintToLogging, RenameName, refactor_files
+
+TRANSFORMS = (PrintToLogging(), RenameName("sys", "system"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100, help="number of modules")
+    parser.add_argument("--lines", type=int, default=500, help="approximate lines per module")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="pool sizes to try")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    backends = [b for b in refactor_engine.BACKENDS if b != "libcst" or refactor_engine.cst is not None]
+    with tempfile.TemporaryDirectory() as root:
+        paths = []
+        total_lines = 0
+        for index in range(args.files):
+            code = generate_module(index, args.lines, rng)
+            total_lines += code.count("\n")
+            paths.append(os.path.join(root, f"module_{index}.py"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.write(code)
+        print(f"{args.files} files, {total_lines:,} lines, cpu_count={os.cpu_count()}\n")
+
+        for backend in backends:
+            for workers in args.workers:
+                started = time.perf_counter()
+                results = refactor_files(paths, TRANSFORMS, workers=workers, backend=backend)
+                elapsed = time.perf_counter() - started
+                edits = sum(sum(result.changes.values()) for result in results)
+                print(f"{backend:<9}{workers:>3} workers{elapsed:>9.2f}s{total_lines / elapsed:>12,.0f} lines/s"
+                      f"{edits:>9,} edits")
+
+        diff_bytes = sum(len(result.diff.encode()) for result in results)
+        full_bytes = sum(os.path.getsize(path) for path, result in zip(paths, results) if result.diff)
+        print(f"\nresponse size: diffs {diff_bytes:,} bytes vs full files {full_bytes:,} bytes "
+              f"({full_bytes / max(diff_bytes, 1):.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark repository-wide review with different process-pool sizes.
+
+Writes --files synthetic modules (see bench_review_engine.py) to a temporary
+directory and reviews the whole tree with review_repository() in-process and
+on pools of --workers processes. Every run starts with cold engines, since
+each run gets fresh worker processes (the in-process run a fresh engine).
+
+Usage:
+    python bench_repo_review.py
+    python bench_repo_review.py --files 400 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+from bench_review_engine import generate_module
+from repo_review import review_repository
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="number of modules")
+    parser.add_argument("--lines", type=int, default=500, help="approximate lines per module")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="pool sizes to try")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        total_lines = 0
+        for index in range(args.files):
+            code = generate_module(index, args.lines, rng)
+            total_lines += code.count("\n")
+            with open(os.path.join(root, f"module_{index}.py"), "w", encoding="utf-8") as f:
+                f.write(code)
+        print(f"{args.files} files, {total_lines:,} lines, cpu_count={os.cpu_count()}\n")
+
+        baseline = None
+        for workers in args.workers:
+            report = review_repository(root, workers=workers)
+            baseline = baseline or report.elapsed
+            findings = sum(len(review.findings) for review in report.files)
+            print(f"{workers:>3} workers{report.elapsed:>9.2f}s{total_lines / report.elapsed:>12,.0f} lines/s"
+                  f"{baseline / report.elapsed:>7.2f}x{findings:>9,} findings")
+
+
+if __name__ == "__main__":
+    main()
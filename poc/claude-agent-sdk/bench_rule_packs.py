@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark rule-pack matching as the number of rules grows.
+
+Builds packs of --counts rules (by default 10, 100 and 1000; --regex-share of
+them regexes, the rest literals, modelled on banned-API and secret lists)
+and scans the synthetic repository from bench_review_engine.py (50k lines by
+default) two ways:
+
+- per-rule:  each rule compiled on its own and run over the text in turn
+- compiled:  compile_rules(), one combined pattern and one pass
+
+Usage:
+    python bench_rule_packs.py
+    python bench_rule_packs.py --counts 10 50 200 1000 --regex-share 0.5
+"""
+
+import argparse
+import random
+import re
+import time
+
+from bench_review_engine import generate_module
+from rule_packs import compile_rules, load_pack
+
+
+def build_pack(count: int, regex_share: float, rng: random.Random):
+    rules = []
+    for i in range(count):
+        if rng.random() < regex_share:
+            rules.append({"id": f"key-{i}", "kind": "regex", "message": "hard-coded key",
+                          "pattern": rf"\b(api|auth)_key_{i}\s*=\s*[\"'][^\"']+[\"']"})
+        else:
+            rules.append({"id": f"banned-{i}", "message": "banned API", "pattern": f"legacy_client_{i}.call("})
+    # One rule that fires on the generated code, so both paths report something
+    rules.append({"id": "bare-except", "message": "bare except", "pattern": "except:"})
+    return load_pack({"name": f"bench-{count}", "rules": rules})
+
+
+def per_rule_scan(rules, text: str) -> int:
+    found = 0
+    for rule in rules:
+        pattern = rule.pattern if rule.kind == "regex" else re.escape(rule.pattern)
+        found += sum(1 for _ in re.finditer(pattern, text, re.IGNORECASE if rule.ignore_case else 0))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 1000], help="rule counts to try")
+    parser.add_argument("--regex-share", type=float, default=0.2, help="fraction of rules that are regexes")
+    parser.add_argument("--files", type=int, default=100, help="number of modules")
+    parser.add_argument("--lines", type=int, default=500, help="approximate lines per module")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    text = "".join(generate_module(index, args.lines, rng) for index in range(args.files))
+    lines = text.split("\n")
+    print(f"{len(lines):,} lines, {args.regex_share:.0%} regex rules\n")
+    print(f"{'rules':>6}{'compile':>12}{'per-rule':>12}{'compiled':>12}{'speedup':>9}{'findings':>10}")
+
+    for count in args.counts:
+        pack = build_pack(count, args.regex_share, rng)
+
+        started = time.perf_counter()
+        matcher = compile_rules(pack.rules)
+        compiled_in = time.perf_counter() - started
+
+        started = time.perf_counter()
+        per_rule_scan(pack.rules, text)
+        naive = time.perf_counter() - started
+
+        started = time.perf_counter()
+        findings = sum(1 for _ in matcher.scan(lines))
+        single = time.perf_counter() - started
+
+        print(f"{len(pack.rules):>6}{compiled_in * 1e3:>10.1f}ms{naive * 1e3:>10.1f}ms{single * 1e3:>10.1f}ms"
+              f"{naive / single:>8.1f}x{findings:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark memoized tool calls: first call, repeat call, new session.
+
+Wraps code_review- and refactor_code-style handlers with ToolCache.memoize()
+and calls each with one synthetic module of --lines lines (see
+bench_review_engine.py):
+
+- first:    cache miss, the tool runs (with a fresh ReviewEngine)
+- repeat:   same arguments again, served from memory
+- session:  a new ToolCache on the same directory, served from disk
+
+Usage:
+    python bench_tool_cache.py
+    python bench_tool_cache.py --lines 5000
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+
+from bench_review_engine import generate_module
+from refactor_engine import PrintToLogging, refactor_source
+from review_engine import ReviewEngine, format_review
+from tool_cache import ToolCache
+
+
+def handlers(cache: ToolCache):
+    engine = ReviewEngine()
+
+    @cache.memoize(version="bench")
+    async def code_review(args):
+        return {"content": [{"type": "text", "text": format_review(engine.review(args["code"]))}]}
+
+    @cache.memoize(version="bench")
+    async def refactor_code(args):
+        return {"content": [{"type": "text", "text": refactor_source(args["code"], [PrintToLogging()]).diff}]}
+
+    return code_review, refactor_code
+
+
+def timed(handler, args) -> float:
+    started = time.perf_counter()
+    asyncio.run(handler(args))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2000, help="lines in the reviewed module")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    code = generate_module(0, args.lines, random.Random(args.seed))
+    print(f"{code.count(chr(10)):,} lines\n")
+    print(f"{'tool':<16}{'first':>12}{'repeat':>12}{'session':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        first_session = handlers(ToolCache(path=directory))
+        second_session = handlers(ToolCache(path=directory))
+        for index, name in enumerate(("code_review", "refactor_code")):
+            tool_args = {"code": code, "language": "python"}
+            first = timed(first_session[index], tool_args)
+            repeat = timed(first_session[index], tool_args)
+            session = timed(second_session[index], tool_args)
+            print(f"{name:<16}{first * 1e3:>10.1f}ms{repeat * 1e3:>10.2f}ms{session * 1e3:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,22 @@
 Fibonacci sequence implementation with memoization.
 
 This module provides an efficient implementation of the Fibonacci sequence
-using memoization to avoid redundant calculations.
+using memoization to avoid redundant calculations, plus an O(log n)
+fast-doubling implementation for very large n.
 """
 
+import os
+import threading
+import warnings
+from array import array
+from collections import namedtuple
 from functools import lru_cache
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List, MutableSequence, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fibonacci_many falls back to lists
+    np = None
 
 
 def fibonacci_manual_memo(n: int, memo: Dict[int, int] = None) -> int:
@@ -14,7 +25,9 @@ def fibonacci_manual_memo(n: int, memo: Dict[int, int] = None) -> int:
     Calculate the nth Fibonacci number using manual memoization.
 
     This implementation uses a dictionary to cache previously calculated
-    Fibonacci numbers, avoiding redundant recursive calls.
+    Fibonacci numbers. Missing entries are filled bottom-up from the
+    highest known pair below n, so it never recurses and works for any n.
+    Without a memo nothing could reuse the entries, so none are stored.
 
     Args:
         n: The position in the Fibonacci sequence (0-indexed).
@@ -37,29 +50,111 @@ def fibonacci_manual_memo(n: int, memo: Dict[int, int] = None) -> int:
     if n < 0:
         raise ValueError("n must be a non-negative integer")
 
-    if memo is None:
-        memo = {}
-
     # Base cases
     if n in (0, 1):
         return n
 
+    if memo is None:
+        prev, curr = 0, 1
+        for _ in range(n - 1):
+            prev, curr = curr, prev + curr
+        return curr
+
     # Check if already computed
     if n in memo:
         return memo[n]
 
-    # Compute and store in memo
-    memo[n] = fibonacci_manual_memo(n - 1, memo) + fibonacci_manual_memo(n - 2, memo)
-    return memo[n]
+    # Find the highest k below n with F(k-1) and F(k) both known
+    k = n - 1
+    while not ((k < 2 or k in memo) and (k < 3 or k - 1 in memo)):
+        k -= 1
+    prev = k - 1 if k < 3 else memo[k - 1]
+    curr = k if k < 2 else memo[k]
+
+    # Fill the memo bottom-up from k + 1 to n
+    for i in range(k + 1, n + 1):
+        prev, curr = curr, prev + curr
+        memo[i] = curr
+    return curr
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# Entries kept by fibonacci_lru's table: F(0)..F(9999) take about 4 MB
+LRU_MAXSIZE = 10_000
+
+
+class _BottomUpCache:
+    """
+    Memo table F(0..k) kept in a list and extended bottom-up on demand.
+
+    Exposes the same cache_info()/cache_clear() API as functools.lru_cache.
+    A hit is a call answered from the table; each newly computed entry
+    counts as a miss, as it would for the recursive lru_cache version.
+    The table stops growing at maxsize entries; larger n are computed on
+    from its last pair without being stored, and count as one miss.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        if maxsize is not None and maxsize < 2:
+            raise ValueError("maxsize must be at least 2")
+        self.maxsize = maxsize
+        self._table: List[int] = []
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, n: int) -> int:
+        if n < 0:
+            raise ValueError("n must be a non-negative integer")
+
+        table = self._table
+        if n < len(table):
+            self._hits += 1
+            return table[n]
+
+        with self._lock:
+            # Another thread may have extended the table meanwhile
+            if not table:
+                table.extend((0, 1))
+                self._misses += 2
+            prev, curr = table[-2], table[-1]
+            stop = n + 1 if self.maxsize is None else min(n + 1, self.maxsize)
+            for _ in range(len(table), stop):
+                prev, curr = curr, prev + curr
+                table.append(curr)
+                self._misses += 1
+            if n < len(table):
+                return table[n]
+            self._misses += 1
+
+        prev, curr = table[-2], table[-1]
+        for _ in range(len(table), n + 1):
+            prev, curr = curr, prev + curr
+        return curr
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self._hits, self._misses, self.maxsize, len(self._table))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._table = []
+            self._hits = 0
+            self._misses = 0
+
+
+_lru_table = _BottomUpCache(LRU_MAXSIZE)
 
 
-@lru_cache(maxsize=None)
 def fibonacci_lru(n: int) -> int:
     """
-    Calculate the nth Fibonacci number using functools.lru_cache.
+    Calculate the nth Fibonacci number using a memoized table.
 
-    This implementation uses Python's built-in LRU cache decorator for
-    automatic memoization. This is the most Pythonic approach.
+    Results are cached with the same cache_info()/cache_clear() API as
+    functools.lru_cache, but the cache is a list filled bottom-up, so cold
+    calls never recurse and large n is safe. The list keeps F(0) to
+    F(LRU_MAXSIZE - 1); fibonacci_cache.FibonacciCache offers a cache with
+    a byte budget for long-running processes.
 
     Args:
         n: The position in the Fibonacci sequence (0-indexed).
@@ -78,15 +173,11 @@ def fibonacci_lru(n: int) -> int:
         >>> fibonacci_lru(10)
         55
     """
-    if n < 0:
-        raise ValueError("n must be a non-negative integer")
+    return _lru_table(n)
 
-    # Base cases
-    if n in (0, 1):
-        return n
 
-    # Recursive case with automatic memoization
-    return fibonacci_lru(n - 1) + fibonacci_lru(n - 2)
+fibonacci_lru.cache_info = _lru_table.cache_info
+fibonacci_lru.cache_clear = _lru_table.cache_clear
 
 
 def fibonacci_iterative(n: int) -> int:
@@ -129,8 +220,491 @@ def fibonacci_iterative(n: int) -> int:
     return curr
 
 
-# Alias the recommended implementation
-fibonacci = fibonacci_lru
+def fibonacci_pair(n: int) -> Tuple[int, int]:
+    """
+    Calculate the pair (F(n), F(n+1)) using the fast-doubling method.
+
+    Walks the bits of n from the most significant end, applying
+    F(2k) = F(k) * (2*F(k+1) - F(k)) and F(2k+1) = F(k)^2 + F(k+1)^2.
+    The pair is the state needed to continue the sequence from n.
+
+    Args:
+        n: The position in the Fibonacci sequence (0-indexed).
+
+    Returns:
+        The tuple (F(n), F(n+1)).
+
+    Raises:
+        ValueError: If n is negative.
+
+    Examples:
+        >>> fibonacci_pair(10)
+        (55, 89)
+    """
+    if n < 0:
+        raise ValueError("n must be a non-negative integer")
+
+    # (a, b) = (F(k), F(k+1)), starting from k = 0
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+
+    return a, b
+
+
+def fibonacci_fast_doubling(n: int) -> int:
+    """
+    Calculate the nth Fibonacci number using the fast-doubling method.
+
+    This needs O(log n) big-integer multiplications (see fibonacci_pair)
+    and never recurses, so it handles n in the millions.
+
+    Args:
+        n: The position in the Fibonacci sequence (0-indexed).
+
+    Returns:
+        The nth Fibonacci number.
+
+    Raises:
+        ValueError: If n is negative.
+
+    Examples:
+        >>> fibonacci_fast_doubling(0)
+        0
+        >>> fibonacci_fast_doubling(10)
+        55
+        >>> fibonacci_fast_doubling(100)
+        354224848179261915075
+    """
+    return fibonacci_pair(n)[0]
+
+
+# Cold, fast doubling overtakes every other implementation at about n = 50
+# (see bench_fibonacci.py). Below the threshold fibonacci_lru is kept so
+# repeated small queries stay cache hits and its table stays small.
+FAST_DOUBLING_THRESHOLD = 64
+
+# Environment variable naming a snapshot file (see fibonacci_snapshot.py)
+SNAPSHOT_ENV = "FIBONACCI_SNAPSHOT"
+
+# The snapshot in use, if any; None with _snapshot_loaded=False means not yet looked up
+_snapshot = None
+_snapshot_loaded = False
+# Serializes swapping the snapshot, so the first calls from several threads open it once
+_snapshot_lock = threading.RLock()
+
+
+def load_snapshot(path: Optional[str] = None):
+    """
+    Make fibonacci() answer from a precomputed snapshot file.
+
+    Without a path, the file named by the FIBONACCI_SNAPSHOT environment
+    variable is used; fibonacci() does this itself on its first call. An
+    explicit path that cannot be opened raises; a bad environment variable
+    only warns, and fibonacci() then computes as usual.
+
+    The snapshot it replaces is not closed, since other threads may still be
+    reading it; its file is unmapped once nothing refers to it.
+
+    Args:
+        path: Snapshot written by fibonacci_snapshot.py.
+
+    Returns:
+        The FibonacciSnapshot in use, or None.
+    """
+    global _snapshot, _snapshot_loaded
+    from fibonacci_snapshot import FibonacciSnapshot
+
+    snapshot = None
+    if path is not None:
+        snapshot = FibonacciSnapshot(path)
+    elif os.environ.get(SNAPSHOT_ENV):
+        try:
+            snapshot = FibonacciSnapshot(os.environ[SNAPSHOT_ENV])
+        except (OSError, ValueError) as e:
+            warnings.warn(f"ignoring {SNAPSHOT_ENV}: {e}", RuntimeWarning, stacklevel=2)
+    with _snapshot_lock:
+        _snapshot, _snapshot_loaded = snapshot, True
+    return snapshot
+
+
+def unload_snapshot() -> None:
+    """Stop using the snapshot; the environment variable is not consulted again."""
+    global _snapshot, _snapshot_loaded
+    with _snapshot_lock:
+        _snapshot, _snapshot_loaded = None, True
+
+
+def _default_snapshot():
+    """The snapshot named by the environment, looked up on the first call only."""
+    with _snapshot_lock:
+        if not _snapshot_loaded:
+            load_snapshot()
+        return _snapshot
+
+
+def fibonacci(n: int) -> int:
+    """
+    Calculate the nth Fibonacci number with the recommended implementation.
+
+    Small n is served by fibonacci_lru, so repeated queries are cache hits.
+    From FAST_DOUBLING_THRESHOLD upwards a snapshot is consulted first if
+    one is loaded (see load_snapshot), then fibonacci_fast_doubling is used,
+    which needs no cache and no recursion.
+
+    Args:
+        n: The position in the Fibonacci sequence (0-indexed).
+
+    Returns:
+        The nth Fibonacci number.
+
+    Raises:
+        ValueError: If n is negative.
+
+    Examples:
+        >>> fibonacci(10)
+        55
+        >>> fibonacci(1000) == fibonacci_iterative(1000)
+        True
+    """
+    if n >= FAST_DOUBLING_THRESHOLD:
+        snapshot = _snapshot if _snapshot_loaded else _default_snapshot()
+        if snapshot is not None:
+            value = snapshot.get(n)
+            if value is not None:
+                return value
+        return fibonacci_fast_doubling(n)
+    return fibonacci_lru(n)
+
+
+# Largest n with F(n) < 2**64, the limit of the NumPy uint64 fast path
+UINT64_MAX_N = 93
+
+# fibonacci_many walks forward by additions across gaps up to this size and
+# jumps with fast doubling across larger ones (about the crossover point)
+SWEEP_MAX_GAP = 64
+
+_uint64_table = None
+
+
+def fibonacci_many(indices: Iterable[int]):
+    """
+    Calculate F(n) for many indices in one call.
+
+    The indices are deduplicated and sorted, then visited in a single
+    forward sweep: short gaps are crossed by repeated addition, long gaps
+    by a fast-doubling jump. Each distinct F(n) is computed once.
+
+    If NumPy is installed and indices is an integer ndarray, an ndarray of
+    the same shape is returned: dtype uint64 (a table lookup) when every
+    index is at most UINT64_MAX_N, dtype object otherwise.
+
+    Args:
+        indices: Positions in the Fibonacci sequence (0-indexed).
+
+    Returns:
+        A list with F(n) for each index, in input order (or an ndarray, see above).
+
+    Raises:
+        ValueError: If any index is negative.
+
+    Examples:
+        >>> fibonacci_many([10, 0, 10, 100])
+        [55, 0, 55, 354224848179261915075]
+    """
+    if np is not None and isinstance(indices, np.ndarray):
+        return _fibonacci_many_ndarray(indices)
+
+    indices = list(indices)
+    values = _sweep(sorted(set(indices)))
+    return [values[n] for n in indices]
+
+
+def _sweep(unique: List[int]) -> Dict[int, int]:
+    """Map each index in the sorted, deduplicated list to F(n)."""
+    if unique and unique[0] < 0:
+        raise ValueError("n must be a non-negative integer")
+
+    values = {}
+    # (a, b) = (F(k), F(k+1))
+    k, a, b = 0, 0, 1
+    for n in unique:
+        gap = n - k
+        if gap > SWEEP_MAX_GAP:
+            a, b = fibonacci_pair(n)
+        else:
+            for _ in range(gap):
+                a, b = b, a + b
+        k = n
+        values[n] = a
+    return values
+
+
+def _fibonacci_many_ndarray(indices):
+    if not np.issubdtype(indices.dtype, np.integer):
+        raise TypeError("indices must be an integer array")
+    if indices.size == 0:
+        return np.empty(indices.shape, dtype=np.uint64)
+    if indices.min() < 0:
+        raise ValueError("n must be a non-negative integer")
+
+    if indices.max() <= UINT64_MAX_N:
+        global _uint64_table
+        if _uint64_table is None:
+            _uint64_table = np.array(fibonacci_many(range(UINT64_MAX_N + 1)), dtype=np.uint64)
+        return _uint64_table[indices]
+
+    unique, inverse = np.unique(indices, return_inverse=True)
+    values = _sweep(unique.tolist())
+    table = np.empty(len(unique), dtype=object)
+    table[:] = [values[n] for n in unique.tolist()]
+    return table[inverse.ravel()].reshape(indices.shape)
+
+
+def fibonacci_range(start: int, stop: int, step: int = 1) -> Iterator[int]:
+    """
+    Lazily yield F(start), F(start + step), ... for indices below stop.
+
+    Jumps to start with fast doubling in O(log start), then keeps only the
+    pair (F(k), F(k+1)). With step 1 each value costs one addition; with a
+    larger step it uses F(k+s) = F(k+1)F(s) + F(k)F(s-1) and
+    F(k+s+1) = F(k+1)F(s+1) + F(k)F(s), a fixed number of operations.
+
+    Args:
+        start: First index (inclusive).
+        stop: End index (exclusive), as for range().
+        step: Positive distance between indices.
+
+    Yields:
+        F(n) for n in range(start, stop, step).
+
+    Raises:
+        ValueError: If start is negative or step is not positive.
+
+    Examples:
+        >>> list(fibonacci_range(0, 10))
+        [0, 1, 1, 2, 3, 5, 8, 13, 21, 34]
+        >>> list(fibonacci_range(10, 20, 3))
+        [55, 233, 987, 4181]
+    """
+    if start < 0:
+        raise ValueError("n must be a non-negative integer")
+    if step <= 0:
+        raise ValueError("step must be a positive integer")
+    return _fibonacci_range(start, stop, step)
+
+
+def _fibonacci_range(start: int, stop: int, step: int) -> Iterator[int]:
+    # Separate generator so argument errors are raised at call time
+    if start >= stop:
+        return
+    a, b = fibonacci_pair(start)
+    if step == 1:
+        for _ in range(start, stop):
+            yield a
+            a, b = b, a + b
+        return
+
+    f_prev, f_step = fibonacci_pair(step - 1)
+    f_next = f_prev + f_step
+    for _ in range(start, stop, step):
+        yield a
+        a, b = b * f_step + a * f_prev, b * f_next + a * f_step
+
+
+def fibonacci_chunks(
+    start: int,
+    stop: int,
+    step: int = 1,
+    chunk_size: int = 4096,
+    buffer: Optional[MutableSequence] = None,
+) -> Iterator[Tuple[MutableSequence, int]]:
+    """
+    Stream fibonacci_range() in chunks written into one reused buffer.
+
+    Each iteration yields (buffer, count): the first count slots of the
+    same buffer object hold the next values. Consume or copy them before
+    advancing, because the following chunk overwrites them. Any mutable
+    sequence works as the buffer, e.g. a NumPy uint64 array when every
+    index is at most UINT64_MAX_N.
+
+    Args:
+        start: First index (inclusive).
+        stop: End index (exclusive).
+        step: Positive distance between indices.
+        chunk_size: Buffer length when no buffer is given.
+        buffer: Preallocated buffer; its length sets the chunk size.
+
+    Yields:
+        Tuples of (buffer, number of valid values).
+
+    Raises:
+        ValueError: If start is negative, step or the chunk size is not positive.
+
+    Examples:
+        >>> [list(buf[:count]) for buf, count in fibonacci_chunks(0, 7, chunk_size=3)]
+        [[0, 1, 1], [2, 3, 5], [8]]
+    """
+    if buffer is None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+        buffer = [0] * chunk_size
+    elif len(buffer) == 0:
+        raise ValueError("buffer must not be empty")
+    return _fibonacci_chunks(fibonacci_range(start, stop, step), buffer)
+
+
+def _fibonacci_chunks(values: Iterator[int], buffer: MutableSequence) -> Iterator[Tuple[MutableSequence, int]]:
+    size = len(buffer)
+    count = 0
+    for value in values:
+        buffer[count] = value
+        count += 1
+        if count == size:
+            yield buffer, count
+            count = 0
+    if count:
+        yield buffer, count
+
+
+# Moduli up to this size may get a cached table of one full Pisano period
+# (at most 6 * m entries of 1-4 bytes); larger moduli always use doubling
+PISANO_TABLE_MAX_MODULUS = 100_000
+
+# pisano_period() walks up to 6 * m steps; above this it refuses instead
+PISANO_PERIOD_MAX_MODULUS = 10_000_000
+
+# Building a table costs about as much per entry (up to 6 per unit of m) as
+# doubling spends per bit of n (see fibonacci_mod_many)
+PISANO_TABLE_COST = 3
+
+
+def fibonacci_mod(n: int, m: int, use_table: bool = False) -> int:
+    """
+    Calculate F(n) mod m without building the full big integer.
+
+    Uses fast doubling with every intermediate reduced mod m, so the cost is
+    O(log n) small multiplications. With use_table=True and
+    m <= PISANO_TABLE_MAX_MODULUS, one Pisano period of F(k) mod m is built
+    once per modulus and cached, and later queries are a table lookup.
+
+    Args:
+        n: The position in the Fibonacci sequence (0-indexed).
+        m: The modulus.
+        use_table: Cache and use the Pisano-period table for m.
+
+    Returns:
+        F(n) mod m.
+
+    Raises:
+        ValueError: If n is negative or m is not positive.
+
+    Examples:
+        >>> fibonacci_mod(100, 1000)
+        75
+        >>> fibonacci_mod(10**18, 10**9 + 7)
+        209783453
+    """
+    if n < 0:
+        raise ValueError("n must be a non-negative integer")
+    if m <= 0:
+        raise ValueError("m must be a positive integer")
+
+    if use_table and m <= PISANO_TABLE_MAX_MODULUS:
+        table = _pisano_table(m)
+        return table[n % len(table)]
+
+    a, b = 0, 1 % m
+    for bit in bin(n)[2:]:
+        c = a * ((b << 1) - a) % m
+        d = (a * a + b * b) % m
+        if bit == "1":
+            a, b = d, (c + d) % m
+        else:
+            a, b = c, d
+    return a
+
+
+def pisano_period(m: int) -> int:
+    """
+    Return the Pisano period of m, the period of F(n) mod m.
+
+    The period is found by walking the sequence mod m until it returns to
+    (0, 1), which takes at most 6 * m steps. Moduli up to
+    PISANO_TABLE_MAX_MODULUS reuse the cached table.
+
+    Raises:
+        ValueError: If m is not positive or above PISANO_PERIOD_MAX_MODULUS.
+
+    Examples:
+        >>> pisano_period(10)
+        60
+    """
+    if m <= 0:
+        raise ValueError("m must be a positive integer")
+    if m > PISANO_PERIOD_MAX_MODULUS:
+        raise ValueError(f"m must be at most {PISANO_PERIOD_MAX_MODULUS} to walk its Pisano period")
+    if m <= PISANO_TABLE_MAX_MODULUS:
+        return len(_pisano_table(m))
+
+    a, b = 0, 1
+    period = 0
+    while True:
+        a, b = b, (a + b) % m
+        period += 1
+        if a == 0 and b == 1:
+            return period
+
+
+@lru_cache(maxsize=8)
+def _pisano_table(m: int) -> array:
+    """F(0..p-1) mod m for the Pisano period p of m, in the smallest unsigned type that holds m - 1."""
+    typecode = next(code for code in "BHIL" if m <= 1 << (8 * array(code).itemsize))
+    if m == 1:
+        return array(typecode, [0])
+    table = array(typecode, [0])
+    a, b = 1, 1
+    while not (a == 0 and b == 1):
+        table.append(a)
+        a, b = b, (a + b) % m
+    return table
+
+
+def fibonacci_mod_many(queries: Iterable[Tuple[int, int]], use_table: bool = True) -> List[int]:
+    """
+    Calculate F(n) mod m for many (n, m) pairs.
+
+    Queries are grouped by modulus. With use_table=True, a modulus of at
+    most PISANO_TABLE_MAX_MODULUS gets its Pisano table built once when its
+    queries would cost more by doubling (about one step per bit of each n)
+    than the table's up to 6 * m entries; everything else uses modular
+    doubling.
+
+    Args:
+        queries: Pairs of (n, m).
+        use_table: Allow Pisano tables for repeated moduli.
+
+    Returns:
+        F(n) mod m for each pair, in input order.
+
+    Raises:
+        ValueError: If any n is negative or any m is not positive.
+
+    Examples:
+        >>> fibonacci_mod_many([(10, 7), (100, 1000), (11, 7)])
+        [6, 75, 5]
+    """
+    queries = list(queries)
+    bits: Dict[int, int] = {}
+    for n, m in queries:
+        bits[m] = bits.get(m, 0) + max(n.bit_length(), 1)
+    tables = {m for m, total in bits.items() if use_table and total >= PISANO_TABLE_COST * m}
+    return [fibonacci_mod(n, m, use_table=m in tables) for n, m in queries]
 
 
 if __name__ == "__main__":
@@ -152,10 +726,17 @@ if __name__ == "__main__":
     for n in test_values:
         print(f"  fibonacci_iterative({n}) = {fibonacci_iterative(n)}")
 
+    print("\nUsing Fast Doubling:")
+    for n in test_values:
+        print(f"  fibonacci_fast_doubling({n}) = {fibonacci_fast_doubling(n)}")
+
     # Performance comparison for larger values
     print("\n\nLarge value test (n=100):")
     print(f"  Result: {fibonacci(100)}")
 
+    print("\nVery large value test (n=1,000,000):")
+    print(f"  Bits: {fibonacci(1_000_000).bit_length()}")
+
     # Show cache info for LRU implementation
     print("\nCache statistics for fibonacci_lru:")
     print(f"  {fibonacci_lru.cache_info()}")
@@ -0,0 +1,144 @@
+"""
+Bounded Fibonacci cache with a byte budget.
+
+fibonacci_lru keeps every F(k) it has ever computed. In a long-running
+process that grows without limit: F(10**6) alone is about 87 KB. This module
+provides a cache that holds at most a configured number of bytes of big
+integers and evicts least recently used entries to stay under it.
+
+Two retention policies are available:
+
+- "lru": cache F(n) for the queried n.
+- "checkpoint": cache only the pairs (F(jk), F(jk+1)) for checkpoints
+  j*k, where k is checkpoint_interval. Any n is rebuilt from the checkpoint
+  below it with at most k - 1 additions. Nearby queries share one entry.
+
+Example:
+    >>> cache = FibonacciCache(max_bytes=1 << 20, policy="checkpoint")
+    >>> cache(100)
+    354224848179261915075
+    >>> cache(101)
+    573147844013817084101
+    >>> cache.stats().hits
+    1
+"""
+
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Tuple, Union
+
+from fibonacci import fibonacci_pair
+
+POLICIES = ("lru", "checkpoint")
+
+CacheStats = namedtuple(
+    "CacheStats",
+    ["entries", "bytes", "max_bytes", "hits", "misses", "evictions", "hit_ratio"],
+)
+
+
+class FibonacciCache:
+    """
+    Fibonacci calculator backed by a byte-bounded LRU cache.
+
+    Args:
+        max_bytes: Upper bound on the memory held by cached integers.
+        policy: "lru" or "checkpoint" (see the module docstring).
+        checkpoint_interval: Distance between checkpoints for the
+            "checkpoint" policy.
+
+    Raises:
+        ValueError: If the policy is unknown or a size is not positive.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, policy: str = "lru", checkpoint_interval: int = 256):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if checkpoint_interval <= 0:
+            raise ValueError("checkpoint_interval must be positive")
+
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.checkpoint_interval = checkpoint_interval
+        # key -> (value, size); the key is n ("lru") or the checkpoint index ("checkpoint")
+        self._entries: "OrderedDict[int, Tuple[Union[int, Tuple[int, int]], int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, n: int) -> int:
+        """
+        Return F(n), serving it from the cache when possible.
+
+        Raises:
+            ValueError: If n is negative.
+        """
+        if n < 0:
+            raise ValueError("n must be a non-negative integer")
+
+        if self.policy == "lru":
+            return self._lookup(n, lambda: fibonacci_pair(n)[0])
+
+        index, offset = divmod(n, self.checkpoint_interval)
+        prev, curr = self._lookup(index, lambda: fibonacci_pair(index * self.checkpoint_interval))
+        for _ in range(offset):
+            prev, curr = curr, prev + curr
+        return prev
+
+    def _lookup(self, key: int, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        # Compute outside the lock; concurrent misses for one key may both compute
+        value = compute()
+        size = _size_of(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def stats(self) -> CacheStats:
+        """Return entry count, bytes held, hit/miss/eviction counts and hit ratio."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return CacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                hit_ratio=self._hits / lookups if lookups else 0.0,
+            )
+
+    def cache_clear(self) -> None:
+        """Drop every cached entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+def _size_of(value: Union[int, Tuple[int, int]]) -> int:
+    """Bytes held by a cached int or checkpoint pair (the ints only)."""
+    if isinstance(value, tuple):
+        return sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
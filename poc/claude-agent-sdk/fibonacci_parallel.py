@@ -0,0 +1,155 @@
+"""
+Multi-process Fibonacci for huge n.
+
+For n in the tens of millions F(n) has millions of digits, and fast doubling
+spends nearly all of its time in the multiplications of the last few
+doubling steps, all on one core. This module runs those steps on the
+Lucas-number recurrence, which needs only two independent products per
+step:
+
+    F(2k) = F(k) * L(k)
+    L(2k) = L(k)^2 - 2 * (-1)^k
+    F(2k+1) = (F(2k) + L(2k)) / 2
+    L(2k+1) = (5 * F(2k) + L(2k)) / 2
+
+Each product is further split Karatsuba-style (three half-size products per
+level) until there are enough leaf multiplications for the worker count, and
+the leaves are run on a ProcessPoolExecutor. Steps whose index is below the
+threshold run single-threaded, because shipping small operands to another
+process costs more than multiplying them.
+
+Example:
+    >>> fibonacci_parallel(100, workers=1)
+    354224848179261915075
+"""
+
+import operator
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+from fibonacci import fibonacci, fibonacci_pair
+
+# n below this goes to fibonacci(); for larger n, doubling steps below it still run in-process
+PARALLEL_THRESHOLD = 1_000_000
+
+# Operands narrower than this are multiplied directly rather than split further
+MIN_SPLIT_BITS = 1 << 16
+
+# A Karatsuba split node: (shift, high, low, middle), or a leaf index into the products
+_Node = Union[int, Tuple[int, "_Node", "_Node", "_Node"]]
+
+
+def fibonacci_parallel(
+    n: int,
+    workers: Optional[int] = None,
+    threshold: int = PARALLEL_THRESHOLD,
+    executor: Optional[Executor] = None,
+) -> int:
+    """
+    Calculate the nth Fibonacci number, spreading the big multiplications over processes.
+
+    Args:
+        n: The position in the Fibonacci sequence (0-indexed).
+        workers: Number of worker processes (default: os.cpu_count()).
+            With one worker the Lucas steps run in this process.
+        threshold: Smallest doubling-step index that is run in parallel.
+        executor: An existing executor to submit to instead of starting a
+            ProcessPoolExecutor for this call. Reusing one pool across calls
+            avoids the pool start-up cost.
+
+    Returns:
+        The nth Fibonacci number.
+
+    Raises:
+        ValueError: If n is negative or workers/threshold are not positive.
+    """
+    if n < 0:
+        raise ValueError("n must be a non-negative integer")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 0:
+        raise ValueError("workers must be a positive integer")
+    if threshold <= 0:
+        raise ValueError("threshold must be a positive integer")
+
+    if n < threshold:
+        return fibonacci(n)
+    if executor is not None or workers == 1:
+        return _fibonacci_lucas(n, threshold, executor, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return _fibonacci_lucas(n, threshold, pool, workers)
+
+
+def _fibonacci_lucas(n: int, threshold: int, executor: Optional[Executor], workers: int) -> int:
+    """Serial prefix below threshold, then Lucas doubling over the remaining bits of n."""
+    shift = 0
+    while n >> shift >= threshold:
+        shift += 1
+    k = n >> shift
+    f, f_next = fibonacci_pair(k)
+    lucas = 2 * f_next - f
+    odd = k & 1
+
+    # Two products per step; split each until there are at least `workers` leaves
+    depth = 0
+    while 2 * 3**depth < workers:
+        depth += 1
+
+    bits = bin(n)[-shift:]
+    for i, bit in enumerate(bits):
+        # The last step only needs F(2k) when n is even, so skip L(k)^2
+        f_only = i == len(bits) - 1 and bit == "0"
+
+        leaves: List[Tuple[int, int]] = []
+        nodes = [_split(f, lucas, depth, leaves)]
+        if not f_only:
+            nodes.append(_split(lucas, lucas, depth, leaves))
+        if executor is None:
+            products = [x * y for x, y in leaves]
+        else:
+            futures = [executor.submit(operator.mul, x, y) for x, y in leaves]
+            products = [future.result() for future in futures]
+
+        f2 = _combine(nodes[0], products)
+        if f_only:
+            return f2
+        lucas2 = _combine(nodes[1], products) + (2 if odd else -2)
+        if bit == "1":
+            f, lucas = (f2 + lucas2) >> 1, (5 * f2 + lucas2) >> 1
+        else:
+            f, lucas = f2, lucas2
+        odd = bit == "1"
+
+    return f
+
+
+def _split(x: int, y: int, depth: int, leaves: List[Tuple[int, int]]) -> _Node:
+    """Split x * y into Karatsuba leaf products appended to leaves; return the node to combine them."""
+    width = max(x.bit_length(), y.bit_length())
+    if depth == 0 or width < 2 * MIN_SPLIT_BITS:
+        leaves.append((x, y))
+        return len(leaves) - 1
+
+    half = width // 2
+    mask = (1 << half) - 1
+    x1, x0 = x >> half, x & mask
+    # Keep squares as squares: CPython multiplies an int by itself faster
+    y1, y0 = (x1, x0) if y is x else (y >> half, y & mask)
+    xs = x1 + x0
+    ys = xs if y is x else y1 + y0
+    high = _split(x1, y1, depth - 1, leaves)
+    low = _split(x0, y0, depth - 1, leaves)
+    middle = _split(xs, ys, depth - 1, leaves)
+    return half, high, low, middle
+
+
+def _combine(node: _Node, products: List[int]) -> int:
+    """Reassemble a product from its Karatsuba leaves."""
+    if isinstance(node, int):
+        return products[node]
+    half, high, low, middle = node
+    hi = _combine(high, products)
+    lo = _combine(low, products)
+    mid = _combine(middle, products) - hi - lo
+    return (hi << (2 * half)) + (mid << half) + lo
@@ -0,0 +1,224 @@
+"""
+Process-shared Fibonacci cache backed by a memory-mapped file.
+
+fibonacci_lru and FibonacciCache live in one process, so a pre-fork server
+with many workers recomputes the same large F(n) in each of them. This
+module keeps computed values in a file that every worker maps with
+MAP_SHARED: a value written by one worker is visible to all the others
+without recomputation, and readers decode it straight out of the mapping.
+
+File layout (little-endian):
+
+- header (64 bytes): magic, slot count, data capacity, entry count, data end
+- index: `slots` open-addressed slots of (n + 1, offset, length), 24 bytes each;
+  a zero key marks an empty slot
+- data: the integers as unsigned little-endian bytes, appended in write order
+
+Writers serialize on an exclusive flock and publish an entry by writing its
+payload and (offset, length) before the key, so lock-free readers never see
+a key whose payload is incomplete. Entries are never moved or removed; once
+the index or data region is full, new values are simply not stored.
+
+Example:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "fib.cache")
+    >>> with SharedFibonacciCache(path, max_bytes=1 << 20) as cache:
+    ...     cache(1000) == cache(1000)
+    True
+    >>> SharedFibonacciCache(path).get(1000) is not None
+    True
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+from collections import namedtuple
+from typing import Optional, Union
+
+from fibonacci import fibonacci_pair
+
+MAGIC = b"FIBSHM01"
+HEADER = struct.Struct("<8sQQQQ")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<QQQ")
+KEY = struct.Struct("<Q")
+# Keys are stored as n + 1 so that 0 can mark an empty slot
+MAX_N = 2**64 - 2
+
+SharedCacheStats = namedtuple(
+    "SharedCacheStats",
+    ["entries", "bytes", "max_bytes", "slots", "hits", "misses", "dropped"],
+)
+
+
+class SharedFibonacciCache:
+    """
+    Fibonacci calculator backed by a cache file shared between processes.
+
+    Opening an existing file reuses its layout; slots and max_bytes only
+    apply when the file is created. The object may be created before
+    forking: after a fork it reopens its file descriptor on first write so
+    each process holds its own flock.
+
+    Args:
+        path: Cache file, created if missing.
+        max_bytes: Capacity of the data region.
+        slots: Number of index slots (the maximum number of entries).
+
+    Raises:
+        ValueError: If a size is not positive or the file is not a cache file.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], max_bytes: int = 64 * 1024 * 1024, slots: int = 1 << 16):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if slots <= 0:
+            raise ValueError("slots must be positive")
+
+        self.path = os.fspath(path)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._pid = os.getpid()
+        try:
+            with self._locked():
+                if os.fstat(self._fd).st_size == 0:
+                    os.ftruncate(self._fd, HEADER_SIZE + slots * SLOT.size + max_bytes)
+                    os.pwrite(self._fd, HEADER.pack(MAGIC, slots, max_bytes, 0, 0), 0)
+                magic, self.slots, self.max_bytes, _, _ = HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a Fibonacci cache file")
+            self._map = mmap.mmap(self._fd, HEADER_SIZE + self.slots * SLOT.size + self.max_bytes)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._view = memoryview(self._map)
+        self._data_start = HEADER_SIZE + self.slots * SLOT.size
+        self._hits = 0
+        self._misses = 0
+        self._dropped = 0
+
+    def __call__(self, n: int) -> int:
+        """
+        Return F(n), reading it from the shared file or computing and storing it.
+
+        Raises:
+            ValueError: If n is negative.
+        """
+        if n < 0:
+            raise ValueError("n must be a non-negative integer")
+        value = self.get(n)
+        if value is not None:
+            self._hits += 1
+            return value
+        self._misses += 1
+        value = fibonacci_pair(n)[0]
+        self.put(n, value)
+        return value
+
+    def get(self, n: int) -> Optional[int]:
+        """Return the cached F(n), or None if it has not been stored."""
+        if n < 0 or n > MAX_N:
+            return None
+        slot = self._find(n + 1)
+        if slot is None:
+            return None
+        key, offset, length = SLOT.unpack_from(self._map, self._slot_offset(slot))
+        # _find may have returned an empty slot that a concurrent writer has
+        # since filled with a different key
+        if key != n + 1:
+            return None
+        start = self._data_start + offset
+        return int.from_bytes(self._view[start:start + length], "little")
+
+    def put(self, n: int, value: int) -> bool:
+        """
+        Store F(n) = value. Returns False if it could not be stored (cache full).
+
+        Storing an n that is already present is a no-op that returns True.
+        """
+        if n < 0 or n > MAX_N:
+            return False
+        payload = value.to_bytes((value.bit_length() + 7) // 8, "little")
+        with self._locked():
+            slot = self._find(n + 1)
+            if slot is None:
+                self._dropped += 1
+                return False
+            position = self._slot_offset(slot)
+            if KEY.unpack_from(self._map, position)[0] != 0:
+                return True
+            _, slots, max_bytes, count, data_end = HEADER.unpack_from(self._map, 0)
+            if data_end + len(payload) > max_bytes:
+                self._dropped += 1
+                return False
+
+            start = self._data_start + data_end
+            self._map[start:start + len(payload)] = payload
+            SLOT.pack_into(self._map, position, 0, data_end, len(payload))
+            # Publish: the key goes in last, after the payload and its location
+            KEY.pack_into(self._map, position, n + 1)
+            HEADER.pack_into(self._map, 0, MAGIC, slots, max_bytes, count + 1, data_end + len(payload))
+        return True
+
+    def _find(self, key: int) -> Optional[int]:
+        """Slot holding key, or the empty slot where it would go; None if the index is full."""
+        slot = (key * 0x9E3779B97F4A7C15 & 0xFFFFFFFFFFFFFFFF) % self.slots
+        for _ in range(self.slots):
+            stored = KEY.unpack_from(self._map, self._slot_offset(slot))[0]
+            if stored == key or stored == 0:
+                return slot
+            slot = (slot + 1) % self.slots
+        return None
+
+    def _slot_offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT.size
+
+    def _locked(self):
+        if os.getpid() != self._pid:
+            # flock belongs to the open file description, which a forked child
+            # shares with its parent; reopen so the lock excludes the parent too
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_RDWR)
+            self._pid = os.getpid()
+        return _FileLock(self._fd)
+
+    def stats(self) -> SharedCacheStats:
+        """Return the shared entry count and bytes used, plus this process's hit/miss/dropped counts."""
+        _, slots, max_bytes, count, data_end = HEADER.unpack_from(self._map, 0)
+        return SharedCacheStats(
+            entries=count,
+            bytes=data_end,
+            max_bytes=max_bytes,
+            slots=slots,
+            hits=self._hits,
+            misses=self._misses,
+            dropped=self._dropped,
+        )
+
+    def close(self) -> None:
+        """Unmap the file and close its descriptor; the file itself is kept."""
+        if self._map is None:
+            return
+        self._view.release()
+        self._map.close()
+        os.close(self._fd)
+        self._map = None
+
+    def __enter__(self) -> "SharedFibonacciCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class _FileLock:
+    """Exclusive flock on a file descriptor for the duration of a `with` block."""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
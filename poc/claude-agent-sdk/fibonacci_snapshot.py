@@ -0,0 +1,199 @@
+"""
+Precomputed Fibonacci snapshot files.
+
+A new process starts with an empty fibonacci_lru table and recomputes
+whatever it is asked for. A snapshot holds F(0..K) plus checkpoint pairs
+(F(m), F(m+1)) at every multiple m of an interval beyond K, up to max_n.
+fibonacci() consults it when the FIBONACCI_SNAPSHOT environment variable
+names a snapshot file (or after fibonacci.load_snapshot(path)). Indices up
+to K are then a table lookup. Larger indices up to max_n are rebuilt from
+the nearest checkpoint below with two big-by-small multiplications:
+F(m + d) = F(m + 1) * F(d) + F(m) * F(d - 1).
+
+File layout (little-endian):
+
+- header (64 bytes): magic, dense count K + 1, checkpoint interval,
+  first checkpoint index, checkpoint count, max_n
+- offsets: one uint64 per stored value plus an end offset, relative to the data
+- data: the values as unsigned little-endian bytes; F(0..K) first, then the
+  checkpoint pairs in order
+
+The file is memory-mapped read-only and nothing is decoded up front; a
+lookup reads two offsets and converts one slice to an int, so only the
+touched pages are ever loaded.
+
+Usage:
+    python fibonacci_snapshot.py generate fib.snapshot --dense 10000 --interval 50000 --max-n 1000000
+    python fibonacci_snapshot.py info fib.snapshot
+    FIBONACCI_SNAPSHOT=fib.snapshot python app.py
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Optional, Union
+
+from fibonacci import fibonacci_pair
+
+MAGIC = b"FIBSNAP1"
+HEADER = struct.Struct("<8sQQQQQ")
+HEADER_SIZE = 64
+OFFSET = struct.Struct("<Q")
+
+
+class FibonacciSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+
+    Args:
+        path: Snapshot written by write_snapshot().
+
+    Raises:
+        ValueError: If the file is not a snapshot.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER_SIZE or self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a Fibonacci snapshot")
+        _, self.dense_count, self.interval, self.first_checkpoint, self.checkpoints, self.max_n = \
+            HEADER.unpack_from(self._map, 0)
+        self._view = memoryview(self._map)
+        self._data_start = HEADER_SIZE + (self.dense_count + 2 * self.checkpoints + 1) * OFFSET.size
+
+    def get(self, n: int) -> Optional[int]:
+        """Return F(n) if the snapshot covers n (n <= max_n), else None."""
+        if n < 0 or n > self.max_n:
+            return None
+        if n < self.dense_count:
+            return self._value(n)
+
+        j = min(n // self.interval, self.first_checkpoint + self.checkpoints - 1)
+        if j >= self.first_checkpoint:
+            base = j * self.interval
+            index = self.dense_count + 2 * (j - self.first_checkpoint)
+        else:
+            base = index = self.dense_count - 2
+        f0, f1 = self._value(index), self._value(index + 1)
+
+        d = n - base
+        if d == 0:
+            return f0
+        fd, fd_next = fibonacci_pair(d)
+        return f1 * fd + f0 * (fd_next - fd)
+
+    def _value(self, index: int) -> int:
+        position = HEADER_SIZE + index * OFFSET.size
+        start = self._data_start + OFFSET.unpack_from(self._map, position)[0]
+        end = self._data_start + OFFSET.unpack_from(self._map, position + OFFSET.size)[0]
+        return int.from_bytes(self._view[start:end], "little")
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._map is None:
+            return
+        self._view.release()
+        self._map.close()
+        self._map = None
+
+    def __enter__(self) -> "FibonacciSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def write_snapshot(
+    path: Union[str, os.PathLike],
+    dense: int = 10_000,
+    interval: int = 50_000,
+    max_n: int = 1_000_000,
+) -> str:
+    """
+    Generate a snapshot of F(0..dense) and checkpoints every `interval` up to max_n.
+
+    The file is written to a temporary name and renamed into place, so
+    readers never see a partial snapshot.
+
+    Raises:
+        ValueError: If dense < 1, interval < 1 or max_n < dense.
+    """
+    if dense < 1:
+        raise ValueError("dense must be at least 1")
+    if interval < 1:
+        raise ValueError("interval must be positive")
+    if max_n < dense:
+        raise ValueError("max_n must be at least dense")
+
+    import tempfile  # only the writer needs it; keeps fibonacci()'s first lookup cheap
+
+    path = os.fspath(path)
+    dense_count = dense + 1
+    first_checkpoint = dense // interval + 1
+    checkpoints = max(0, max_n // interval - first_checkpoint + 1)
+    data_start = HEADER_SIZE + (dense_count + 2 * checkpoints + 1) * OFFSET.size
+
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            offsets = [0]
+            out.seek(data_start)
+
+            def append(value: int) -> None:
+                payload = value.to_bytes((value.bit_length() + 7) // 8, "little")
+                out.write(payload)
+                offsets.append(offsets[-1] + len(payload))
+
+            prev, curr = 0, 1
+            for _ in range(dense_count):
+                append(prev)
+                prev, curr = curr, prev + curr
+            for j in range(first_checkpoint, first_checkpoint + checkpoints):
+                for value in fibonacci_pair(j * interval):
+                    append(value)
+
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, dense_count, interval, first_checkpoint, checkpoints, max_n))
+            out.seek(HEADER_SIZE)
+            out.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate = subparsers.add_parser("generate", help="write a snapshot file")
+    generate.add_argument("path")
+    generate.add_argument("--dense", type=int, default=10_000, help="store F(0..DENSE) directly")
+    generate.add_argument("--interval", type=int, default=50_000, help="checkpoint spacing beyond DENSE")
+    generate.add_argument("--max-n", type=int, default=1_000_000, help="largest n the snapshot answers")
+    info = subparsers.add_parser("info", help="print a snapshot's layout")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        started = time.perf_counter()
+        path = write_snapshot(args.path, args.dense, args.interval, args.max_n)
+        print(f"wrote {path} ({os.path.getsize(path):,} bytes) in {time.perf_counter() - started:.2f}s")
+        return
+
+    with FibonacciSnapshot(args.path) as snapshot:
+        print(f"file:        {snapshot.path} ({os.path.getsize(snapshot.path):,} bytes)")
+        print(f"dense:       F(0..{snapshot.dense_count - 1})")
+        print(f"checkpoints: {snapshot.checkpoints} every {snapshot.interval:,}")
+        print(f"max_n:       {snapshot.max_n:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,793 @@
+"""
+Syntax-aware, format-preserving refactoring behind the refactor_code MCP tool.
+
+Transforms:
+
+- RenameCall(old, new): calls to the dotted name `old` (`print`,
+  `os.getcwd`) now call `new`; `my_print(`, `obj.print(` and text inside
+  strings or comments are left alone. If `new` is dotted and the module
+  does not define its first part, `import <first part>` is added; a plain
+  `new` that is neither a builtin nor defined in the module is an error
+- RenameName(old, new): renames an identifier wherever it is a name, but not
+  attributes (`obj.old`) or keyword arguments (`f(old=1)`). A name bound by
+  an import is aliased (`from m import old as new`); one bound by
+  `import old.sub` cannot be, and is an error. So is a parameter or a name
+  defined in a class body, whose callers use it as a keyword or attribute
+- PrintToLogging(level): print(...) becomes logger.<level>(...), and a module
+  that does not define `logger` gets `import logging` (if missing) and
+  `logger = logging.getLogger(__name__)` after its leading imports. Several
+  arguments get a format string (`print(a, b)` logs `"%s %s", a, b`); a
+  print with `sep`/`end`/`file`/`flush` or `*args` is an error
+
+A file is parsed once and walked once; every transform contributes text
+edits during that walk, and the edits are spliced into the original text in
+one pass, so everything the transforms do not touch (formatting, comments,
+quotes, line endings) is kept byte for byte. When two edits overlap, the
+call rename wins over the name rename. Results are unified diffs.
+
+The parser is libcst when it is installed, otherwise the standard tokenize
+module. The token stream is lossless too, but carries no tree: the tokenize
+backend infers context from neighbouring tokens and brackets, only reports
+syntax errors the tokenizer notices (unclosed brackets, bad indentation),
+and on Python < 3.12 does not look inside f-strings. It is also much faster
+(about 25x on libcst 1.0 without its native parser); pass backend="tokenize"
+for large batches. Files that do not contain any name a transform looks for
+are returned unchanged without being parsed.
+
+Example:
+    >>> result = refactor_source("import os\\nprint('print(')  # print(\\n", [PrintToLogging()], path="app.py")
+    >>> print(result.diff, end="")
+    --- a/app.py
+    +++ b/app.py
+    @@ -1,2 +1,5 @@
+     import os
+    -print('print(')  # print(
+    +import logging
+    +
+    +logger = logging.getLogger(__name__)
+    +logger.info('print(')  # print(
+    >>> result.changes
+    {'print-to-logging': 1}
+"""
+
+import builtins
+import difflib
+import io
+import keyword
+import os
+import tokenize
+from collections import Counter, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from repo_review import MP_CONTEXT
+
+try:
+    import libcst as cst
+    from libcst.metadata import MetadataWrapper, PositionProvider
+except ImportError:  # libcst is optional; the tokenize backend is used instead
+    cst = None
+
+RenameCall = namedtuple("RenameCall", ["old", "new"])
+RenameName = namedtuple("RenameName", ["old", "new"])
+PrintToLogging = namedtuple("PrintToLogging", ["level"], defaults=("info",))
+
+RefactorResult = namedtuple("RefactorResult", ["path", "diff", "changes", "error"])
+
+BACKENDS = ("libcst", "tokenize")
+LOG_LEVELS = ("debug", "info", "warning", "error", "critical")
+
+# An edit replaces text between two (line, col) positions; lower priority wins an overlap
+_Edit = namedtuple("_Edit", ["start", "end", "text", "priority", "label"])
+
+
+class _Plan:
+    """Edits collected from one walk, plus the module facts PrintToLogging needs."""
+
+    def __init__(self):
+        self.edits: List[_Edit] = []
+        self.setup_after: Optional[int] = None   # last line of the leading docstring/imports
+        self.setup_after_imports = False          # whether that run contains an import
+        self.first_statement: Optional[int] = None
+        self.has_logger = False
+        self.imports_logging = False
+        self.bound = set()                        # names bound by imports, def/class and top-level assignments
+        self.star_import = False
+
+
+class _Refused(Exception):
+    """A transform would produce code that no longer runs."""
+
+
+def parse_transforms(spec: str) -> Tuple:
+    """
+    Parse a comma-separated transform list.
+
+    Items are `print-to-logging[:LEVEL]`, `rename:OLD=NEW` and
+    `rename-call:OLD.NAME=NEW.NAME`.
+
+    Raises:
+        ValueError: If an item is unknown or malformed.
+
+    Examples:
+        >>> parse_transforms("print-to-logging:debug, rename:fetch=load")
+        (PrintToLogging(level='debug'), RenameName(old='fetch', new='load'))
+    """
+    transforms = []
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, argument = item.partition(":")
+        if kind == "print-to-logging":
+            transforms.append(PrintToLogging(argument or "info"))
+        elif kind in ("rename", "rename-call"):
+            old, sep, new = argument.partition("=")
+            if not sep:
+                raise ValueError(f"{kind} needs OLD=NEW, got {item!r}")
+            transforms.append((RenameName if kind == "rename" else RenameCall)(old.strip(), new.strip()))
+        else:
+            raise ValueError(f"unknown transform {kind!r}")
+    _validate(transforms)
+    return tuple(transforms)
+
+
+def refactor_source(
+    code: str,
+    transforms: Sequence,
+    path: str = "<string>",
+    backend: Optional[str] = None,
+) -> RefactorResult:
+    """
+    Apply transforms to Python source.
+
+    Args:
+        code: The module source.
+        transforms: RenameCall, RenameName and PrintToLogging records.
+        path: Name used in the diff headers.
+        backend: "libcst" or "tokenize"; default libcst if installed.
+
+    Returns:
+        A RefactorResult whose diff is empty when nothing changed, and whose
+        error is set (and diff empty) when the code does not parse or a
+        transform cannot be applied safely.
+
+    Raises:
+        ValueError: If a transform or the backend is invalid.
+    """
+    new_code, changes, error = _refactor(code, transforms, backend)
+    if error is not None:
+        return RefactorResult(path, "", {}, error)
+    return RefactorResult(path, unified_diff(code, new_code, path), changes, None)
+
+
+def refactor_files(
+    paths: Iterable[str],
+    transforms: Sequence,
+    workers: Optional[int] = None,
+    write: bool = False,
+    backend: Optional[str] = None,
+    executor: Optional[Executor] = None,
+) -> List[RefactorResult]:
+    """
+    Apply the same transforms to many files in parallel.
+
+    Args:
+        paths: Files to refactor.
+        transforms: See refactor_source().
+        workers: Pool size (default os.cpu_count()); 1 runs in this process.
+        write: Write changed files back (atomically, keeping their mode).
+        backend: See refactor_source().
+        executor: An existing executor to use instead of a new process pool.
+
+    Returns one RefactorResult per path, in order.
+    """
+    _validate(transforms)
+    _backend(backend)
+    paths = list(paths)
+    jobs = [(path, tuple(transforms), write, backend) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or len(paths) <= 1):
+        return [_refactor_file(job) for job in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    if executor is not None:
+        return list(executor.map(_refactor_file, jobs))
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=MP_CONTEXT) as pool:
+        return list(pool.map(_refactor_file, jobs, chunksize=chunksize))
+
+
+def unified_diff(old: str, new: str, path: str) -> str:
+    """A unified diff of two versions of a file ("" when they are equal)."""
+    if old == new:
+        return ""
+    lines = difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True), f"a/{path}", f"b/{path}"
+    )
+    return "".join(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n" for line in lines)
+
+
+def _refactor_file(job) -> RefactorResult:
+    path, transforms, write, backend = job
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            code = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        return RefactorResult(path, "", {}, f"unreadable: {e}")
+    new_code, changes, error = _refactor(code, transforms, backend)
+    if error is not None:
+        return RefactorResult(path, "", {}, error)
+    if write and new_code != code:
+        _write_atomic(path, new_code)
+    return RefactorResult(path, unified_diff(code, new_code, path), changes, None)
+
+
+def _write_atomic(path: str, text: str) -> None:
+    import tempfile
+
+    directory, name = os.path.split(os.path.abspath(path))
+    mode = os.stat(path).st_mode
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+            out.write(text)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _refactor(code: str, transforms: Sequence, backend: Optional[str]) -> Tuple[str, Dict[str, int], Optional[str]]:
+    """Returns (new code, changes per transform, error)."""
+    _validate(transforms)
+    backend = _backend(backend)
+    calls, names = _index(transforms)
+    # Most files in a batch never mention the names involved; skip parsing them
+    if not any(name.split(".")[0] in code for name in list(calls) + list(names)):
+        return code, {}, None
+    try:
+        if backend == "libcst":
+            plan = _plan_libcst(code, transforms)
+        else:
+            plan = _plan_tokenize(code, transforms)
+    except cst.ParserSyntaxError if cst is not None else () as e:
+        return code, {}, f"syntax error: {e.message} (line {e.raw_line})"
+    except (tokenize.TokenError, IndentationError, SyntaxError) as e:
+        return code, {}, f"syntax error: {e.args[0] if e.args else e}"
+    except _Refused as e:
+        return code, {}, str(e)
+    # Names renamed at their binding are bound under the new name afterwards
+    renamed = {old for old in names if old in plan.bound}
+    plan.bound = (plan.bound - renamed) | {names[old][0] for old in renamed}
+    return _apply(code, plan)
+
+
+def _backend(backend: Optional[str]) -> str:
+    if backend is None:
+        return "libcst" if cst is not None else "tokenize"
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}")
+    if backend == "libcst" and cst is None:
+        raise ValueError("the libcst backend needs libcst installed")
+    return backend
+
+
+def _validate(transforms: Sequence) -> None:
+    for transform in transforms:
+        if isinstance(transform, PrintToLogging):
+            if transform.level not in LOG_LEVELS:
+                raise ValueError(f"log level must be one of {LOG_LEVELS}")
+            continue
+        if not isinstance(transform, (RenameCall, RenameName)):
+            raise ValueError(f"unknown transform: {transform!r}")
+        dotted = isinstance(transform, RenameCall)
+        for name in (transform.old, transform.new):
+            parts = name.split(".") if dotted else [name]
+            if not all(part.isidentifier() and not keyword.iskeyword(part) for part in parts):
+                raise ValueError(f"not a valid {'dotted name' if dotted else 'identifier'}: {name!r}")
+
+
+def _index(transforms: Sequence) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, Tuple[str, str]]]:
+    """Map dotted call names and identifiers to (replacement, label); the first transform for a name wins."""
+    calls: Dict[str, Tuple[str, str]] = {}
+    names: Dict[str, Tuple[str, str]] = {}
+    for transform in transforms:
+        if isinstance(transform, PrintToLogging):
+            calls.setdefault("print", (f"logger.{transform.level}", "print-to-logging"))
+        elif isinstance(transform, RenameCall):
+            calls.setdefault(transform.old, (transform.new, f"rename-call:{transform.old}"))
+        else:
+            names.setdefault(transform.old, (transform.new, f"rename:{transform.old}"))
+    return calls, names
+
+
+def _apply(code: str, plan: _Plan) -> Tuple[str, Dict[str, int], Optional[str]]:
+    """Splice the plan's edits into code in one pass."""
+    starts = [0]
+    for index, char in enumerate(code):
+        if char == "\n":
+            starts.append(index + 1)
+
+    def offset(position: Tuple[int, int]) -> int:
+        line, col = position
+        return starts[line - 1] + col if line <= len(starts) else len(code)
+
+    edits = sorted(
+        ((offset(e.start), offset(e.end), e.priority, e.text, e.label) for e in plan.edits),
+        key=lambda edit: (edit[0], edit[2]),
+    )
+    applied = []
+    position = 0
+    for edit in edits:
+        if edit[0] < position:
+            continue  # overlaps an edit already applied
+        applied.append(edit)
+        position = edit[1]
+
+    imports = []
+    for _, _, priority, text, label in applied:
+        root = text.split(".")[0]
+        if priority != 0 or label == "print-to-logging" or root in plan.bound or hasattr(builtins, root):
+            continue
+        if "." in text:
+            if root not in imports:
+                imports.append(root)
+        elif not plan.star_import:
+            return code, {}, f"cannot rename call to {text!r}: it is not defined in this module"
+    logger = any(edit[4] == "print-to-logging" for edit in applied) and not plan.has_logger
+    setup = _module_setup(code, plan, starts, imports, logger)
+    if setup is not None:
+        applied.append(setup)
+        applied.sort(key=lambda edit: (edit[0], edit[2]))
+
+    out = []
+    position = 0
+    changes: Counter = Counter()
+    for start, end, _, text, label in applied:
+        out.append(code[position:start])
+        out.append(text)
+        position = end
+        if label is not None:
+            changes[label] += 1
+    out.append(code[position:])
+    return "".join(out), dict(changes), None
+
+
+def _module_setup(code: str, plan: _Plan, starts: List[int], imports: List[str], logger: bool) -> Optional[Tuple]:
+    """Zero-width edit adding imports and a module logger, or None if neither is needed."""
+    if logger and not plan.imports_logging:
+        imports = imports + ["logging"]
+    if not imports and not logger:
+        return None
+    lines = [f"import {module}" for module in imports]
+    if logger:
+        lines += ["", "logger = logging.getLogger(__name__)"]
+    if plan.setup_after is not None:
+        if not plan.setup_after_imports:
+            lines.insert(0, "")  # keep a blank line below the docstring
+        text = "\n".join(lines) + "\n"
+        if plan.setup_after < len(starts):
+            at = starts[plan.setup_after]
+        else:
+            at, text = len(code), ("\n" if code and not code.endswith("\n") else "") + text
+    else:
+        at = starts[(plan.first_statement or 1) - 1]
+        text = "\n".join(lines) + "\n\n"
+    return at, at, -1, text, None
+
+
+# --- tokenize backend ---------------------------------------------------------
+
+_SKIP_TOKENS = (tokenize.NL, tokenize.COMMENT, tokenize.ENCODING)
+
+
+def _plan_tokenize(code: str, transforms: Sequence) -> _Plan:
+    calls, names = _index(transforms)
+    call_parts = {tuple(name.split(".")): target for name, target in calls.items()}
+    plan = _Plan()
+    tokens = [t for t in tokenize.generate_tokens(io.StringIO(code).readline) if t.type not in _SKIP_TOKENS]
+
+    brackets: List[str] = []
+    level = 0
+    statement_start = True
+    in_import = False
+    line_kinds: List[str] = []   # kinds of the ;-separated parts of the current top-level line
+    leading = True               # still inside the leading docstring/import run
+    blocks: List[str] = []       # "class" or "other" for each enclosing indented block
+    header = "other"             # kind of block the current statement would open
+    lambdas: List[int] = []      # bracket depths of lambda parameter lists being read
+    inline_class = False         # inside a one-line class body (`class A: x = 1`)
+
+    for i, token in enumerate(tokens):
+        kind, string = token.type, token.string
+        previous = tokens[i - 1] if i else None
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+
+        if kind in (tokenize.NEWLINE, tokenize.ENDMARKER) or (kind == tokenize.OP and string == ";" and not brackets):
+            statement_start, in_import = True, False
+            lambdas = []
+            inline_class = inline_class and kind == tokenize.OP
+            if kind != tokenize.OP and line_kinds:
+                if plan.first_statement is None:
+                    plan.first_statement = first_line
+                leading = leading and _extends_leading(plan, line_kinds, token.start[0])
+                line_kinds = []
+            continue
+        if kind == tokenize.INDENT:
+            level += 1
+            blocks.append(header)
+            continue
+        if kind == tokenize.DEDENT:
+            level -= 1
+            blocks.pop()
+            continue
+
+        if statement_start:
+            statement_start = False
+            header = "class" if string == "class" else "other"
+            first_token = i
+            in_import = kind == tokenize.NAME and string in ("import", "from")
+            if level == 0:
+                if not line_kinds:
+                    first_line = token.start[0]
+                line_kinds.append(_statement_kind(tokens, i, plan, bool(plan.first_statement or line_kinds)))
+
+        if kind == tokenize.OP:
+            if in_import and string == "*":
+                plan.star_import = True
+            if string == "(":
+                if previous is not None and previous.type == tokenize.NAME and i >= 2 and tokens[i - 2].string == "def":
+                    brackets.append("def")
+                elif previous is not None and (
+                    (previous.type == tokenize.NAME and not keyword.iskeyword(previous.string))
+                    or previous.string in (")", "]")
+                ):
+                    brackets.append("call")
+                else:
+                    brackets.append("group")
+            elif string in "[{":
+                brackets.append("group")
+            elif string in ")]}" and brackets:
+                brackets.pop()
+            elif string == ":" and lambdas and lambdas[-1] == len(brackets):
+                lambdas.pop()
+            elif string == ":" and header == "class" and not brackets:
+                inline_class, first_token = True, i + 1
+            continue
+        if kind != tokenize.NAME:
+            continue
+
+        if in_import:
+            _note_import(tokens, i, plan, names)
+            continue
+        if string == "lambda":
+            lambdas.append(len(brackets))
+            continue
+        after_dot = previous is not None and previous.string == "."
+        if after_dot:
+            continue
+        if previous is not None and previous.string in ("def", "class"):
+            plan.bound.add(string)
+        if call_parts and not (previous is not None and previous.string in ("def", "class")):
+            for parts, (new, label) in call_parts.items():
+                end = _match_dotted(tokens, i, parts)
+                if end is not None:
+                    plan.edits.append(_Edit(token.start, tokens[end].end, new, 0, label))
+                    if label == "print-to-logging":
+                        _print_arguments(tokens, end + 1, plan)
+        if string in names:
+            if brackets and brackets[-1] == "call" and following is not None and following.string == "=":
+                continue  # keyword argument
+            if previous is not None and previous.string in ("(", ",", "*", "**", "lambda") and (
+                (brackets and brackets[-1] == "def") or (lambdas and lambdas[-1] == len(brackets))
+            ):
+                raise _Refused(_parameter_message(string))
+            if (inline_class or (blocks and blocks[-1] == "class")) and not brackets and (
+                (previous is not None and previous.string in ("def", "class"))
+                or (i == first_token and following is not None and following.string in ("=", ":"))
+            ):
+                raise _Refused(_class_member_message(string))
+            new, label = names[string]
+            plan.edits.append(_Edit(token.start, token.end, new, 1, label))
+    return plan
+
+
+def _match_dotted(tokens: List, i: int, parts: Tuple[str, ...]) -> Optional[int]:
+    """Index of the last name token if tokens[i:] spell `parts` followed by "(", else None."""
+    index = i
+    for n, part in enumerate(parts):
+        if n and not (index < len(tokens) and tokens[index].string == "."):
+            return None
+        index += 1 if n else 0
+        if not (index < len(tokens) and tokens[index].type == tokenize.NAME and tokens[index].string == part):
+            return None
+        index += 1
+    if index < len(tokens) and tokens[index].string == "(":
+        return index - 1
+    return None
+
+
+def _print_arguments(tokens: List, open_index: int, plan: _Plan) -> None:
+    """Check the arguments of the print call opening at tokens[open_index] and add its format string."""
+    depth = lambdas = count = 0
+    first = None
+    at_start = True
+    for j in range(open_index + 1, len(tokens)):
+        token = tokens[j]
+        string = token.string
+        if token.type == tokenize.OP and string in (")", "]", "}") and not depth:
+            _print_format(count, tokens[open_index].end, first, plan)
+            return
+        if at_start and not depth:
+            if string in ("*", "**") or (token.type == tokenize.NAME and tokens[j + 1].string == "="):
+                raise _print_refused(token.start[0])
+            count += 1
+            first = first or token.start
+            at_start = False
+        if token.type == tokenize.OP and string in ("(", "[", "{"):
+            depth += 1
+        elif token.type == tokenize.OP and string in (")", "]", "}"):
+            depth -= 1
+        elif depth:
+            continue
+        elif string == "lambda":
+            lambdas += 1
+        elif string == ":" and lambdas:
+            lambdas -= 1
+        elif string == "," and not lambdas:
+            at_start = True
+
+
+def _print_format(count: int, after_open: Tuple[int, int], first: Optional[Tuple[int, int]], plan: _Plan) -> None:
+    """Give a print call with no or several arguments the message logging expects."""
+    if count == 0:
+        plan.edits.append(_Edit(after_open, after_open, '""', -1, None))
+    elif count > 1:
+        message = " ".join(["%s"] * count)
+        plan.edits.append(_Edit(first, first, f'"{message}", ', -1, None))
+
+
+def _print_refused(line: int) -> _Refused:
+    return _Refused(
+        f"cannot turn print(...) on line {line} into logging: it passes sep, end, file or flush, or unpacks its arguments"
+    )
+
+
+def _statement_kind(tokens: List, i: int, plan: _Plan, seen_statement: bool) -> str:
+    token = tokens[i]
+    following = tokens[i + 1] if i + 1 < len(tokens) else None
+    if token.type == tokenize.STRING and not seen_statement and following is not None and \
+            following.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+        return "docstring"
+    if token.type == tokenize.NAME and token.string in ("import", "from"):
+        return "import"
+    if token.type == tokenize.NAME and not keyword.iskeyword(token.string) and \
+            following is not None and following.string in ("=", ":"):
+        plan.bound.add(token.string)
+        if token.string == "logger":
+            plan.has_logger = True
+    return "other"
+
+
+def _note_import(tokens: List, i: int, plan: _Plan, names: Dict[str, Tuple[str, str]]) -> None:
+    """Record the name an import statement binds at tokens[i], aliasing it if it is being renamed."""
+    binding = _import_binding(tokens, i)
+    if binding is None:
+        return
+    token = tokens[i]
+    plan.bound.add(token.string)
+    if token.string == "logger":
+        plan.has_logger = True
+    elif token.string == "logging" and tokens[_statement_first(tokens, i)].string == "import":
+        plan.imports_logging = True
+    if token.string in names:
+        if binding == "dotted":
+            raise _Refused(_dotted_import_message(token.string))
+        new, label = names[token.string]
+        text = new if binding == "alias" else f"{token.string} as {new}"
+        plan.edits.append(_Edit(token.start, token.end, text, 1, label))
+
+
+def _import_binding(tokens: List, i: int) -> Optional[str]:
+    """How the name at tokens[i] of an import statement is bound: "alias", "name", "dotted" or None."""
+    previous = tokens[i - 1].string
+    if previous == "as":
+        return "alias"
+    if previous not in ("import", ",", "("):
+        return None
+    end = i + 1
+    while end + 1 < len(tokens) and tokens[end].string == "." and tokens[end + 1].type == tokenize.NAME:
+        end += 2
+    if end < len(tokens) and tokens[end].string == "as":
+        return None  # `import a.b as c` binds c
+    return "dotted" if end > i + 1 else "name"
+
+
+def _dotted_import_message(name: str) -> str:
+    return f"cannot rename {name!r}: it is bound by a dotted `import {name}.…`, which cannot be aliased"
+
+
+def _parameter_message(name: str) -> str:
+    return f"cannot rename {name!r}: it is a parameter, and callers passing it by keyword are not renamed"
+
+
+def _class_member_message(name: str) -> str:
+    return f"cannot rename {name!r}: it is defined in a class body, and its uses as `obj.{name}` are not renamed"
+
+
+def _statement_first(tokens: List, i: int) -> int:
+    while i > 0 and tokens[i - 1].type not in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT) \
+            and tokens[i - 1].string != ";":
+        i -= 1
+    return i
+
+
+def _extends_leading(plan: _Plan, kinds: List[str], last_line: int) -> bool:
+    """Fold one top-level line into the leading docstring/import run; False once the run has ended."""
+    if kinds == ["docstring"] or (kinds and all(kind == "import" for kind in kinds)):
+        plan.setup_after = last_line
+        plan.setup_after_imports = plan.setup_after_imports or kinds[0] == "import"
+        return True
+    return False
+
+
+# --- libcst backend -----------------------------------------------------------
+
+if cst is not None:
+
+    class _Collector(cst.CSTVisitor):
+        """One walk over a libcst tree, recording every transform's edits."""
+
+        METADATA_DEPENDENCIES = (PositionProvider,)
+
+        def __init__(self, plan: _Plan, calls: Dict[str, Tuple[str, str]], names: Dict[str, Tuple[str, str]]):
+            super().__init__()
+            self.plan = plan
+            self.calls = calls
+            self.names = names
+            self.skip = set()
+
+        def _edit(self, node: "cst.CSTNode", text: str, priority: int, label: str) -> None:
+            position = self.get_metadata(PositionProvider, node)
+            start, end = position.start, position.end
+            self.plan.edits.append(_Edit((start.line, start.column), (end.line, end.column), text, priority, label))
+
+        def visit_Module(self, node: "cst.Module") -> None:
+            leading = True
+            for index, statement in enumerate(node.body):
+                kinds = _cst_kinds(statement, index, self.plan)
+                position = self.get_metadata(PositionProvider, statement)
+                if self.plan.first_statement is None:
+                    self.plan.first_statement = position.start.line
+                leading = leading and _extends_leading(self.plan, kinds, position.end.line)
+
+        def visit_Import(self, node) -> bool:
+            for alias in node.names:
+                self._bind_import(alias)
+            return False
+
+        def visit_ImportFrom(self, node) -> bool:
+            if isinstance(node.names, cst.ImportStar):
+                self.plan.star_import = True
+            else:
+                for alias in node.names:
+                    self._bind_import(alias)
+            return False
+
+        def _bind_import(self, alias: "cst.ImportAlias") -> None:
+            """Record the name an import alias binds, aliasing it if it is being renamed."""
+            if alias.asname is not None:
+                node = alias.asname.name
+                name, text = node.value, None
+            elif isinstance(alias.name, cst.Name):
+                node = alias.name
+                name = node.value
+                text = f"{name} as {self.names[name][0]}" if name in self.names else None
+            else:  # `import a.b` binds a
+                name = _dotted(alias.name).split(".")[0]
+                if name in self.names:
+                    raise _Refused(_dotted_import_message(name))
+                self.plan.bound.add(name)
+                return
+            self.plan.bound.add(name)
+            target = self.names.get(name)
+            if target is not None:
+                self._edit(node, text or target[0], 1, target[1])
+
+        def visit_FunctionDef(self, node: "cst.FunctionDef") -> None:
+            self.plan.bound.add(node.name.value)
+
+        def visit_ClassDef(self, node: "cst.ClassDef") -> None:
+            self.plan.bound.add(node.name.value)
+            for name in _class_members(node.body):
+                if name in self.names:
+                    raise _Refused(_class_member_message(name))
+
+        def visit_Param(self, node: "cst.Param") -> None:
+            if node.name.value in self.names:
+                raise _Refused(_parameter_message(node.name.value))
+
+        def visit_Attribute(self, node: "cst.Attribute") -> None:
+            self.skip.add(id(node.attr))
+
+        def visit_Arg(self, node: "cst.Arg") -> None:
+            if node.keyword is not None:
+                self.skip.add(id(node.keyword))
+
+        def visit_Call(self, node: "cst.Call") -> None:
+            target = self.calls.get(_dotted(node.func))
+            if target is not None:
+                self._edit(node.func, target[0], 0, target[1])
+                if target[1] == "print-to-logging":
+                    self._print_arguments(node)
+
+        def _print_arguments(self, node: "cst.Call") -> None:
+            line = self.get_metadata(PositionProvider, node).start.line
+            if any(arg.keyword is not None or arg.star for arg in node.args):
+                raise _print_refused(line)
+            after_open = self.get_metadata(PositionProvider, node.whitespace_before_args).start
+            first = self.get_metadata(PositionProvider, node.args[0]).start if node.args else None
+            _print_format(len(node.args), (after_open.line, after_open.column),
+                          first and (first.line, first.column), self.plan)
+
+        def visit_Name(self, node: "cst.Name") -> None:
+            target = self.names.get(node.value)
+            if target is not None and id(node) not in self.skip:
+                self._edit(node, target[0], 1, target[1])
+
+
+def _plan_libcst(code: str, transforms: Sequence) -> _Plan:
+    calls, names = _index(transforms)
+    plan = _Plan()
+    MetadataWrapper(cst.parse_module(code), unsafe_skip_copy=True).visit(_Collector(plan, calls, names))
+    return plan
+
+
+def _dotted(node) -> Optional[str]:
+    if isinstance(node, cst.Name):
+        return node.value
+    if isinstance(node, cst.Attribute):
+        base = _dotted(node.value)
+        return f"{base}.{node.attr.value}" if base is not None else None
+    return None
+
+
+def _class_members(body) -> Iterable[str]:
+    """Names that the statements directly in a class body define."""
+    for statement in body.body:
+        if isinstance(statement, (cst.FunctionDef, cst.ClassDef)):
+            yield statement.name.value
+            continue
+        for small in statement.body if isinstance(statement, cst.SimpleStatementLine) else (statement,):
+            targets = [t.target for t in small.targets] if isinstance(small, cst.Assign) else \
+                [small.target] if isinstance(small, cst.AnnAssign) else []
+            for target in targets:
+                if isinstance(target, cst.Name):
+                    yield target.value
+
+
+def _cst_kinds(statement, index: int, plan: _Plan) -> List[str]:
+    if not isinstance(statement, cst.SimpleStatementLine):
+        return ["other"]
+    kinds = []
+    for small in statement.body:
+        if isinstance(small, (cst.Import, cst.ImportFrom)):
+            kinds.append("import")
+            aliases = small.names if not isinstance(small.names, cst.ImportStar) else ()
+            for alias in aliases:
+                bound = alias.asname.name if alias.asname is not None else alias.name
+                if isinstance(bound, cst.Name) and bound.value == "logger":
+                    plan.has_logger = True
+                if isinstance(small, cst.Import) and alias.asname is None and \
+                        _dotted(alias.name).split(".")[0] == "logging":
+                    plan.imports_logging = True
+        elif isinstance(small, cst.Expr) and isinstance(small.value, (cst.SimpleString, cst.ConcatenatedString)) \
+                and index == 0 and len(statement.body) == 1:
+            kinds.append("docstring")
+        else:
+            targets = [t.target for t in small.targets] if isinstance(small, cst.Assign) else \
+                [small.target] if isinstance(small, cst.AnnAssign) else []
+            for target in targets:
+                if isinstance(target, cst.Name):
+                    plan.bound.add(target.value)
+                    if target.value == "logger":
+                        plan.has_logger = True
+            kinds.append("other")
+    return kinds
@@ -0,0 +1,266 @@
+"""
+Repository-wide review: every source file under a path or glob, in parallel.
+
+Files are grouped into batches of about BATCH_BYTES (a large file travels
+alone) and the batches are reviewed on a process pool. Each worker process
+builds one ReviewEngine, so chunks shared between files it reviews (license
+headers, generated code) are checked once per worker. Reviews are yielded
+file by file as their batch finishes, and review_repository() folds them
+into a RepoReport with counts per severity and per rule.
+
+Example:
+    >>> import os, tempfile
+    >>> root = tempfile.mkdtemp()
+    >>> with open(os.path.join(root, "app.py"), "w") as f:
+    ...     _ = f.write("print('hi')\\n")
+    >>> report = review_repository(root, workers=1)
+    >>> [(r.path, [f.rule for f in r.findings]) for r in report.files]
+    [('app.py', ['print-call'])]
+"""
+
+import glob
+import multiprocessing
+import os
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from review_engine import ReviewEngine, format_review
+
+# File extension -> language passed to ReviewEngine.review
+LANGUAGES = {
+    ".py": "python", ".pyi": "python",
+    ".js": "javascript", ".jsx": "javascript", ".mjs": "javascript",
+    ".ts": "typescript", ".tsx": "typescript",
+    ".go": "go", ".java": "java", ".kt": "kotlin", ".rb": "ruby", ".rs": "rust",
+    ".c": "c", ".h": "c", ".cc": "cpp", ".cpp": "cpp", ".hpp": "cpp", ".cs": "csharp",
+    ".php": "php", ".swift": "swift", ".scala": "scala", ".sh": "shell", ".sql": "sql",
+}
+
+# Directories never descended into when a directory is scanned
+SKIP_DIRS = {".git", ".hg", ".svn", "__pycache__", "node_modules", ".venv", "venv", ".tox", "build", "dist"}
+
+BATCH_BYTES = 256 * 1024
+MAX_FILE_BYTES = 1024 * 1024
+
+# Process pools here and in refactor_engine.py start workers from a fresh
+# interpreter: forking a process with other threads running (the MCP tools
+# call in from asyncio.to_thread) can deadlock
+MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+FileReview = namedtuple("FileReview", ["path", "language", "findings", "error"])
+RepoReport = namedtuple("RepoReport", ["target", "files", "by_severity", "by_rule", "errors", "elapsed"])
+
+
+def collect_files(target: str, root: Optional[str] = None, confine: bool = False) -> List[Tuple[str, str]]:
+    """
+    Resolve a file, directory or glob into (path, language) pairs, sorted by path.
+
+    Directories are walked recursively, skipping SKIP_DIRS and hidden
+    directories, and only files with a LANGUAGES extension are kept; a glob
+    (`src/**/*.py`) also keeps only those. A single file is always kept, as
+    "text" if its extension is unknown. Relative targets are taken relative to
+    root (default: the current directory).
+
+    With confine=True, for targets that come from an untrusted caller, the
+    target must resolve (following symlinks) to a path under root, and files
+    that resolve outside it are dropped.
+
+    Raises:
+        FileNotFoundError: If target is neither an existing path nor a glob.
+        ValueError: If confine is set and target is outside root.
+    """
+    root = os.path.abspath(root or os.getcwd())
+    path = os.path.join(root, os.path.expanduser(target))
+    real_root = os.path.realpath(root)
+    if confine:
+        # A glob is checked up to its first wildcard, and may not climb out with ".." after it
+        parts = path.split(os.sep)
+        magic = next((i for i, part in enumerate(parts) if glob.has_magic(part)), len(parts))
+        if not _within(os.sep.join(parts[:magic]) or os.sep, real_root) or ".." in parts[magic:]:
+            raise ValueError(f"{target} is outside {root}")
+
+    if os.path.isfile(path):
+        return [(path, LANGUAGES.get(os.path.splitext(path)[1].lower(), "text"))]
+    if os.path.isdir(path):
+        found = []
+        for directory, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+            found.extend(os.path.join(directory, name) for name in filenames)
+    elif glob.has_magic(target):
+        found = [p for p in glob.glob(path, recursive=True) if os.path.isfile(p)]
+        found = [p for p in found if SKIP_DIRS.isdisjoint(os.path.relpath(p, root).split(os.sep))]
+    else:
+        raise FileNotFoundError(f"no such file or directory: {target}")
+
+    files = []
+    for name in sorted(found):
+        language = LANGUAGES.get(os.path.splitext(name)[1].lower())
+        if language is not None and (not confine or _within(name, real_root)):
+            files.append((name, language))
+    return files
+
+
+def _within(path: str, real_root: str) -> bool:
+    return os.path.commonpath([os.path.realpath(path), real_root]) == real_root
+
+
+def iter_reviews(
+    target: str,
+    root: Optional[str] = None,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    confine: bool = False,
+) -> Iterator[FileReview]:
+    """
+    Review every file collect_files() finds, yielding each as it finishes.
+
+    Args:
+        target: File, directory or glob.
+        root: Base for a relative target (default: the current directory).
+        workers: Pool size (default os.cpu_count()); 1 reviews in this process.
+        executor: An existing executor to submit batches to instead of a new pool.
+        confine: Only review files under root (see collect_files()).
+
+    Yields FileReview records in completion order. Paths are relative to the
+    scanned directory (a single file's directory, or root for a glob).
+    """
+    root = os.path.abspath(root or os.getcwd())
+    files = collect_files(target, root, confine)
+    path = os.path.join(root, os.path.expanduser(target))
+    if os.path.isfile(path):
+        root = os.path.dirname(path)
+    elif os.path.isdir(path):
+        root = path
+    workers = workers or os.cpu_count() or 1
+    if executor is None and (workers == 1 or len(files) <= 1):
+        engine = ReviewEngine()
+        for path, language in files:
+            yield _review_file(engine, path, language, root)
+        return
+
+    batches = _batches(files)
+    own = executor is None
+    if own:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(batches)), mp_context=MP_CONTEXT)
+    try:
+        futures = [executor.submit(_review_batch, batch, root) for batch in batches]
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        if own:
+            executor.shutdown(cancel_futures=True)
+
+
+def review_repository(
+    target: str,
+    root: Optional[str] = None,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    on_file: Optional[Callable[[FileReview], None]] = None,
+    confine: bool = False,
+) -> RepoReport:
+    """
+    Review a repository and aggregate the results; see iter_reviews() for the arguments.
+
+    on_file, if given, is called with each FileReview as soon as it is ready.
+    The report lists files sorted by path.
+    """
+    started = time.perf_counter()
+    reviews = []
+    for review in iter_reviews(target, root, workers, executor, confine):
+        if on_file is not None:
+            on_file(review)
+        reviews.append(review)
+    reviews.sort(key=lambda review: review.path)
+
+    findings = [finding for review in reviews for finding in review.findings]
+    return RepoReport(
+        target=target,
+        files=reviews,
+        by_severity=dict(Counter(finding.severity for finding in findings)),
+        by_rule=dict(Counter(finding.rule for finding in findings).most_common()),
+        errors=sum(1 for review in reviews if review.error),
+        elapsed=time.perf_counter() - started,
+    )
+
+
+def report_as_dict(report: RepoReport) -> Dict:
+    """The report as JSON-ready data."""
+    return {
+        "target": report.target,
+        "files_reviewed": len(report.files),
+        "findings": sum(len(review.findings) for review in report.files),
+        "by_severity": report.by_severity,
+        "by_rule": report.by_rule,
+        "errors": report.errors,
+        "elapsed_s": round(report.elapsed, 3),
+        "files": [
+            {
+                "path": review.path,
+                "language": review.language,
+                "error": review.error,
+                "findings": [finding._asdict() for finding in review.findings],
+            }
+            for review in report.files
+            if review.findings or review.error
+        ],
+    }
+
+
+def format_report(report: RepoReport) -> str:
+    """Render a report as text: a summary line, then each file with findings."""
+    total = sum(len(review.findings) for review in report.files)
+    severities = ", ".join(f"{count} {severity}" for severity, count in sorted(report.by_severity.items()))
+    lines = [f"Reviewed {len(report.files)} files under {report.target} in {report.elapsed:.2f}s: "
+             f"{total} findings" + (f" ({severities})" if severities else "")]
+    for review in report.files:
+        if review.error:
+            lines.append(f"\n{review.path}: {review.error}")
+        elif review.findings:
+            lines.append(f"\n{review.path}\n" + format_review(review.findings, review.language).split("\n", 1)[1])
+    return "\n".join(lines)
+
+
+def _batches(files: Sequence[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    batches: List[List[Tuple[str, str]]] = []
+    size = BATCH_BYTES
+    for path, language in files:
+        try:
+            file_size = os.path.getsize(path)
+        except OSError:
+            file_size = 0
+        if size + file_size > BATCH_BYTES:
+            batches.append([])
+            size = 0
+        batches[-1].append((path, language))
+        size += file_size
+    return batches
+
+
+# One engine per worker process, created on its first batch
+_engine: Optional[ReviewEngine] = None
+
+
+def _review_batch(batch: List[Tuple[str, str]], root: str) -> List[FileReview]:
+    global _engine
+    if _engine is None:
+        _engine = ReviewEngine()
+    return [_review_file(_engine, path, language, root) for path, language in batch]
+
+
+def _review_file(engine: ReviewEngine, path: str, language: str, root: str) -> FileReview:
+    relative = os.path.relpath(path, root)
+    try:
+        if os.path.getsize(path) > MAX_FILE_BYTES:
+            return FileReview(relative, language, [], f"skipped: larger than {MAX_FILE_BYTES:,} bytes")
+        with open(path, encoding="utf-8", errors="replace") as f:
+            code = f.read()
+    except OSError as e:
+        return FileReview(relative, language, [], f"unreadable: {e.strerror or e}")
+    if "\0" in code:
+        return FileReview(relative, language, [], "skipped: binary file")
+    return FileReview(relative, language, engine.review(code, language), None)
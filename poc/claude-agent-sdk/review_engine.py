@@ -0,0 +1,440 @@
+"""
+Incremental code-review engine behind the code_review MCP tool.
+
+Python code is first cut into chunks before every column-0 `def`, `class`
+or decorator. A chunk whose text was reviewed before is answered from the
+cache without parsing; only changed chunks are parsed with `ast`. If a chunk
+does not parse on its own (the cut fell inside a string, say), the whole
+module is parsed instead.
+
+A parsed chunk is split into review units:
+
+- each top-level function, and each method of a top-level class
+- each class, minus its methods (header, decorators, class attributes)
+- each run of other top-level statements (imports, constants, scripts)
+
+Blank and comment lines belong to the unit that follows them, so the units
+cover every line. A unit is checked by one walk over its nodes in which
+every registered rule for the node's type runs, plus one `tokenize` pass
+over its text for comment rules. Findings of chunks and units are cached
+under a hash of their text with line positions stored relative to them, so
+after an edit only the changed units are re-checked, even when the edit
+shifted every line below it. An unchanged file is answered from a
+whole-file cache.
+
+Rule packs (see rule_packs.py) add literal and regex rules loaded from
+JSON. All of a registry's pack rules are compiled into one pattern per
+language and run over each unit's lines in a single pass, so their cost
+stays flat as packs grow. DEFAULT_RULES loads review_checklist.json.
+
+Other languages fall back to a line scan for print calls and TODO markers,
+plus the pack rules that apply to them.
+
+Example:
+    >>> engine = ReviewEngine()
+    >>> [(f.rule, f.line) for f in engine.review("x = 1\\nprint(x)  # TODO: remove\\n")]
+    [('print-call', 2), ('todo-comment', 2)]
+    >>> engine.review("x = 1\\nprint(x)  # TODO: remove\\n") == engine.review("x = 1\\nprint(x)  # TODO: remove\\n")
+    True
+"""
+
+import ast
+import hashlib
+import io
+import os
+import threading
+import tokenize
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rule_packs import RuleMatcher, RulePack, compile_rules, load_pack
+
+Finding = namedtuple("Finding", ["rule", "line", "col", "message", "severity"])
+
+ReviewStats = namedtuple(
+    "ReviewStats",
+    ["files", "files_cached", "units", "units_checked", "units_cached", "entries"],
+)
+
+NodeRule = namedtuple("NodeRule", ["id", "severity", "check"])
+CommentRule = namedtuple("CommentRule", ["id", "severity", "check"])
+
+SEVERITIES = ("error", "warning", "info")
+
+
+class RuleRegistry:
+    """
+    Rules grouped by the AST node type they inspect.
+
+    A node rule receives one node and returns a message, or None when the
+    node is fine. A comment rule receives the text of one comment token.
+    Rule packs are matched against source lines. Every registration bumps
+    `version`, which is part of the cache key, so adding a rule invalidates
+    cached results.
+    """
+
+    def __init__(self):
+        self._node_rules: Dict[type, List[NodeRule]] = {}
+        self._comment_rules: List[CommentRule] = []
+        self._packs: List[RulePack] = []
+        self._matchers: Dict[str, RuleMatcher] = {}
+        self.version = 0
+
+    def node_rule(self, rule_id: str, *node_types: type, severity: str = "warning"):
+        """Decorator registering `check(node) -> Optional[str]` for the given node types."""
+        if severity not in SEVERITIES:
+            raise ValueError(f"severity must be one of {SEVERITIES}")
+
+        def register(check: Callable[[ast.AST], Optional[str]]):
+            for node_type in node_types:
+                self._node_rules.setdefault(node_type, []).append(NodeRule(rule_id, severity, check))
+            self.version += 1
+            return check
+
+        return register
+
+    def comment_rule(self, rule_id: str, severity: str = "info"):
+        """Decorator registering `check(comment_text) -> Optional[str]`."""
+        if severity not in SEVERITIES:
+            raise ValueError(f"severity must be one of {SEVERITIES}")
+
+        def register(check: Callable[[str], Optional[str]]):
+            self._comment_rules.append(CommentRule(rule_id, severity, check))
+            self.version += 1
+            return check
+
+        return register
+
+    def add_pack(self, pack: RulePack) -> RulePack:
+        """Register a rule pack (from rule_packs.load_pack)."""
+        self._packs.append(pack)
+        self._matchers = {}
+        self.version += 1
+        return pack
+
+    def matcher(self, language: str) -> RuleMatcher:
+        """The pack rules that apply to `language`, compiled into one pattern (built once)."""
+        language = language.lower()
+        matcher = self._matchers.get(language)
+        if matcher is None:
+            matcher = compile_rules((rule for pack in self._packs for rule in pack.rules), language)
+            self._matchers[language] = matcher
+        return matcher
+
+    @property
+    def rule_ids(self) -> List[str]:
+        ids = {rule.id for rules in self._node_rules.values() for rule in rules}
+        ids.update(rule.id for rule in self._comment_rules)
+        ids.update(rule.id for pack in self._packs for rule in pack.rules)
+        return sorted(ids)
+
+
+DEFAULT_RULES = RuleRegistry()
+
+
+@DEFAULT_RULES.node_rule("print-call", ast.Call)
+def _print_call(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name) and node.func.id == "print":
+        return "Consider using logging instead of print statements"
+    return None
+
+
+@DEFAULT_RULES.node_rule("bare-except", ast.ExceptHandler)
+def _bare_except(node: ast.ExceptHandler) -> Optional[str]:
+    if node.type is None:
+        return "Bare except also catches KeyboardInterrupt and SystemExit; name the exception"
+    return None
+
+
+@DEFAULT_RULES.node_rule("mutable-default", ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+def _mutable_default(node) -> Optional[str]:
+    defaults = list(node.args.defaults) + [d for d in node.args.kw_defaults if d is not None]
+    if any(isinstance(d, (ast.List, ast.Dict, ast.Set, ast.ListComp, ast.DictComp, ast.SetComp)) for d in defaults):
+        return "Mutable default argument is shared between calls; default to None"
+    return None
+
+
+@DEFAULT_RULES.node_rule("eval-exec", ast.Call, severity="error")
+def _eval_exec(node: ast.Call) -> Optional[str]:
+    if isinstance(node.func, ast.Name) and node.func.id in ("eval", "exec"):
+        return f"Avoid {node.func.id}() on dynamic input"
+    return None
+
+
+@DEFAULT_RULES.comment_rule("todo-comment")
+def _todo_comment(text: str) -> Optional[str]:
+    if "TODO" in text or "FIXME" in text:
+        return "Found TODO comment - needs implementation"
+    return None
+
+
+DEFAULT_RULES.add_pack(load_pack(os.path.join(os.path.dirname(os.path.abspath(__file__)), "review_checklist.json")))
+
+
+class _Unit:
+    """A reviewable slice of a module: root nodes, skipped subtrees and the lines it owns."""
+
+    __slots__ = ("nodes", "skip", "lines")
+
+    def __init__(self, nodes: Sequence[ast.AST], lines: List[int], skip: Sequence[ast.AST] = ()):
+        self.nodes = nodes
+        self.skip = {id(node) for node in skip}
+        self.lines = lines
+
+
+class ReviewEngine:
+    """
+    Reviews code with a rule registry, caching findings per unit.
+
+    Args:
+        registry: The rules to run (DEFAULT_RULES by default).
+        max_units: Maximum number of cached units (least recently used are dropped).
+        max_files: Maximum number of whole files cached by content.
+    """
+
+    def __init__(self, registry: RuleRegistry = DEFAULT_RULES, max_units: int = 200_000, max_files: int = 1024):
+        if max_units <= 0 or max_files <= 0:
+            raise ValueError("cache sizes must be positive")
+        self.registry = registry
+        self.max_units = max_units
+        self.max_files = max_files
+        # unit key -> findings as (rule, line index within the unit, col, message, severity)
+        self._units: "OrderedDict[str, Tuple[Tuple, ...]]" = OrderedDict()
+        self._files: "OrderedDict[str, Tuple[Finding, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(("files", "files_cached", "units", "units_checked", "units_cached"), 0)
+
+    def review(self, code: str, language: str = "python") -> List[Finding]:
+        """Return the findings for `code`, sorted by position."""
+        file_key = _digest(f"{self.registry.version}\0{language}\0{code}")
+        with self._lock:
+            self._counts["files"] += 1
+            cached = self._files.get(file_key)
+            if cached is not None:
+                self._files.move_to_end(file_key)
+                self._counts["files_cached"] += 1
+                return list(cached)
+
+        if language.lower() == "python":
+            findings = self._review_python(code)
+        else:
+            findings = _review_plain(code) + _pack_findings(self.registry.matcher(language), code.splitlines())
+        findings.sort(key=lambda f: (f.line, f.col, f.rule))
+
+        with self._lock:
+            self._files[file_key] = tuple(findings)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+        return findings
+
+    def _review_python(self, code: str) -> List[Finding]:
+        # Split only where the parser counts lines (str.splitlines also splits on \f, \x1c, ...)
+        lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+
+        findings: List[Finding] = []
+        for start, end in _chunks(lines):
+            chunk = lines[start:end]
+            key = _digest(f"{self.registry.version}\0chunk\0" + "\n".join(chunk))
+            cached = self._lookup(key)
+            if cached is None:
+                try:
+                    tree = ast.parse("\n".join(chunk))
+                except SyntaxError:
+                    # The textual split landed inside a statement (or the code is invalid)
+                    return self._review_module(code, lines)
+                cached = self._review_tree(tree, chunk)
+                self._store(key, cached)
+            findings.extend(Finding(rule, start + line, col, message, severity)
+                            for rule, line, col, message, severity in cached)
+        return findings
+
+    def _review_module(self, code: str, lines: List[str]) -> List[Finding]:
+        """Review a whole module from one parse; used when chunking does not apply."""
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            findings = [Finding("syntax-error", e.lineno or 1, max((e.offset or 1) - 1, 0),
+                                f"Syntax error: {e.msg}", "error")]
+            findings += [f for f in _review_plain(code) if f.rule == "todo-comment"]
+            return findings + _pack_findings(self.registry.matcher("python"), lines)
+        return [Finding(*finding) for finding in self._review_tree(tree, lines)]
+
+    def _review_tree(self, tree: ast.Module, lines: List[str]) -> Tuple[Tuple, ...]:
+        """Findings for a parsed module as (rule, line, col, message, severity), reusing cached units."""
+        findings = []
+        for unit in _split_units(tree, len(lines)):
+            key = _digest(f"{self.registry.version}\0unit\0" + "\n".join(lines[line - 1] for line in unit.lines))
+            cached = self._lookup(key)
+            if cached is None:
+                cached = self._check_unit(unit, lines)
+                self._store(key, cached)
+                with self._lock:
+                    self._counts["units"] += 1
+                    self._counts["units_checked"] += 1
+            findings.extend((rule, unit.lines[index], col, message, severity)
+                            for rule, index, col, message, severity in cached)
+        return tuple(findings)
+
+    def _lookup(self, key: str) -> Optional[Tuple[Tuple, ...]]:
+        with self._lock:
+            cached = self._units.get(key)
+            if cached is not None:
+                self._units.move_to_end(key)
+                self._counts["units"] += 1
+                self._counts["units_cached"] += 1
+            return cached
+
+    def _store(self, key: str, findings: Tuple[Tuple, ...]) -> None:
+        with self._lock:
+            self._units[key] = findings
+            while len(self._units) > self.max_units:
+                self._units.popitem(last=False)
+
+    def _check_unit(self, unit: _Unit, source_lines: List[str]) -> Tuple[Tuple, ...]:
+        """Run every rule over one unit; positions are relative to the unit's lines."""
+        index_of = {line: index for index, line in enumerate(unit.lines)}
+        node_rules = self.registry._node_rules
+        results = []
+
+        stack = list(reversed(unit.nodes))
+        while stack:
+            node = stack.pop()
+            for rule in node_rules.get(type(node), ()):
+                message = rule.check(node)
+                if message is not None:
+                    results.append((rule.id, index_of[node.lineno], node.col_offset, message, rule.severity))
+            stack.extend(child for child in ast.iter_child_nodes(node) if id(child) not in unit.skip)
+
+        unit_lines = [source_lines[line - 1] for line in unit.lines]
+        # tokenize is pure Python and the slowest step; a unit without "#" has no comments
+        if self.registry._comment_rules and any("#" in line for line in unit_lines):
+            for index, col, comment in _comments(unit_lines):
+                for rule in self.registry._comment_rules:
+                    message = rule.check(comment)
+                    if message is not None:
+                        results.append((rule.id, index, col, message, rule.severity))
+
+        for index, col, rule in self.registry.matcher("python").scan(unit_lines):
+            results.append((rule.id, index, col, rule.message, rule.severity))
+        return tuple(results)
+
+    def stats(self) -> ReviewStats:
+        """Return file/unit counters and the number of cached units."""
+        with self._lock:
+            return ReviewStats(entries=len(self._units), **self._counts)
+
+    def cache_clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._units.clear()
+            self._files.clear()
+            self._counts = dict.fromkeys(self._counts, 0)
+
+
+# A top-level def or class (or its first decorator) starts a new chunk
+_CHUNK_STARTS = ("def ", "async def ", "class ", "@")
+
+
+def _chunks(lines: List[str]) -> List[Tuple[int, int]]:
+    """Cut source lines before each column-0 def, class or decorator; returns (start, end) slices."""
+    starts = [0]
+    previous = ""
+    for index, line in enumerate(lines):
+        if index and line.startswith(_CHUNK_STARTS) and not previous.startswith("@"):
+            starts.append(index)
+        if line.strip():
+            previous = line
+    return list(zip(starts, starts[1:] + [len(lines)]))
+
+
+def _split_units(tree: ast.Module, line_count: int) -> Iterator[_Unit]:
+    """Partition a module's lines into review units (see the module docstring)."""
+    previous_end = 0
+    pending: List[ast.stmt] = []
+
+    def flush(end: int) -> Iterator[_Unit]:
+        nonlocal previous_end
+        if pending:
+            yield _Unit(list(pending), list(range(previous_end + 1, end + 1)))
+            pending.clear()
+            previous_end = end
+
+    for stmt in tree.body:
+        if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            yield from flush(_start(stmt) - 1)
+            span = list(range(previous_end + 1, stmt.end_lineno + 1))
+            previous_end = stmt.end_lineno
+            if isinstance(stmt, ast.ClassDef):
+                methods = [node for node in stmt.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))]
+                owned = set()
+                for method in methods:
+                    method_lines = list(range(_start(method), method.end_lineno + 1))
+                    owned.update(method_lines)
+                    yield _Unit([method], method_lines)
+                yield _Unit([stmt], [line for line in span if line not in owned], skip=methods)
+            else:
+                yield _Unit([stmt], span)
+        else:
+            # Runs of plain statements form one unit, ended by a def, a class or the module end
+            pending.append(stmt)
+            if stmt is tree.body[-1]:
+                yield from flush(stmt.end_lineno)
+    if previous_end < line_count:
+        # Trailing comments and blank lines
+        yield _Unit([], list(range(previous_end + 1, line_count + 1)))
+
+
+def _start(node: ast.AST) -> int:
+    """First line of a definition, including its decorators."""
+    decorators = getattr(node, "decorator_list", ())
+    return min([node.lineno] + [d.lineno for d in decorators])
+
+
+def _comments(lines: List[str]) -> Iterator[Tuple[int, int, str]]:
+    """Yield (line index, col, text) for each comment in a slice of source lines."""
+    indent = min((len(line) - len(line.lstrip()) for line in lines if line.strip()), default=0)
+    text = "\n".join(line[indent:] for line in lines) + "\n"
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(text).readline):
+            if token.type == tokenize.COMMENT:
+                yield token.start[0] - 1, token.start[1] + indent, token.string
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        # A slice that does not tokenize on its own: fall back to whole-line comments
+        for index, line in enumerate(lines):
+            stripped = line.lstrip()
+            if stripped.startswith("#"):
+                yield index, len(line) - len(stripped), stripped
+
+
+def _review_plain(code: str) -> List[Finding]:
+    """Line scan used for non-Python code (and TODOs in unparsable Python)."""
+    findings = []
+    for line_number, line in enumerate(code.splitlines(), 1):
+        if "print" in line.lower():
+            findings.append(Finding("print-call", line_number, line.lower().index("print"),
+                                    "Consider using logging instead of print statements", "warning"))
+        if "TODO" in line:
+            findings.append(Finding("todo-comment", line_number, line.index("TODO"),
+                                    "Found TODO comment - needs implementation", "info"))
+    return findings
+
+
+def _pack_findings(matcher: RuleMatcher, lines: List[str]) -> List[Finding]:
+    return [Finding(rule.id, index + 1, col, rule.message, rule.severity)
+            for index, col, rule in matcher.scan(lines)]
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=16).hexdigest()
+
+
+def format_review(findings: Iterable[Finding], language: str = "python") -> str:
+    """Render findings in the code_review tool's text format."""
+    findings = list(findings)
+    if not findings:
+        return f"Code review for {language}: No issues found!"
+    return f"Code review for {language}:\n" + "\n".join(
+        f"- line {f.line}: {f.message} [{f.rule}]" for f in findings
+    )
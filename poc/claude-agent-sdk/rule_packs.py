@@ -0,0 +1,306 @@
+"""
+Rule packs for the review engine: JSON rule files compiled into one matcher.
+
+A pack is a JSON object:
+
+    {
+      "name": "review-checklist",
+      "version": 1,
+      "rules": [
+        {"id": "sql-concat", "kind": "regex",
+         "pattern": "(?i)\\\\b(select|insert|update|delete)\\\\b.*[\\"']\\\\s*\\\\+",
+         "message": "Build SQL with parameterized queries", "severity": "error"},
+        {"id": "pdb-trace", "kind": "literal", "pattern": "pdb.set_trace(",
+         "message": "Remove debugger breakpoint", "languages": ["python"]}
+      ]
+    }
+
+`kind` is "literal" (default) or "regex", `severity` is "error", "warning"
+(default) or "info", `ignore_case` defaults to false and `languages` to
+every language. Rules match raw source lines, strings and comments included,
+so they can catch hard-coded secrets.
+
+compile_rules() merges the rules into two regular expressions, one for the
+case-sensitive rules and one for the ignore-case ones, so a file is scanned
+twice at most however many rules there are. Literals are folded into a trie
+(`pass(?:word...|...)`), which costs the same per character for ten or a
+thousand of them; each literal ends in an empty named group, and
+`match.lastgroup` tells which one matched. (The two tries stay apart because
+an alternation reports only one branch at a position.) A regex alternation
+would not scale the same way (`re` tries every branch at every position), so
+each regex rule is instead represented in the trie by literals that any of
+its matches must contain, read off its parse tree: `\\bpickle\\.loads?\\(`
+by "pickle.load", `(select|delete)\\b.*\\+` by "select" and "delete". Only
+lines where such an anchor occurs are searched with the rule's regex. The
+few regexes without an anchor of MIN_ANCHOR characters are run on their own,
+line by line.
+
+Scanning restarts one character after each match start, and a trie match
+also reports the literals that are prefixes of it, so every rule matching a
+line is reported, once, at its first column. Rules match one line at a time.
+"""
+
+import json
+import os
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# Regex anchors are read off the parse tree of CPython's re module, which is
+# internal and changes between versions; without it every regex rule is
+# simply scanned on its own
+try:  # Python 3.11+
+    from re import _constants, _parser
+except ImportError:
+    try:
+        import sre_constants as _constants
+        import sre_parse as _parser
+    except ImportError:
+        _constants = _parser = None
+
+KINDS = ("literal", "regex")
+SEVERITIES = ("error", "warning", "info")
+
+PackRule = namedtuple("PackRule", ["id", "kind", "pattern", "message", "severity", "ignore_case", "languages"])
+RulePack = namedtuple("RulePack", ["name", "version", "rules"])
+
+# A regex rule is prefiltered by its literals only when the shortest has at least this many characters
+MIN_ANCHOR = 3
+
+_REPEATS = tuple(
+    getattr(_constants, name) for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") if hasattr(_constants, name)
+) if _constants is not None else ()
+
+# (rule, regex to confirm on the line, or None for a literal rule)
+_Target = Tuple[PackRule, Optional["re.Pattern[str]"]]
+
+
+def load_pack(source: Union[str, os.PathLike, Mapping[str, Any]]) -> RulePack:
+    """
+    Load and validate a rule pack from a JSON file or an already-parsed dict.
+
+    Raises:
+        ValueError: If the pack or any rule is malformed; the message names the rule.
+    """
+    if isinstance(source, Mapping):
+        data = source
+    else:
+        with open(source, encoding="utf-8") as f:
+            data = json.load(f)
+
+    if not isinstance(data, Mapping) or not isinstance(data.get("rules"), list):
+        raise ValueError("a rule pack must be an object with a 'rules' list")
+    rules = []
+    seen = set()
+    for index, raw in enumerate(data["rules"]):
+        rule = _parse_rule(raw, index)
+        if rule.id in seen:
+            raise ValueError(f"duplicate rule id {rule.id!r}")
+        seen.add(rule.id)
+        rules.append(rule)
+    return RulePack(data.get("name", "unnamed"), data.get("version", 1), tuple(rules))
+
+
+def _parse_rule(raw: Any, index: int) -> PackRule:
+    if not isinstance(raw, Mapping) or not raw.get("id") or not raw.get("pattern") or not raw.get("message"):
+        raise ValueError(f"rule #{index} needs non-empty 'id', 'pattern' and 'message'")
+    rule_id = raw["id"]
+    kind = raw.get("kind", "literal")
+    severity = raw.get("severity", "warning")
+    pattern = raw["pattern"]
+    ignore_case = bool(raw.get("ignore_case", False))
+    languages = raw.get("languages")
+    if kind not in KINDS:
+        raise ValueError(f"rule {rule_id!r}: kind must be one of {KINDS}")
+    if severity not in SEVERITIES:
+        raise ValueError(f"rule {rule_id!r}: severity must be one of {SEVERITIES}")
+    if languages is not None:
+        languages = tuple(language.lower() for language in languages)
+
+    if kind == "regex":
+        # A leading (?i) cannot stay global once the rule is embedded in the combined pattern
+        if pattern.startswith("(?i)"):
+            pattern, ignore_case = pattern[4:], True
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"rule {rule_id!r}: invalid regex: {e}") from None
+        if compiled.match(""):
+            raise ValueError(f"rule {rule_id!r}: pattern matches the empty string")
+        if re.search(r"\\[1-9]|\(\?P=", pattern):
+            raise ValueError(f"rule {rule_id!r}: backreferences are not supported")
+    return PackRule(rule_id, kind, pattern, raw["message"], severity, ignore_case, languages)
+
+
+class RuleMatcher:
+    """A compiled set of pack rules; see compile_rules()."""
+
+    def __init__(
+        self,
+        patterns: List["re.Pattern[str]"],
+        groups: Dict[str, List[_Target]],
+        unanchored: List[_Target],
+    ):
+        self.patterns = patterns
+        self._groups = groups
+        self._unanchored = unanchored
+
+    def __len__(self) -> int:
+        rules = {target[0].id for targets in self._groups.values() for target in targets}
+        return len(rules) + len(self._unanchored)
+
+    def scan(self, lines: List[str]) -> List[Tuple[int, int, PackRule]]:
+        """Return (line index, col, rule) for each rule matching each line, at its first column."""
+        if not lines:
+            return []
+        text = "\n".join(lines)
+        starts = [0]
+        for line in lines[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+
+        found = []
+        seen = set()
+        for pattern in self.patterns:
+            search = pattern.search
+            match = search(text)
+            while match is not None:
+                start = match.start()
+                line = bisect_right(starts, start) - 1
+                for rule, verify in self._groups[match.lastgroup]:
+                    if (rule.id, line) in seen:
+                        continue
+                    seen.add((rule.id, line))
+                    if verify is None:
+                        found.append((line, start - starts[line], rule))
+                    else:
+                        # The anchor is on this line; confirm the whole rule against it
+                        confirmed = verify.search(lines[line])
+                        if confirmed is not None:
+                            found.append((line, confirmed.start(), rule))
+                match = search(text, start + 1)
+
+        for rule, regex in self._unanchored:
+            for index, line in enumerate(lines):
+                match = regex.search(line)
+                if match is not None:
+                    found.append((index, match.start(), rule))
+        found.sort(key=lambda item: (item[0], item[1]))
+        return found
+
+
+def compile_rules(rules: Iterable[PackRule], language: Optional[str] = None) -> RuleMatcher:
+    """
+    Merge rules into one single-pass matcher.
+
+    Args:
+        rules: Pack rules, e.g. from one or more load_pack() results.
+        language: Keep only rules that apply to this language (None keeps all).
+    """
+    if language is not None:
+        language = language.lower()
+        rules = [rule for rule in rules if rule.languages is None or language in rule.languages]
+
+    # (ignore_case, literal) -> rules to report, or regexes to confirm, when the literal is seen
+    words: Dict[Tuple[bool, str], List[_Target]] = {}
+    unanchored: List[_Target] = []
+    for rule in rules:
+        if rule.kind == "literal":
+            words.setdefault(_word(rule.ignore_case, rule.pattern), []).append((rule, None))
+            continue
+        regex = re.compile(rule.pattern, re.IGNORECASE if rule.ignore_case else 0)
+        anchors = _regex_anchors(rule.pattern, rule.ignore_case)
+        if anchors is None or min(map(len, anchors)) < MIN_ANCHOR:
+            unanchored.append((rule, regex))
+            continue
+        for anchor in anchors:
+            words.setdefault(_word(rule.ignore_case, anchor), []).append((rule, regex))
+
+    groups: Dict[str, List[_Target]] = {}
+    tries: Dict[bool, List[Tuple[str, str]]] = {False: [], True: []}
+    for (ignore_case, word), targets in words.items():
+        name = f"r{len(groups)}"
+        # The trie reports the longest literal at a position; shorter ones that are its prefixes matched too
+        groups[name] = [target for end in range(1, len(word)) for target in words.get((ignore_case, word[:end]), ())]
+        groups[name] += targets
+        tries[ignore_case].append((word, name))
+
+    patterns = [
+        re.compile(_trie_pattern(words), re.IGNORECASE if ignore_case else 0)
+        for ignore_case, words in tries.items() if words
+    ]
+    return RuleMatcher(patterns, groups, unanchored)
+
+
+def _word(ignore_case: bool, literal: str) -> Tuple[bool, str]:
+    return ignore_case, literal.lower() if ignore_case else literal
+
+
+def _regex_anchors(pattern: str, ignore_case: bool) -> Optional[Tuple[str, ...]]:
+    """_anchors() of a pattern, or None if its parse tree is not in the shape _anchors() expects."""
+    if _parser is None:
+        return None
+    try:
+        anchors = _anchors(_parser.parse(pattern), ignore_case)
+    except Exception:
+        return None
+    if anchors is None or not anchors or not all(isinstance(anchor, str) and anchor for anchor in anchors):
+        return None
+    return anchors
+
+
+def _anchors(items, ignore_case: bool) -> Optional[Tuple[str, ...]]:
+    """
+    Literals of which every match of a parsed regex contains at least one.
+
+    Looks at literal runs, mandatory groups and repeats, and alternations whose
+    branches all have anchors; picks the candidate whose shortest literal is
+    longest. Returns None when nothing qualifies.
+    """
+    best: Optional[Tuple[str, ...]] = None
+
+    def consider(candidate: Optional[Tuple[str, ...]]) -> None:
+        nonlocal best
+        if candidate and (best is None or min(map(len, candidate)) > min(map(len, best))):
+            best = candidate
+
+    run: List[str] = []
+    for op, av in items:
+        if op == _constants.LITERAL:
+            run.append(chr(av))
+            continue
+        consider(("".join(run),) if run else None)
+        run = []
+        if op == _constants.SUBPATTERN:
+            _, add_flags, _, sub = av
+            if not add_flags & re.IGNORECASE or ignore_case:
+                consider(_anchors(sub, ignore_case))
+        elif op in _REPEATS and av[0] >= 1:
+            consider(_anchors(av[2], ignore_case))
+        elif op == _constants.BRANCH:
+            branches = [_anchors(branch, ignore_case) for branch in av[1]]
+            if all(branches):
+                consider(tuple(sorted({anchor for branch in branches for anchor in branch})))
+    consider(("".join(run),) if run else None)
+    return best
+
+
+def _trie_pattern(words: List[Tuple[str, str]]) -> str:
+    """Regex for a set of (literal, marker group) pairs, sharing common prefixes."""
+    trie: Dict[str, Any] = {}
+    for word, name in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = name
+    return _emit(trie)
+
+
+def _emit(node: Dict[str, Any]) -> str:
+    # Longer continuations first so "password" is preferred over "pass"
+    alternatives = [re.escape(char) + _emit(child) for char, child in sorted(node.items()) if char]
+    if "" in node:
+        alternatives.append(f"(?P<{node['']}>)")
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
@@ -0,0 +1,67 @@
+"""
+Test suite for bench_fibonacci_suite.py.
+
+Covers the baseline comparison and report validation; timings themselves are
+not asserted.
+"""
+
+import json
+
+import pytest
+
+from bench_fibonacci_suite import FORMAT, VERSION, Case, compare, load_report, measure
+
+
+def report(**medians):
+    return {"format": FORMAT, "version": VERSION, "meta": {},
+            "results": {name: {"median_ns": ns} for name, ns in medians.items()}}
+
+
+class TestCompare:
+    """Test suite for compare()."""
+
+    def test_statuses(self):
+        """Test the regression, improvement, ok and new classifications."""
+        baseline = report(slow=100.0, fast=100.0, same=100.0)
+        current = report(slow=125.0, fast=50.0, same=105.0, added=10.0)
+
+        rows = {row["name"]: row for row in compare(current, baseline, threshold=0.10)}
+
+        assert rows["slow"]["status"] == "regression"
+        assert rows["slow"]["ratio"] == pytest.approx(1.25)
+        assert rows["fast"]["status"] == "improvement"
+        assert rows["same"]["status"] == "ok"
+        assert rows["added"]["status"] == "new"
+
+    def test_threshold_is_configurable(self):
+        """Test that a looser threshold accepts the same slowdown."""
+        rows = compare(report(case=125.0), report(case=100.0), threshold=0.30)
+        assert rows[0]["status"] == "ok"
+
+
+class TestReports:
+    """Test suite for measure() and load_report()."""
+
+    def test_measure_resets_cold_cases_and_primes_warm_cases(self):
+        """Test that reset runs before every call and prime exactly once."""
+        calls = {"func": 0, "reset": 0, "prime": 0}
+
+        def bump(key):
+            return lambda: calls.__setitem__(key, calls[key] + 1)
+
+        result = measure(Case("x/cold/small", bump("func"), reset=bump("reset")), rounds=3, warmup=1, min_round_ns=0)
+        assert calls["reset"] == calls["func"] == 5  # calibration + warmup + rounds
+        assert result["rounds"] == 3 and result["median_ns"] >= 0
+
+        measure(Case("x/warm/small", bump("func"), prime=bump("prime")), rounds=3, warmup=1, min_round_ns=0)
+        assert calls["prime"] == 1
+
+    def test_load_report_rejects_other_files(self, tmp_path):
+        """Test that only suite reports are accepted as baselines."""
+        path = tmp_path / "baseline.json"
+        path.write_text(json.dumps(report(case=1.0)))
+        assert load_report(path)["results"]["case"]["median_ns"] == 1.0
+
+        path.write_text(json.dumps({"format": "other"}))
+        with pytest.raises(ValueError, match="not a fibonacci-bench report"):
+            load_report(path)
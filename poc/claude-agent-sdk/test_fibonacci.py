@@ -1,22 +1,35 @@
 """
 Comprehensive test suite for fibonacci.py module.
 
-This test suite covers all three implementations of the Fibonacci sequence:
+This test suite covers all implementations of the Fibonacci sequence:
 - fibonacci_manual_memo: Manual memoization approach
 - fibonacci_lru: LRU cache decorator approach
 - fibonacci_iterative: Iterative approach
+- fibonacci_fast_doubling: O(log n) fast-doubling approach
+- fibonacci_many: batch API over many indices
+- fibonacci_range / fibonacci_chunks: streaming sequence generators
+- fibonacci_mod / fibonacci_mod_many: values modulo m
 
 Tests include edge cases, normal cases, error handling, and performance validation.
 """
 
 import pytest
-import time
 from fibonacci import (
+    FAST_DOUBLING_THRESHOLD,
+    LRU_MAXSIZE,
     fibonacci_manual_memo,
     fibonacci_lru,
     fibonacci_iterative,
+    fibonacci_fast_doubling,
+    fibonacci_many,
+    fibonacci_range,
+    fibonacci_chunks,
+    fibonacci_mod,
+    fibonacci_mod_many,
+    pisano_period,
     fibonacci
 )
+from fibonacci import _pisano_table
 
 
 class TestFibonacciManualMemo:
@@ -173,6 +186,53 @@ class TestFibonacciLRU:
             assert isinstance(result, int)
 
 
+class TestRecursionFreeMemoization:
+    """Test that the memoized implementations handle n far past the recursion limit."""
+
+    def setup_method(self):
+        """Clear LRU cache before each test."""
+        fibonacci_lru.cache_clear()
+
+    def test_lru_cold_large_n(self):
+        """Test a cold fibonacci_lru call that used to raise RecursionError."""
+        assert fibonacci_lru(5000) == fibonacci_iterative(5000)
+        assert fibonacci_lru.cache_info().currsize == 5001
+
+    def test_manual_memo_cold_large_n(self):
+        """Test a cold fibonacci_manual_memo call that used to raise RecursionError."""
+        memo = {}
+
+        assert fibonacci_manual_memo(5000, memo) == fibonacci_iterative(5000)
+        assert len(memo) == 4999
+
+    def test_manual_memo_with_sparse_memo(self):
+        """Test that a memo with gaps is extended from a complete pair of entries."""
+        memo = {19: 4181, 20: 6765, 23: 28657}
+
+        assert fibonacci_manual_memo(25, memo) == 75025
+        assert memo[21] == 10946
+        assert len(memo) == 7
+
+    def test_cache_info_shape(self):
+        """Test that cache_info mirrors functools.lru_cache's named tuple."""
+        fibonacci_lru(10)
+        fibonacci_lru(5)
+
+        info = fibonacci_lru.cache_info()
+        assert (info.hits, info.misses, info.maxsize, info.currsize) == (1, 11, LRU_MAXSIZE, 11)
+
+    def test_lru_table_is_bounded(self):
+        """Test that n past LRU_MAXSIZE is computed without growing the table."""
+        n = LRU_MAXSIZE + 100
+        assert fibonacci_lru(n) == fibonacci_iterative(n)
+        assert fibonacci_lru(n) == fibonacci_iterative(n)
+
+        info = fibonacci_lru.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (0, LRU_MAXSIZE + 2, LRU_MAXSIZE)
+        assert fibonacci_lru(LRU_MAXSIZE - 1) == fibonacci_iterative(LRU_MAXSIZE - 1)
+        assert fibonacci_lru.cache_info().hits == 1
+
+
 class TestFibonacciIterative:
     """Test suite for fibonacci_iterative function."""
 
@@ -230,12 +290,238 @@ class TestFibonacciIterative:
             assert isinstance(result, int)
 
 
+class TestFibonacciFastDoubling:
+    """Test suite for fibonacci_fast_doubling function."""
+
+    def test_base_cases(self):
+        """Test that F(0) = 0 and F(1) = 1."""
+        assert fibonacci_fast_doubling(0) == 0
+        assert fibonacci_fast_doubling(1) == 1
+
+    def test_small_positive_numbers(self):
+        """Test fibonacci for small positive integers."""
+        assert [fibonacci_fast_doubling(n) for n in range(2, 8)] == [1, 2, 3, 5, 8, 13]
+
+    def test_large_positive_numbers(self):
+        """Test fibonacci for large positive integers."""
+        assert fibonacci_fast_doubling(30) == 832040
+        assert fibonacci_fast_doubling(50) == 12586269025
+        assert fibonacci_fast_doubling(100) == 354224848179261915075
+
+    def test_matches_iterative(self):
+        """Test agreement with the iterative implementation, including odd/even bit patterns."""
+        for n in list(range(200)) + [255, 256, 257, 1023, 1024, 5000]:
+            assert fibonacci_fast_doubling(n) == fibonacci_iterative(n)
+
+    def test_very_large_n(self):
+        """Test n in the millions, far beyond the recursion limit."""
+        result = fibonacci_fast_doubling(1_000_000)
+        # F(n) has about n * log2(phi) ~ 0.694 * n bits
+        assert result.bit_length() == 694241
+        assert result % 10**10 == 8242546875
+
+    def test_negative_number_raises_error(self):
+        """Test that negative numbers raise ValueError."""
+        with pytest.raises(ValueError, match="n must be a non-negative integer"):
+            fibonacci_fast_doubling(-1)
+
+    def test_type_consistency(self):
+        """Test that return type is always int."""
+        for n in [0, 1, 5, 10, 20]:
+            assert isinstance(fibonacci_fast_doubling(n), int)
+
+
+class TestFibonacciMany:
+    """Test suite for fibonacci_many function."""
+
+    def test_preserves_order_and_duplicates(self):
+        """Test that results follow the input order, including repeats."""
+        indices = [20, 3, 20, 0, 1, 3]
+        assert fibonacci_many(indices) == [fibonacci_iterative(n) for n in indices]
+
+    def test_short_and_long_gaps(self):
+        """Test indices that are crossed by addition and by doubling jumps."""
+        indices = [5, 6, 60, 200, 201, 5000, 5064, 5065, 20000]
+        assert fibonacci_many(indices) == [fibonacci_fast_doubling(n) for n in indices]
+
+    def test_accepts_any_iterable(self):
+        """Test generators and ranges as input."""
+        assert fibonacci_many(range(8)) == [0, 1, 1, 2, 3, 5, 8, 13]
+        assert fibonacci_many(n for n in [10]) == [55]
+        assert fibonacci_many([]) == []
+
+    def test_negative_index_raises_error(self):
+        """Test that a negative index raises ValueError."""
+        with pytest.raises(ValueError, match="n must be a non-negative integer"):
+            fibonacci_many([3, -1, 5])
+
+    def test_numpy_uint64_fast_path(self):
+        """Test that small indices in an ndarray come back as a uint64 ndarray."""
+        np = pytest.importorskip("numpy")
+        indices = np.array([[93, 0], [10, 93]])
+
+        result = fibonacci_many(indices)
+
+        assert result.dtype == np.uint64
+        assert result.shape == (2, 2)
+        assert int(result[0, 0]) == fibonacci_iterative(93)
+        assert int(result[1, 0]) == 55
+
+    def test_numpy_large_indices_use_object_dtype(self):
+        """Test that indices past the uint64 range produce exact Python ints."""
+        np = pytest.importorskip("numpy")
+
+        result = fibonacci_many(np.array([94, 1000, 94]))
+
+        assert result.dtype == object
+        assert list(result) == [fibonacci_iterative(94), fibonacci_iterative(1000), fibonacci_iterative(94)]
+
+    def test_numpy_rejects_float_arrays(self):
+        """Test that non-integer arrays raise TypeError."""
+        np = pytest.importorskip("numpy")
+        with pytest.raises(TypeError):
+            fibonacci_many(np.array([1.0, 2.0]))
+
+
+class TestFibonacciRange:
+    """Test suite for fibonacci_range and fibonacci_chunks."""
+
+    @pytest.mark.parametrize("start, stop, step", [(0, 20, 1), (5, 50, 1), (0, 100, 7), (33, 500, 64), (90, 91, 5)])
+    def test_matches_point_queries(self, start, stop, step):
+        """Test that the range equals F(n) for each n in range(start, stop, step)."""
+        expected = [fibonacci_iterative(n) for n in range(start, stop, step)]
+        assert list(fibonacci_range(start, stop, step)) == expected
+
+    def test_empty_ranges(self):
+        """Test that empty index ranges yield nothing."""
+        assert list(fibonacci_range(10, 10)) == []
+        assert list(fibonacci_range(10, 5)) == []
+
+    def test_large_start_is_lazy(self):
+        """Test jumping straight to a large start without computing earlier values."""
+        values = fibonacci_range(100_000, 10**12)
+
+        assert next(values) == fibonacci_fast_doubling(100_000)
+        assert next(values) == fibonacci_fast_doubling(100_001)
+
+    def test_invalid_arguments_raise_immediately(self):
+        """Test that bad arguments fail at call time, not on first iteration."""
+        with pytest.raises(ValueError, match="n must be a non-negative integer"):
+            fibonacci_range(-1, 10)
+        with pytest.raises(ValueError, match="step must be a positive integer"):
+            fibonacci_range(0, 10, 0)
+        with pytest.raises(ValueError):
+            fibonacci_chunks(0, 10, chunk_size=0)
+
+    def test_chunks_reuse_one_buffer(self):
+        """Test that every chunk is written into the same buffer object."""
+        buffer = [None] * 4
+        seen = []
+        for chunk, count in fibonacci_chunks(0, 10, buffer=buffer):
+            assert chunk is buffer
+            seen.extend(chunk[:count])
+
+        assert seen == [fibonacci_iterative(n) for n in range(10)]
+
+    def test_chunks_with_step(self):
+        """Test chunk boundaries with a step larger than one."""
+        counts = [count for _, count in fibonacci_chunks(0, 100, 10, chunk_size=3)]
+        assert counts == [3, 3, 3, 1]
+
+    def test_chunks_into_numpy_buffer(self):
+        """Test filling a preallocated NumPy uint64 buffer."""
+        np = pytest.importorskip("numpy")
+        buffer = np.zeros(16, dtype=np.uint64)
+
+        total = [int(v) for chunk, count in fibonacci_chunks(60, 94, buffer=buffer) for v in chunk[:count]]
+
+        assert total == [fibonacci_iterative(n) for n in range(60, 94)]
+
+
+class TestFibonacciMod:
+    """Test suite for fibonacci_mod, pisano_period and fibonacci_mod_many."""
+
+    @pytest.mark.parametrize("m", [1, 2, 3, 7, 10, 1000, 65537, 10**9 + 7, 2**64])
+    @pytest.mark.parametrize("use_table", [False, True])
+    def test_matches_exact_value(self, m, use_table):
+        """Test F(n) mod m against the exact big integer reduced mod m."""
+        for n in range(0, 2000, 37):
+            assert fibonacci_mod(n, m, use_table=use_table) == fibonacci_fast_doubling(n) % m
+
+    def test_huge_n(self):
+        """Test an index far beyond what could be computed exactly."""
+        assert fibonacci_mod(10**18, 10**9 + 7) == 209783453
+        assert fibonacci_mod(10**100, 1000, use_table=True) == fibonacci_mod(10**100, 1000)
+
+    @pytest.mark.parametrize("m, period", [(1, 1), (2, 3), (3, 8), (5, 20), (10, 60), (1000, 1500)])
+    def test_pisano_period(self, m, period):
+        """Test known Pisano periods."""
+        assert pisano_period(m) == period
+
+    def test_pisano_period_without_table(self):
+        """Test a modulus above the table limit still gets its period."""
+        period = pisano_period(100_003)
+
+        assert fibonacci_mod(period, 100_003) == 0
+        assert fibonacci_mod(period + 1, 100_003) == 1
+
+    def test_pisano_period_refuses_large_modulus(self):
+        """Test that a modulus whose period walk would take billions of steps is refused."""
+        with pytest.raises(ValueError, match="at most"):
+            pisano_period(10**9 + 7)
+
+    def test_table_uses_smallest_type(self):
+        """Test that Pisano tables store residues in the narrowest array type."""
+        assert [_pisano_table(m).typecode for m in (7, 256, 257, 1000, 65537)] == ["B", "B", "H", "H", "I"]
+
+    def test_many_builds_table_only_when_worthwhile(self):
+        """Test that a table is built only when doubling all queries would cost more."""
+        _pisano_table.cache_clear()
+        fibonacci_mod_many([(10**12, 99_991), (10**12 + 1, 99_991)])
+        assert _pisano_table.cache_info().currsize == 0
+
+        fibonacci_mod_many([(10**12 + k, 97) for k in range(10)])
+        assert _pisano_table.cache_info().currsize == 1
+
+    def test_many_preserves_order(self):
+        """Test batch queries with repeated and distinct moduli."""
+        queries = [(n, m) for n in (0, 1, 50, 999, 10**12) for m in (7, 97, 10**9 + 7)]
+        expected = [fibonacci_mod(n, m) for n, m in queries]
+
+        assert fibonacci_mod_many(queries) == expected
+        assert fibonacci_mod_many(iter(queries), use_table=False) == expected
+        assert fibonacci_mod_many([]) == []
+
+    def test_invalid_arguments(self):
+        """Test validation of n and m."""
+        with pytest.raises(ValueError, match="n must be a non-negative integer"):
+            fibonacci_mod(-1, 10)
+        with pytest.raises(ValueError, match="m must be a positive integer"):
+            fibonacci_mod(10, 0)
+        with pytest.raises(ValueError, match="m must be a positive integer"):
+            pisano_period(-5)
+        with pytest.raises(ValueError):
+            fibonacci_mod_many([(3, 0)])
+
+
 class TestFibonacciAlias:
-    """Test suite for the fibonacci alias (should point to fibonacci_lru)."""
+    """Test suite for the fibonacci alias (fibonacci_lru below the threshold, fast doubling above)."""
 
-    def test_alias_points_to_lru(self):
-        """Test that fibonacci is an alias for fibonacci_lru."""
-        assert fibonacci is fibonacci_lru
+    def setup_method(self):
+        """Clear LRU cache before each test."""
+        fibonacci_lru.cache_clear()
+
+    def test_small_n_uses_lru_cache(self):
+        """Test that small n is served from the fibonacci_lru cache."""
+        fibonacci(FAST_DOUBLING_THRESHOLD - 1)
+        fibonacci(FAST_DOUBLING_THRESHOLD - 1)
+
+        assert fibonacci_lru.cache_info().hits > 0
+
+    def test_large_n_bypasses_lru_cache(self):
+        """Test that n above the threshold does not touch the LRU cache or recurse."""
+        assert fibonacci(5000) == fibonacci_iterative(5000)
+        assert fibonacci_lru.cache_info().currsize == 0
 
     def test_alias_works_correctly(self):
         """Test that the alias produces correct results."""
@@ -253,12 +539,13 @@ class TestImplementationConsistency:
 
     @pytest.mark.parametrize("n", [0, 1, 2, 3, 5, 8, 10, 15, 20, 25, 30])
     def test_all_implementations_agree(self, n):
-        """Test that all three implementations return the same result."""
+        """Test that all implementations return the same result."""
         result_manual = fibonacci_manual_memo(n)
         result_lru = fibonacci_lru(n)
         result_iterative = fibonacci_iterative(n)
+        result_fast_doubling = fibonacci_fast_doubling(n)
 
-        assert result_manual == result_lru == result_iterative
+        assert result_manual == result_lru == result_iterative == result_fast_doubling
 
     @pytest.mark.parametrize("n", [-1, -5, -10, -100])
     def test_all_implementations_raise_same_error(self, n):
@@ -272,6 +559,9 @@ class TestImplementationConsistency:
         with pytest.raises(ValueError):
             fibonacci_iterative(n)
 
+        with pytest.raises(ValueError):
+            fibonacci_fast_doubling(n)
+
 
 class TestFibonacciSequenceProperties:
     """Test mathematical properties of the Fibonacci sequence."""
@@ -304,53 +594,57 @@ class TestFibonacciSequenceProperties:
 
 
 class TestPerformance:
-    """Performance and efficiency tests."""
+    """
+    Deterministic efficiency checks.
+
+    These count cache hits, memo writes and result sizes instead of timing
+    calls; wall-clock comparisons live in bench_fibonacci_suite.py.
+    """
 
     def setup_method(self):
         """Clear LRU cache before each test."""
         fibonacci_lru.cache_clear()
 
     def test_iterative_performance_large_n(self):
-        """Test that iterative approach handles large n efficiently."""
-        start = time.time()
-        result = fibonacci_iterative(1000)
-        elapsed = time.time() - start
+        """Test that the iterative approach handles large n without recursion or caching."""
+        result = fibonacci_iterative(10_000)
 
-        assert isinstance(result, int)
-        assert elapsed < 0.1  # Should complete in less than 100ms
+        assert result == fibonacci_fast_doubling(10_000)
+        assert result.bit_length() == 6942
+        assert fibonacci_lru.cache_info().currsize == 0
 
     def test_lru_cache_performance_benefit(self):
-        """Test that LRU cache provides performance benefit for repeated calls."""
-        fibonacci_lru.cache_clear()
-
-        # First call (cache miss)
-        start = time.time()
+        """Test that a repeated call is served from the cache without recomputation."""
         fibonacci_lru(30)
-        first_call_time = time.time() - start
+        after_first = fibonacci_lru.cache_info()
 
-        # Second call (cache hit)
-        start = time.time()
         fibonacci_lru(30)
-        second_call_time = time.time() - start
+        after_second = fibonacci_lru.cache_info()
 
-        # Cached call should be significantly faster
-        assert second_call_time < first_call_time
+        assert after_first.hits == 0
+        assert after_second.misses == after_first.misses
+        assert after_second.hits == after_first.hits + 1
+        assert after_second.currsize == after_first.currsize
 
     def test_manual_memo_reuse(self):
-        """Test that manual memoization provides benefit when memo is reused."""
-        memo = {}
+        """Test that a reused memo only computes the missing entry."""
+
+        class CountingDict(dict):
+            writes = 0
 
-        # Build up cache
+            def __setitem__(self, key, value):
+                CountingDict.writes += 1
+                super().__setitem__(key, value)
+
+        memo = CountingDict()
         for i in range(20):
             fibonacci_manual_memo(i, memo)
+        CountingDict.writes = 0
 
-        # This should be fast since all sub-problems are cached
-        start = time.time()
-        result = fibonacci_manual_memo(20, memo)
-        elapsed = time.time() - start
-
-        assert result == 6765
-        assert elapsed < 0.01  # Should be very fast with full cache
+        assert fibonacci_manual_memo(20, memo) == 6765
+        assert CountingDict.writes == 1
+        assert fibonacci_manual_memo(20, memo) == 6765
+        assert CountingDict.writes == 1
 
 
 class TestEdgeCasesAndBoundaries:
@@ -414,6 +708,12 @@ class TestInputValidation:
         with pytest.raises(TypeError):
             fibonacci_manual_memo("15")
 
+        with pytest.raises(TypeError):
+            fibonacci_fast_doubling("20")
+
+        with pytest.raises(TypeError):
+            fibonacci("25")
+
     def test_none_input_raises_error(self):
         """Test that None input raises appropriate errors."""
         with pytest.raises(TypeError):
@@ -0,0 +1,111 @@
+"""
+Test suite for fibonacci_cache.py.
+
+Covers both retention policies, the byte budget and the stats report.
+"""
+
+import sys
+
+import pytest
+
+from fibonacci import fibonacci_iterative
+from fibonacci_cache import FibonacciCache
+
+
+class TestFibonacciCacheLRU:
+    """Test suite for the "lru" policy."""
+
+    def test_results_match_iterative(self):
+        """Test that cached and uncached results are correct."""
+        cache = FibonacciCache()
+
+        for n in [0, 1, 2, 10, 100, 1000, 10, 0]:
+            assert cache(n) == fibonacci_iterative(n)
+
+    def test_hits_and_misses(self):
+        """Test that a repeated query is a hit."""
+        cache = FibonacciCache()
+        cache(500)
+        cache(500)
+        cache(501)
+
+        stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses) == (2, 1, 2)
+        assert stats.hit_ratio == pytest.approx(1 / 3)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        """Test that the budget is enforced by evicting the LRU entry."""
+        size = sys.getsizeof(fibonacci_iterative(10_000))
+        cache = FibonacciCache(max_bytes=2 * size + 100)
+        cache(10_000)
+        cache(10_001)
+        cache(10_000)  # 10_001 is now least recently used
+        cache(10_002)
+
+        stats = cache.stats()
+        assert stats.entries == 2
+        assert stats.evictions == 1
+        assert stats.bytes <= stats.max_bytes
+
+        cache(10_000)
+        assert cache.stats().hits == 2
+
+    def test_oversized_value_is_not_cached(self):
+        """Test that a value larger than the whole budget is returned but not kept."""
+        cache = FibonacciCache(max_bytes=64)
+
+        assert cache(5000) == fibonacci_iterative(5000)
+        assert cache.stats().entries == 0
+
+    def test_cache_clear(self):
+        """Test that cache_clear drops entries and counters."""
+        cache = FibonacciCache()
+        cache(100)
+        cache.cache_clear()
+
+        assert cache.stats() == (0, 0, cache.max_bytes, 0, 0, 0, 0.0)
+
+
+class TestFibonacciCacheCheckpoint:
+    """Test suite for the "checkpoint" policy."""
+
+    def test_results_match_iterative(self):
+        """Test values on, between and just after checkpoints."""
+        cache = FibonacciCache(policy="checkpoint", checkpoint_interval=64)
+
+        for n in [0, 1, 63, 64, 65, 127, 128, 1000, 5000]:
+            assert cache(n) == fibonacci_iterative(n)
+
+    def test_neighbours_share_a_checkpoint(self):
+        """Test that queries between two checkpoints use one entry."""
+        cache = FibonacciCache(policy="checkpoint", checkpoint_interval=100)
+        for n in range(1000, 1100):
+            cache(n)
+
+        stats = cache.stats()
+        assert (stats.entries, stats.misses, stats.hits) == (1, 1, 99)
+
+    def test_byte_budget(self):
+        """Test that checkpoint pairs are evicted to stay within the budget."""
+        cache = FibonacciCache(max_bytes=4096, policy="checkpoint", checkpoint_interval=16)
+        for n in range(0, 4000, 16):
+            cache(n)
+
+        stats = cache.stats()
+        assert stats.bytes <= 4096
+        assert stats.evictions > 0
+
+
+class TestFibonacciCacheValidation:
+    """Test argument validation."""
+
+    def test_negative_n(self):
+        """Test that negative n raises ValueError."""
+        with pytest.raises(ValueError, match="n must be a non-negative integer"):
+            FibonacciCache()(-1)
+
+    @pytest.mark.parametrize("kwargs", [{"policy": "fifo"}, {"max_bytes": 0}, {"checkpoint_interval": 0}])
+    def test_invalid_configuration(self, kwargs):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            FibonacciCache(**kwargs)
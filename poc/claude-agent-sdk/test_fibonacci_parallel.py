@@ -0,0 +1,59 @@
+"""
+Test suite for fibonacci_parallel.py.
+
+Most tests use a thread pool and small thresholds so that the Lucas stepping
+and Karatsuba splitting are exercised quickly; one test goes through real
+worker processes.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import fibonacci_parallel
+from fibonacci import fibonacci_fast_doubling
+from fibonacci_parallel import fibonacci_parallel as fib_parallel
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+class TestFibonacciParallel:
+    """Test suite for fibonacci_parallel."""
+
+    @pytest.mark.parametrize("workers", [1, 2, 3, 4, 8, 20])
+    def test_matches_fast_doubling(self, pool, monkeypatch, workers):
+        """Test every split depth against fast doubling, for odd and even n."""
+        monkeypatch.setattr(fibonacci_parallel, "MIN_SPLIT_BITS", 8)
+        for n in list(range(64, 300)) + [4095, 4096, 10_001, 54_321]:
+            assert fib_parallel(n, workers=workers, threshold=64, executor=pool) == fibonacci_fast_doubling(n)
+
+    def test_single_worker_runs_in_process(self):
+        """Test that workers=1 needs no executor."""
+        for n in [1000, 1001, 50_000]:
+            assert fib_parallel(n, workers=1, threshold=100) == fibonacci_fast_doubling(n)
+
+    def test_below_threshold_uses_fibonacci(self):
+        """Test that small n never touches the executor."""
+
+        class Unusable:
+            def submit(self, *args):
+                raise AssertionError("executor used below threshold")
+
+        assert fib_parallel(999, workers=8, threshold=1000, executor=Unusable()) == fibonacci_fast_doubling(999)
+
+    def test_process_pool(self, monkeypatch):
+        """Test that operands and products survive the trip through worker processes."""
+        monkeypatch.setattr(fibonacci_parallel, "MIN_SPLIT_BITS", 256)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert fib_parallel(200_001, workers=4, threshold=10_000, executor=executor) == \
+                fibonacci_fast_doubling(200_001)
+
+    @pytest.mark.parametrize("kwargs", [{"n": -1}, {"n": 10, "workers": 0}, {"n": 10, "threshold": 0}])
+    def test_invalid_arguments(self, kwargs):
+        """Test validation of n, workers and threshold."""
+        with pytest.raises(ValueError):
+            fib_parallel(**kwargs)
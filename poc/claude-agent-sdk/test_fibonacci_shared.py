@@ -0,0 +1,139 @@
+"""
+Test suite for fibonacci_shared.py.
+
+Covers persistence through the file, capacity limits, and concurrent writers
+in forked processes.
+"""
+
+import multiprocessing
+
+import pytest
+
+from fibonacci import fibonacci_iterative
+from fibonacci_shared import SharedFibonacciCache
+
+fork = pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requires fork")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "fib.cache"
+
+
+def _fill(path, numbers):
+    with SharedFibonacciCache(path) as cache:
+        for n in numbers:
+            cache(n)
+
+
+def _read_inherited(cache, numbers, queue):
+    queue.put([cache.get(n) for n in numbers] + [cache.put(10_000, fibonacci_iterative(10_000))])
+
+
+class TestSharedFibonacciCache:
+    """Test suite for SharedFibonacciCache."""
+
+    def test_results_match_iterative(self, path):
+        """Test that computed and cached results are correct, including F(0)."""
+        with SharedFibonacciCache(path) as cache:
+            for n in [0, 1, 2, 10, 100, 1000, 10, 0]:
+                assert cache(n) == fibonacci_iterative(n)
+
+            stats = cache.stats()
+        assert (stats.entries, stats.hits, stats.misses) == (6, 2, 6)
+
+    def test_values_persist_across_instances(self, path):
+        """Test that a second mapping of the file sees earlier writes."""
+        with SharedFibonacciCache(path) as writer, SharedFibonacciCache(path) as reader:
+            assert reader.get(5000) is None
+            writer(5000)
+            assert reader.get(5000) == fibonacci_iterative(5000)
+
+        with SharedFibonacciCache(path) as reopened:
+            assert reopened(5000) == fibonacci_iterative(5000)
+            assert reopened.stats().hits == 1
+
+    def test_existing_layout_wins(self, path):
+        """Test that sizes passed when reopening are ignored."""
+        SharedFibonacciCache(path, max_bytes=4096, slots=8).close()
+        with SharedFibonacciCache(path, max_bytes=1 << 20, slots=1024) as cache:
+            assert (cache.max_bytes, cache.slots) == (4096, 8)
+
+    def test_full_data_region_drops_writes(self, path):
+        """Test that values which do not fit are returned but not stored."""
+        with SharedFibonacciCache(path, max_bytes=1024) as cache:
+            assert cache(5000) == fibonacci_iterative(5000)  # ~430 bytes
+            assert cache(5001) == fibonacci_iterative(5001)
+            assert cache(5002) == fibonacci_iterative(5002)
+            assert cache.get(5002) is None
+
+            stats = cache.stats()
+        assert (stats.entries, stats.dropped) == (2, 1)
+        assert stats.bytes <= stats.max_bytes
+
+    def test_full_index_drops_writes(self, path):
+        """Test that once every slot is taken new keys are not stored."""
+        with SharedFibonacciCache(path, slots=4) as cache:
+            assert [cache.put(n, fibonacci_iterative(n)) for n in range(6)] == [True] * 4 + [False] * 2
+            assert [cache.get(n) for n in range(6)] == [0, 1, 1, 2, None, None]
+
+    def test_slot_filled_with_other_key_during_get(self, path):
+        """Test that get() ignores a different key written to the probed slot after the probe."""
+        with SharedFibonacciCache(path, slots=1) as reader, SharedFibonacciCache(path) as writer:
+            find = reader._find
+
+            def find_then_collide(key):
+                slot = find(key)
+                writer.put(7, fibonacci_iterative(7))
+                return slot
+
+            reader._find = find_then_collide
+            assert reader.get(5) is None
+
+    def test_rejects_foreign_file(self, path):
+        """Test that a file without the magic header is refused."""
+        path.write_bytes(b"not a cache" * 10)
+        with pytest.raises(ValueError, match="not a Fibonacci cache file"):
+            SharedFibonacciCache(path)
+
+    @pytest.mark.parametrize("kwargs", [{"max_bytes": 0}, {"slots": 0}])
+    def test_invalid_configuration(self, path, kwargs):
+        """Test that non-positive sizes are rejected."""
+        with pytest.raises(ValueError):
+            SharedFibonacciCache(path, **kwargs)
+
+    def test_negative_n(self, path):
+        """Test the module's standard error for negative n."""
+        with SharedFibonacciCache(path) as cache, pytest.raises(ValueError, match="n must be a non-negative integer"):
+            cache(-1)
+
+    @fork
+    def test_concurrent_writers(self, path):
+        """Test that overlapping writes from several processes leave a consistent index."""
+        context = multiprocessing.get_context("fork")
+        numbers = list(range(0, 3000, 7))
+        workers = [context.Process(target=_fill, args=(path, numbers[i::2] + numbers)) for i in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            assert worker.exitcode == 0
+
+        with SharedFibonacciCache(path) as cache:
+            assert cache.stats().entries == len(numbers)
+            assert all(cache.get(n) == fibonacci_iterative(n) for n in numbers)
+
+    @fork
+    def test_inherited_instance_after_fork(self, path):
+        """Test that a cache opened before fork can be read and written by the child."""
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        with SharedFibonacciCache(path) as cache:
+            cache(2000)
+            child = context.Process(target=_read_inherited, args=(cache, [2000, 2001], queue))
+            child.start()
+            result = queue.get(timeout=30)
+            child.join()
+
+            assert result == [fibonacci_iterative(2000), None, True]
+            assert cache.get(10_000) == fibonacci_iterative(10_000)
@@ -0,0 +1,145 @@
+"""
+Test suite for fibonacci_snapshot.py and the snapshot hook in fibonacci().
+
+Covers dense and checkpoint lookups, coverage limits, the file checks and
+loading through FIBONACCI_SNAPSHOT.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fibonacci as fibonacci_module
+from fibonacci import fibonacci, fibonacci_fast_doubling, load_snapshot, unload_snapshot
+from fibonacci_snapshot import FibonacciSnapshot, write_snapshot
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fibonacci_snapshot.py")
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return write_snapshot(tmp_path / "fib.snapshot", dense=300, interval=1000, max_n=5500)
+
+
+@pytest.fixture
+def no_snapshot():
+    yield
+    unload_snapshot()
+    fibonacci_module._snapshot_loaded = False
+
+
+class TestFibonacciSnapshot:
+    """Test suite for write_snapshot and FibonacciSnapshot."""
+
+    def test_every_covered_n(self, snapshot_path):
+        """Test dense entries, the gap before the first checkpoint and every checkpoint offset."""
+        with FibonacciSnapshot(snapshot_path) as snapshot:
+            assert (snapshot.dense_count, snapshot.first_checkpoint, snapshot.checkpoints) == (301, 1, 5)
+            for n in range(0, 5501):
+                assert snapshot.get(n) == fibonacci_fast_doubling(n), n
+
+    def test_outside_coverage(self, snapshot_path):
+        """Test that indices the snapshot does not cover return None."""
+        with FibonacciSnapshot(snapshot_path) as snapshot:
+            assert snapshot.get(5501) is None
+            assert snapshot.get(-1) is None
+
+    def test_checkpoints_skip_dense_range(self, tmp_path):
+        """Test that no checkpoint is stored at or below the dense limit."""
+        path = write_snapshot(tmp_path / "fib.snapshot", dense=2500, interval=1000, max_n=4000)
+        with FibonacciSnapshot(path) as snapshot:
+            assert (snapshot.first_checkpoint, snapshot.checkpoints) == (3, 2)
+            assert [snapshot.get(n) for n in (2500, 2501, 2999, 3000, 4000)] == \
+                [fibonacci_fast_doubling(n) for n in (2500, 2501, 2999, 3000, 4000)]
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test that a file without the magic header is refused."""
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError, match="not a Fibonacci snapshot"):
+            FibonacciSnapshot(path)
+
+    @pytest.mark.parametrize("kwargs", [{"dense": 0}, {"interval": 0}, {"dense": 100, "max_n": 50}])
+    def test_invalid_configuration(self, tmp_path, kwargs):
+        """Test write_snapshot argument validation."""
+        with pytest.raises(ValueError):
+            write_snapshot(tmp_path / "fib.snapshot", **kwargs)
+
+
+class TestFibonacciWithSnapshot:
+    """Test suite for fibonacci() backed by a snapshot."""
+
+    def test_load_snapshot(self, snapshot_path, no_snapshot):
+        """Test that fibonacci() answers from the snapshot and falls back beyond it."""
+        snapshot = load_snapshot(snapshot_path)
+        assert snapshot is fibonacci_module._snapshot
+
+        for n in [10, 64, 299, 300, 1234, 5500, 5501, 10_000]:
+            assert fibonacci(n) == fibonacci_fast_doubling(n)
+
+    def test_environment_variable(self, snapshot_path, no_snapshot, monkeypatch):
+        """Test that the first fibonacci() call picks up FIBONACCI_SNAPSHOT."""
+        monkeypatch.setenv("FIBONACCI_SNAPSHOT", str(snapshot_path))
+        fibonacci_module._snapshot_loaded = False
+
+        assert fibonacci(4321) == fibonacci_fast_doubling(4321)
+        assert fibonacci_module._snapshot is not None
+
+    def test_first_calls_from_many_threads_open_one_snapshot(self, snapshot_path, no_snapshot, monkeypatch):
+        """Test that concurrent first calls open the snapshot once and all answer from it."""
+        import fibonacci_snapshot
+
+        opened, looked_up = [], []
+
+        class SlowSnapshot(FibonacciSnapshot):
+            def __init__(self, path):
+                time.sleep(0.05)
+                super().__init__(path)
+                opened.append(self)
+
+            def get(self, n):
+                looked_up.append(n)
+                return super().get(n)
+
+        monkeypatch.setattr(fibonacci_snapshot, "FibonacciSnapshot", SlowSnapshot)
+        monkeypatch.setenv("FIBONACCI_SNAPSHOT", str(snapshot_path))
+        fibonacci_module._snapshot_loaded = False
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(fibonacci, [1000 + i for i in range(8)]))
+
+        assert results == [fibonacci_fast_doubling(1000 + i) for i in range(8)]
+        assert len(opened) == 1
+        assert sorted(looked_up) == [1000 + i for i in range(8)]
+
+    def test_replaced_snapshot_stays_readable(self, snapshot_path, no_snapshot):
+        """Test that a caller still holding the previous snapshot can keep reading it."""
+        snapshot = load_snapshot(snapshot_path)
+        load_snapshot(snapshot_path)
+        unload_snapshot()
+
+        assert snapshot.get(1234) == fibonacci_fast_doubling(1234)
+
+    def test_bad_environment_variable_warns(self, tmp_path, no_snapshot, monkeypatch):
+        """Test that a missing snapshot file only warns."""
+        monkeypatch.setenv("FIBONACCI_SNAPSHOT", str(tmp_path / "missing"))
+        fibonacci_module._snapshot_loaded = False
+
+        with pytest.warns(RuntimeWarning, match="FIBONACCI_SNAPSHOT"):
+            assert fibonacci(100) == fibonacci_fast_doubling(100)
+        assert fibonacci_module._snapshot is None
+
+    def test_cli(self, tmp_path):
+        """Test generating and inspecting a snapshot from the command line."""
+        path = tmp_path / "cli.snapshot"
+        subprocess.run([sys.executable, SCRIPT, "generate", str(path),
+                        "--dense", "100", "--interval", "500", "--max-n", "2000"], check=True, capture_output=True)
+        info = subprocess.run([sys.executable, SCRIPT, "info", str(path)],
+                              check=True, capture_output=True, text=True).stdout
+
+        assert "F(0..100)" in info
+        assert "4 every 500" in info
@@ -2,6 +2,9 @@
 """Test Claude Agent SDK with custom MCP tools (simulating Codex integration)."""
 
 import asyncio
+import json
+import os
+from collections import Counter
 from typing import Any
 from claude_agent_sdk import (
     ClaudeSDKClient,
@@ -14,48 +17,121 @@ from claude_agent_sdk import (
     ResultMessage,
 )
 
+from refactor_engine import parse_transforms, refactor_files, refactor_source
+from repo_review import FileReview, collect_files, format_report, report_as_dict, review_repository
+from review_engine import ReviewEngine, format_review
+from tool_cache import ToolCache, file_version
 
-# Simulate a simple "code review" tool (like what Codex might provide)
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Paths given to the repository tools must stay under the directory the server started in
+PROJECT_ROOT = os.getcwd()
+
+# Shared across calls so re-reviewing an edited file only re-checks changed functions
+REVIEW_ENGINE = ReviewEngine()
+
+# Repeated calls with the same arguments skip the tools entirely; set
+# CODE_TOOLS_CACHE_DIR to keep results across sessions
+TOOL_CACHE = ToolCache(path=os.environ.get("CODE_TOOLS_CACHE_DIR"))
+REVIEW_VERSION = file_version(*(os.path.join(HERE, name) for name in
+                                ("review_engine.py", "rule_packs.py", "review_checklist.json")))
+REFACTOR_VERSION = file_version(os.path.join(HERE, "refactor_engine.py"))
+
+
+# Code review tool (like what Codex might provide), backed by review_engine
 @tool("code_review", "Review code for issues", {"code": str, "language": str})
+@TOOL_CACHE.memoize(version=REVIEW_VERSION)
 async def code_review_tool(args: dict[str, Any]) -> dict[str, Any]:
-    """Simulate a code review tool."""
+    """Review code with the rule engine (see review_engine.py)."""
     code = args["code"]
     language = args.get("language", "python")
 
-    # Simple mock review
-    issues = []
-    if "print" in code.lower():
-        issues.append("Consider using logging instead of print statements")
-    if "TODO" in code:
-        issues.append("Found TODO comment - needs implementation")
-
-    if issues:
-        review = f"Code review for {language}:\n" + "\n".join(f"- {issue}" for issue in issues)
-    else:
-        review = f"Code review for {language}: No issues found!"
+    review = format_review(REVIEW_ENGINE.review(code, language), language)
 
     return {
         "content": [{"type": "text", "text": review}]
     }
 
 
-@tool("refactor_code", "Refactor code to improve quality", {"code": str, "style": str})
-async def refactor_tool(args: dict[str, Any]) -> dict[str, Any]:
-    """Simulate a code refactoring tool."""
-    code = args["code"]
-    style = args.get("style", "clean")
+@tool("review_repository", "Review every source file under a path or glob, in parallel", {"path": str})
+async def review_repository_tool(args: dict[str, Any]) -> dict[str, Any]:
+    """Review a whole directory or glob in one call on a process pool (see repo_review.py)."""
+    path = args.get("path", ".")
+
+    def progress(review: FileReview) -> None:
+        print(f"  [review_repository] {review.path}: {review.error or f'{len(review.findings)} findings'}")
 
-    # Mock refactoring
-    refactored = code.replace("print(", "logger.info(")
+    try:
+        report = await asyncio.to_thread(review_repository, path, PROJECT_ROOT, on_file=progress, confine=True)
+    except (ValueError, FileNotFoundError) as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
 
     return {
-        "content": [{
-            "type": "text",
-            "text": f"Refactored code ({style} style):\n```python\n{refactored}\n```"
-        }]
+        "content": [
+            {"type": "text", "text": format_report(report)},
+            {"type": "text", "text": json.dumps(report_as_dict(report))},
+        ]
     }
 
 
+@tool(
+    "refactor_code",
+    "Refactor Python code; transforms: print-to-logging[:LEVEL], rename:OLD=NEW, rename-call:OLD=NEW",
+    {"code": str, "transforms": str},
+)
+@TOOL_CACHE.memoize(version=REFACTOR_VERSION)
+async def refactor_tool(args: dict[str, Any]) -> dict[str, Any]:
+    """Refactor one snippet with the syntax-aware engine (see refactor_engine.py); returns a diff."""
+    code = args["code"]
+    try:
+        result = refactor_source(code, parse_transforms(args.get("transforms") or "print-to-logging"), "code.py")
+    except ValueError as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+
+    if result.error:
+        text = f"Could not refactor: {result.error}"
+    elif not result.diff:
+        text = "No changes needed."
+    else:
+        text = f"Refactoring ({_describe(result.changes)}):\n```diff\n{result.diff}```"
+    return {"content": [{"type": "text", "text": text}]}
+
+
+@tool(
+    "refactor_files",
+    "Apply refactor_code transforms to every Python file under a path or glob, in parallel",
+    {"path": str, "transforms": str, "write": bool},
+)
+async def refactor_files_tool(args: dict[str, Any]) -> dict[str, Any]:
+    """Refactor many files in one call; returns one unified diff for all of them."""
+    try:
+        transforms = parse_transforms(args.get("transforms") or "print-to-logging")
+        paths = [os.path.relpath(path, PROJECT_ROOT)
+                 for path, language in collect_files(args.get("path", "."), PROJECT_ROOT, confine=True)
+                 if language == "python"]
+    except (ValueError, FileNotFoundError) as e:
+        return {"content": [{"type": "text", "text": str(e)}], "is_error": True}
+
+    results = await asyncio.to_thread(refactor_files, paths, transforms, write=bool(args.get("write")))
+    changed = [result for result in results if result.diff]
+    failed = [f"{result.path}: {result.error}" for result in results if result.error]
+    changes = Counter()
+    for result in changed:
+        changes.update(result.changes)
+
+    text = f"{len(changed)} of {len(results)} files changed ({_describe(changes)})"
+    text += " and written" if args.get("write") and changed else ""
+    if failed:
+        text += "\nNot refactored:\n" + "\n".join(failed)
+    if changed:
+        text += "\n```diff\n" + "".join(result.diff for result in changed) + "```"
+    return {"content": [{"type": "text", "text": text}]}
+
+
+def _describe(changes: dict[str, int]) -> str:
+    return ", ".join(f"{label} x{count}" for label, count in changes.items()) or "no edits"
+
+
 def display_message(msg):
     """Display message in a readable format."""
     if isinstance(msg, AssistantMessage):
@@ -79,14 +155,16 @@ async def test_with_custom_mcp_tools():
     code_tools_server = create_sdk_mcp_server(
         name="code-tools",
         version="1.0.0",
-        tools=[code_review_tool, refactor_tool]
+        tools=[code_review_tool, review_repository_tool, refactor_tool, refactor_files_tool]
     )
 
     options = ClaudeAgentOptions(
         mcp_servers={"codetools": code_tools_server},
         allowed_tools=[
             "mcp__codetools__code_review",
+            "mcp__codetools__review_repository",
             "mcp__codetools__refactor_code",
+            "mcp__codetools__refactor_files",
             "Read",
             "Write",
         ],
@@ -112,8 +190,17 @@ async def test_with_custom_mcp_tools():
             display_message(message)
         print()
 
-        # Test 3: Use refactor tool
-        print("Test 3: Refactor the code")
+        # Test 3: Review every file in one tool call
+        print("Test 3: Review the whole directory")
+        print("-" * 40)
+        await client.query("Review every source file in the current directory and summarize the findings")
+
+        async for message in client.receive_response():
+            display_message(message)
+        print()
+
+        # Test 4: Use refactor tool
+        print("Test 4: Refactor the code")
         print("-" * 40)
         await client.query("Refactor the code in hello.py to use logging instead of print")
 
@@ -125,6 +212,9 @@ async def test_with_custom_mcp_tools():
 async def main():
     """Run the test."""
     await test_with_custom_mcp_tools()
+    stats = TOOL_CACHE.stats()
+    print(f"Tool cache: {stats.hits} hits ({stats.disk_hits} from disk), {stats.misses} misses, "
+          f"{stats.entries} entries, {stats.bytes:,} bytes")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,262 @@
+"""
+Test suite for refactor_engine.py.
+
+Every behaviour is checked on both backends; the libcst ones are skipped
+when libcst is not installed.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import refactor_engine
+from refactor_engine import (
+    PrintToLogging,
+    RenameCall,
+    RenameName,
+    parse_transforms,
+    refactor_files,
+    refactor_source,
+)
+
+BACKENDS = [
+    pytest.param("libcst", marks=pytest.mark.skipif(refactor_engine.cst is None, reason="libcst not installed")),
+    "tokenize",
+]
+
+
+def refactored(code, transforms, backend):
+    """Apply transforms through the private splice, returning the new source."""
+    new_code, _, error = refactor_engine._refactor(code, transforms, backend)
+    assert error is None
+    return new_code
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestTransforms:
+    """Test each transform on both backends."""
+
+    def test_print_only_where_it_is_a_call(self, backend):
+        code = (
+            "import logging\n"
+            "logger = logging.getLogger(__name__)\n"
+            "print(1)  # print(2)\n"
+            "s = 'print(3)'\n"
+            "my_print(4); obj.print(5); print (6)\n"
+            "def print(x): pass\n"
+            "handlers = [print]\n"
+        )
+        assert refactored(code, [PrintToLogging("debug")], backend) == (
+            "import logging\n"
+            "logger = logging.getLogger(__name__)\n"
+            "logger.debug(1)  # print(2)\n"
+            "s = 'print(3)'\n"
+            "my_print(4); obj.print(5); logger.debug (6)\n"
+            "def print(x): pass\n"
+            "handlers = [print]\n"
+        )
+
+    @pytest.mark.parametrize("code, expected", [
+        # after the docstring
+        ('"""Doc."""\n\nprint(1)\n',
+         '"""Doc."""\n\nimport logging\n\nlogger = logging.getLogger(__name__)\n\nlogger.info(1)\n'),
+        # no leading imports: before the first statement, below leading comments
+        ("#!/usr/bin/env python\nx = 1\nprint(x)\n",
+         "#!/usr/bin/env python\nimport logging\n\nlogger = logging.getLogger(__name__)\n\nx = 1\nlogger.info(x)\n"),
+        # logging already imported
+        ("import logging, os\nprint(1)\n",
+         "import logging, os\n\nlogger = logging.getLogger(__name__)\nlogger.info(1)\n"),
+        # logger imported from elsewhere
+        ("from app.log import logger\nprint(1)\n", "from app.log import logger\nlogger.info(1)\n"),
+        # logger defined later in the module
+        ("import os\ndef f():\n    print(1)\nlogger: object = None\n",
+         "import os\ndef f():\n    logger.info(1)\nlogger: object = None\n"),
+    ])
+    def test_logger_setup(self, backend, code, expected):
+        assert refactored(code, [PrintToLogging()], backend) == expected
+
+    @pytest.mark.parametrize("code, expected", [
+        ("print()\n", 'logger.info("")\n'),
+        ("print('a', 1)\n", 'logger.info("%s %s", \'a\', 1)\n'),
+        ("print(\n    f(a=1),\n    [b, c],\n    lambda d, e=1: d,\n)\n",
+         'logger.info(\n    "%s %s %s", f(a=1),\n    [b, c],\n    lambda d, e=1: d,\n)\n'),
+    ])
+    def test_print_arguments_become_one_message(self, backend, code, expected):
+        assert refactored("logger = None\n" + code, [PrintToLogging()], backend) == "logger = None\n" + expected
+
+    @pytest.mark.parametrize("call", [
+        "print('a', 1, sep='-')", "print(x, file=sys.stderr)", "print(x, end='')", "print(*rows)", "print(x, **kw)",
+    ])
+    def test_print_refuses_what_logging_cannot_do(self, backend, call):
+        result = refactor_source(f"import sys\nx = 1\n{call}\n", [PrintToLogging()], backend=backend)
+        assert result.diff == "" and result.error.startswith("cannot turn print(...) on line 3 into logging")
+
+    def test_logger_setup_at_end_of_file(self, backend):
+        assert refactored("import os\n", [PrintToLogging()], backend) == "import os\n"
+        assert refactored("import os\nprint(1)", [PrintToLogging()], backend) == \
+            "import os\nimport logging\n\nlogger = logging.getLogger(__name__)\nlogger.info(1)"
+
+    def test_rename_name(self, backend):
+        code = (
+            "from cache import fetch\n"
+            "import fetch as fetcher\n"
+            "def fetch(url, source=None):\n"
+            "    client.fetch(url, fetch=fetch)\n"
+            "    global fetch\n"
+            "    return [fetch for fetch in fetch]\n"
+        )
+        assert refactored(code, [RenameName("fetch", "load")], backend) == (
+            "from cache import fetch as load\n"
+            "import fetch as fetcher\n"
+            "def load(url, source=None):\n"
+            "    client.fetch(url, fetch=load)\n"
+            "    global load\n"
+            "    return [load for load in load]\n"
+        )
+
+    @pytest.mark.parametrize("code, error", [
+        ("def f(x=1):\n    return x\nf(x=2)\n", "'x': it is a parameter"),
+        ("def f(a, *x, **kw): pass\n", "'x': it is a parameter"),
+        ("f = lambda a, x=1: x\nf(x=2)\n", "'x': it is a parameter"),
+        ("class A:\n    def x(self): pass\nA().x()\n", "'x': it is defined in a class body"),
+        ("class A:\n    x: int = 1\n", "'x': it is defined in a class body"),
+        ("class A: y = 1; x = 2\n", "'x': it is defined in a class body"),
+    ])
+    def test_rename_refuses_parameters_and_class_members(self, backend, code, error):
+        result = refactor_source(code, [RenameName("x", "y")], backend=backend)
+        assert result.diff == "" and error in result.error
+
+    def test_rename_keeps_names_only_used_in_signatures_and_methods(self, backend):
+        code = "def f(a: x = x):\n    return g(x=x)\nclass A:\n    def m(self):\n        x = 1\n        return x\n"
+        assert refactored(code, [RenameName("x", "y")], backend) == code.replace("x", "y").replace("g(y=", "g(x=")
+
+    @pytest.mark.parametrize("code, expected", [
+        ("from x import fetch\nfetch()\n", "from x import fetch as load\nload()\n"),
+        ("import fetch\nfetch.go()\n", "import fetch as load\nload.go()\n"),
+        ("from x import (a,\n    fetch)\n", "from x import (a,\n    fetch as load)\n"),
+        ("from x import y as fetch, fetch as z\n", "from x import y as load, fetch as z\n"),
+        ("import x.y as fetch\nfrom fetch import x\n", "import x.y as load\nfrom fetch import x\n"),
+    ])
+    def test_rename_aliases_imported_names(self, backend, code, expected):
+        assert refactored(code, [RenameName("fetch", "load")], backend) == expected
+
+    def test_rename_refuses_dotted_import(self, backend):
+        result = refactor_source("import fetch.sub\nfetch.sub.go()\n", [RenameName("fetch", "load")], backend=backend)
+        assert result.diff == "" and "dotted `import fetch.…`" in result.error
+
+    def test_rename_dotted_call(self, backend):
+        code = "os.getcwd()\nos . getcwd ()\nx.os.getcwd()\nos.getcwd\n"
+        assert refactored(code, [RenameCall("os.getcwd", "pathlib.Path.cwd")], backend) == \
+            "import pathlib\n\npathlib.Path.cwd()\npathlib.Path.cwd ()\nx.os.getcwd()\nos.getcwd\n"
+
+    @pytest.mark.parametrize("code, new, expected", [
+        # the new call's module is imported after the leading imports
+        ("import os\nos.getcwd()\n", "pathlib.Path.cwd", "import os\nimport pathlib\npathlib.Path.cwd()\n"),
+        # already bound: by an import, a def or a builtin
+        ("from pathlib import Path\nos.getcwd()\n", "Path.cwd", "from pathlib import Path\nPath.cwd()\n"),
+        ("def cwd(): pass\nos.getcwd()\n", "cwd", "def cwd(): pass\ncwd()\n"),
+        ("os.getcwd()\n", "str", "str()\n"),
+        ("from os import getcwd\ngetcwd()\n", "os.getcwd", "from os import getcwd\nimport os\nos.getcwd()\n"),
+    ])
+    def test_rename_call_target_is_defined(self, backend, code, new, expected):
+        old = "getcwd" if "from os" in code else "os.getcwd"
+        assert refactored(code, [RenameCall(old, new)], backend) == expected
+
+    def test_rename_call_refuses_undefined_name(self, backend):
+        result = refactor_source("os.getcwd()\n", [RenameCall("os.getcwd", "cwd")], backend=backend)
+        assert result.diff == "" and result.error == "cannot rename call to 'cwd': it is not defined in this module"
+        # a star import may define it
+        assert refactored("from os import *\nos.getcwd()\n", [RenameCall("os.getcwd", "cwd")], backend) == \
+            "from os import *\ncwd()\n"
+
+    def test_all_transforms_in_one_pass(self, backend):
+        code = "from pathlib import Path\ndef run():\n    data = read()\n    print(data)\n    os.getcwd()\n"
+        transforms = [RenameName("data", "rows"), RenameCall("os.getcwd", "Path.cwd"), RenameName("os", "system"),
+                      PrintToLogging()]
+        result = refactor_source(code, transforms, path="run.py", backend=backend)
+        # The call rename wins where it overlaps the rename of "os"
+        assert result.changes == {"rename:data": 2, "print-to-logging": 1, "rename-call:os.getcwd": 1}
+        assert result.diff.splitlines()[:2] == ["--- a/run.py", "+++ b/run.py"]
+        assert "+    logger.info(rows)" in result.diff and "+    Path.cwd()" in result.diff
+
+    def test_preserves_formatting(self, backend):
+        code = "x = {  'a' :1 }\r\nprint( x  )   # keep\r\n\r\n\r\nlogger = None\r\n"
+        assert refactored(code, [PrintToLogging()], backend) == code.replace("print(", "logger.info(")
+
+    def test_no_changes(self, backend):
+        for code in ("x = 1\n", "x = 'print'\n", "def (:\n"):
+            result = refactor_source(code, [PrintToLogging()], backend=backend)
+            assert (result.diff, result.changes, result.error) == ("", {}, None)
+
+    def test_syntax_error(self, backend):
+        result = refactor_source("def f(:\n    print(\n", [PrintToLogging()], backend=backend)
+        assert result.diff == "" and result.error.startswith("syntax error")
+
+
+def test_libcst_renames_inside_fstrings():
+    pytest.importorskip("libcst")
+    assert refactored('f"{value}"\n', [RenameName("value", "item")], "libcst") == 'f"{item}"\n'
+
+
+class TestParseTransforms:
+    """Test the transform spec parser and validation."""
+
+    def test_parse(self):
+        assert parse_transforms("print-to-logging, rename:a=b, rename-call:os.getcwd=cwd") == (
+            PrintToLogging("info"), RenameName("a", "b"), RenameCall("os.getcwd", "cwd"),
+        )
+        assert parse_transforms("") == ()
+
+    @pytest.mark.parametrize("spec", ["shout", "rename:a", "rename:a=class", "rename:a.b=c",
+                                      "rename-call:os.=x", "print-to-logging:loud"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_transforms(spec)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            refactor_source("x = 1\n", [PrintToLogging()], backend="regex")
+
+
+class TestRefactorFiles:
+    """Test batched multi-file refactoring."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        paths = []
+        for index in range(6):
+            path = tmp_path / f"m{index}.py"
+            path.write_text(f"import os\n\ndef f{index}(x):\n    print(x)\n" if index % 2 else "x = 1\n")
+            paths.append(str(path))
+        (tmp_path / "broken.py").write_text("def (:\n    print(1)\n")
+        paths.append(str(tmp_path / "broken.py"))
+        return paths
+
+    def test_process_pool_matches_in_process(self, files):
+        serial = refactor_files(files, [PrintToLogging()], workers=1)
+        assert refactor_files(files, [PrintToLogging()], workers=2) == serial
+        assert [bool(result.diff) for result in serial] == [False, True] * 3 + [False]
+        assert serial[-1].error.startswith("syntax error")
+        assert all(result.error is None for result in serial[:-1])
+
+    def test_existing_executor(self, files):
+        with ThreadPoolExecutor(2) as executor:
+            results = refactor_files(files[:2], [PrintToLogging()], executor=executor)
+        assert [result.path for result in results] == files[:2]
+
+    def test_write(self, files):
+        os.chmod(files[1], 0o640)
+        results = refactor_files(files, [PrintToLogging()], workers=1, write=True)
+        with open(files[1]) as f:
+            assert "    logger.info(x)\n" in f.read()
+        assert os.stat(files[1]).st_mode & 0o777 == 0o640
+        with open(files[0]) as f:
+            assert f.read() == "x = 1\n"
+        # Written files now need no changes
+        assert [result.diff for result in refactor_files(files, [PrintToLogging()], workers=1)][:-1] == [""] * 6
+        assert results[1].changes == {"print-to-logging": 1}
+
+    def test_missing_file(self, tmp_path):
+        [result] = refactor_files([str(tmp_path / "nope.py")], [PrintToLogging()], workers=1)
+        assert result.error.startswith("unreadable")
@@ -0,0 +1,130 @@
+"""
+Test suite for repo_review.py.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import repo_review
+from repo_review import collect_files, format_report, iter_reviews, report_as_dict, review_repository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    files = {
+        "app.py": "import os\nprint(os.name)\n",
+        "pkg/db.py": 'def get(id):\n    return run("SELECT * FROM t WHERE id=" + id)\n',
+        "pkg/clean.py": "VALUE = 1\n",
+        "web/main.js": "console.log('x'); // TODO: drop\n",
+        "README.md": "print( in prose is not reviewed\n",
+        ".hidden/secret.py": "print(1)\n",
+        "node_modules/lib/index.js": "print(1)\n",
+        "pkg/__pycache__/db.py": "print(1)\n",
+    }
+    for name, text in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def summary(reviews):
+    return {review.path: sorted(f.rule for f in review.findings) for review in reviews}
+
+
+class TestCollectFiles:
+    """Test resolving paths and globs."""
+
+    def test_directory(self, repo):
+        assert [(os.path.relpath(p, repo), language) for p, language in collect_files(str(repo))] == [
+            ("app.py", "python"),
+            (os.path.join("pkg", "clean.py"), "python"),
+            (os.path.join("pkg", "db.py"), "python"),
+            (os.path.join("web", "main.js"), "javascript"),
+        ]
+
+    def test_glob_relative_to_root(self, repo):
+        found = collect_files("**/*.py", root=str(repo))
+        assert [os.path.relpath(p, repo) for p, _ in found] == [
+            "app.py",
+            os.path.join("pkg", "clean.py"),
+            os.path.join("pkg", "db.py"),
+        ]
+
+    def test_single_file_of_unknown_type(self, repo):
+        assert collect_files(str(repo / "README.md")) == [(str(repo / "README.md"), "text")]
+
+    @pytest.mark.parametrize("target", ["/", "..", "~", "/etc/passwd", "../**/*.py", "/**/*.py", "*/../../**"])
+    def test_confine_rejects_targets_outside_root(self, repo, target):
+        with pytest.raises(ValueError, match="outside"):
+            collect_files(target, root=str(repo / "pkg"), confine=True)
+
+    def test_confine_drops_symlinks_out_of_root(self, repo, tmp_path_factory):
+        outside = tmp_path_factory.mktemp("outside") / "secret.py"
+        outside.write_text("KEY = 1\n")
+        (repo / "pkg" / "link.py").symlink_to(outside)
+        (repo / "pkg" / "inner.py").symlink_to(repo / "pkg" / "db.py")
+
+        found = [os.path.basename(p) for p, _ in collect_files("pkg", root=str(repo), confine=True)]
+        assert found == ["clean.py", "db.py", "inner.py"]
+        assert "link.py" in [os.path.basename(p) for p, _ in collect_files("pkg", root=str(repo))]
+        with pytest.raises(ValueError):
+            collect_files("pkg/link.py", root=str(repo), confine=True)
+
+    def test_missing(self, repo):
+        with pytest.raises(FileNotFoundError):
+            collect_files("nope", root=str(repo))
+        assert collect_files("*.rs", root=str(repo)) == []
+
+
+class TestReviewRepository:
+    """Test the parallel review and the aggregated report."""
+
+    EXPECTED = {
+        "app.py": ["print-call"],
+        os.path.join("pkg", "clean.py"): [],
+        os.path.join("pkg", "db.py"): ["sql-string-concat"],
+        os.path.join("web", "main.js"): ["todo-comment"],
+    }
+
+    def test_in_process(self, repo):
+        report = review_repository(str(repo), workers=1)
+        assert summary(report.files) == self.EXPECTED
+        assert [review.path for review in report.files] == sorted(self.EXPECTED)
+        assert report.by_severity == {"warning": 1, "error": 1, "info": 1}
+        assert report.errors == 0
+
+    def test_process_pool_matches_in_process(self, repo, monkeypatch):
+        # One file per batch so several batches are in flight
+        monkeypatch.setattr(repo_review, "BATCH_BYTES", 1)
+        streamed = []
+        report = review_repository(str(repo), workers=2, on_file=streamed.append)
+        assert summary(report.files) == self.EXPECTED
+        assert sorted(review.path for review in streamed) == sorted(self.EXPECTED)
+
+    def test_existing_executor(self, repo):
+        with ThreadPoolExecutor(2) as executor:
+            assert summary(iter_reviews(str(repo), executor=executor)) == self.EXPECTED
+
+    def test_binary_and_oversized_files(self, repo, monkeypatch):
+        (repo / "blob.py").write_bytes(b"\0\1\2")
+        monkeypatch.setattr(repo_review, "MAX_FILE_BYTES", 40)
+        report = review_repository(str(repo), workers=1)
+        errors = {review.path: review.error for review in report.files if review.error}
+        assert errors == {"blob.py": "skipped: binary file", os.path.join("pkg", "db.py"): "skipped: larger than 40 bytes"}
+        assert report.errors == 2
+
+    def test_report_formats(self, repo):
+        report = review_repository("pkg", root=str(repo), workers=1)
+        data = json.loads(json.dumps(report_as_dict(report)))
+        assert data["files_reviewed"] == 2
+        assert data["findings"] == 1
+        assert [entry["path"] for entry in data["files"]] == ["db.py"]
+        assert data["files"][0]["findings"][0]["rule"] == "sql-string-concat"
+
+        text = format_report(report)
+        assert text.startswith("Reviewed 2 files under pkg")
+        assert "db.py\n- line 2: " in text and "[sql-string-concat]" in text
@@ -0,0 +1,179 @@
+"""
+Test suite for review_engine.py.
+
+Covers the built-in rules, unit splitting and incremental caching. Does not
+import claude_agent_sdk, so it runs without the SDK installed.
+"""
+
+import ast
+
+import pytest
+
+from review_engine import ReviewEngine, RuleRegistry, format_review
+
+SAMPLE = '''import os
+# TODO: tidy imports
+HANDLERS = [print]  # a reference, not a call
+
+
+@register
+class Service(Base):
+    """Docstring mentioning print( and # TODO is not code."""
+    factory = eval("dict")
+
+    def handle(self, items=[]):
+        print(items)  # FIXME
+        try:
+            pass
+        except:
+            pass
+
+    async def close(self):
+        my_print("print(")
+
+
+def helper(options={}):
+    message = "TODO inside a string"
+    return lambda cache=[]: cache
+# trailing TODO
+'''
+
+
+def rules_and_lines(findings):
+    return [(f.rule, f.line) for f in findings]
+
+
+class TestRules:
+    """Test suite for the default rules."""
+
+    def test_sample_findings(self):
+        """Test every rule on code where substring checks would misfire."""
+        assert rules_and_lines(ReviewEngine().review(SAMPLE)) == [
+            ("todo-comment", 2),
+            ("eval-exec", 9),
+            ("mutable-default", 11),
+            ("print-call", 12),
+            ("todo-comment", 12),
+            ("bare-except", 15),
+            ("mutable-default", 22),
+            ("mutable-default", 24),
+            ("todo-comment", 25),
+        ]
+
+    def test_columns(self):
+        """Test that columns are absolute even for indented units."""
+        findings = ReviewEngine().review("class A:\n    def f(self):\n        print(1)  # TODO\n")
+        assert [(f.rule, f.col) for f in findings] == [("print-call", 8), ("todo-comment", 18)]
+
+    def test_clean_code(self):
+        """Test that clean code has no findings and renders the no-issues message."""
+        findings = ReviewEngine().review("import logging\n\nlogging.info('ok')\n")
+        assert findings == []
+        assert format_review(findings) == "Code review for python: No issues found!"
+
+    def test_syntax_error(self):
+        """Test that unparsable code reports the syntax error and still finds TODOs."""
+        findings = ReviewEngine().review("def broken(:\n    pass  # TODO\n")
+        assert rules_and_lines(findings) == [("syntax-error", 1), ("todo-comment", 2)]
+
+    def test_other_languages_use_line_scan(self):
+        """Test the plain-text fallback for non-Python code."""
+        findings = ReviewEngine().review('console.log("x");\nprintf("y"); // TODO\n', language="c")
+        assert rules_and_lines(findings) == [("print-call", 2), ("todo-comment", 2)]
+
+    def test_format_review(self):
+        """Test the tool's text rendering."""
+        text = format_review(ReviewEngine().review("print(1)\n"), "python")
+        assert text == ("Code review for python:\n"
+                        "- line 1: Consider using logging instead of print statements [print-call]")
+
+
+class TestIncrementalReview:
+    """Test suite for unit caching."""
+
+    def test_unchanged_file_is_cached(self):
+        """Test that an identical file is answered from the file cache."""
+        engine = ReviewEngine()
+        first = engine.review(SAMPLE)
+        second = engine.review(SAMPLE)
+
+        stats = engine.stats()
+        assert first == second
+        assert (stats.files, stats.files_cached) == (2, 1)
+
+    def test_only_changed_units_are_rechecked(self):
+        """Test that editing one method re-checks just that method."""
+        engine = ReviewEngine()
+        engine.review(SAMPLE)
+        checked = engine.stats().units_checked
+
+        edited = SAMPLE.replace("print(items)", "print(items, sep='')")
+        findings = engine.review(edited)
+
+        assert engine.stats().units_checked == checked + 1
+        assert findings == ReviewEngine().review(edited)
+
+    def test_shifted_lines_reuse_cached_units(self):
+        """Test that inserting lines above a unit keeps its findings correct."""
+        engine = ReviewEngine()
+        before = engine.review(SAMPLE)
+        checked = engine.stats().units_checked
+
+        shifted = "import sys\n\n\n" + SAMPLE
+        after = engine.review(shifted)
+
+        assert engine.stats().units_checked == checked + 1  # only the import block changed
+        assert rules_and_lines(after) == [(rule, line + 3) for rule, line in rules_and_lines(before)]
+
+    def test_methods_are_separate_units(self):
+        """Test that a class splits into one unit per method plus the class itself."""
+        engine = ReviewEngine()
+        engine.review("class A:\n    x = 1\n\n    def f(self):\n        pass\n\n    def g(self):\n        pass\n")
+        assert engine.stats().units_checked == 3
+
+    def test_unit_cache_is_bounded(self):
+        """Test that the least recently used units are evicted."""
+        engine = ReviewEngine(max_units=2)
+        engine.review("def a():\n    pass\n\n\ndef b():\n    pass\n\n\ndef c():\n    pass\n")
+        assert engine.stats().entries == 2
+
+    def test_cache_clear(self):
+        """Test that clearing drops entries and counters."""
+        engine = ReviewEngine()
+        engine.review(SAMPLE)
+        engine.cache_clear()
+        assert engine.stats() == (0, 0, 0, 0, 0, 0)
+
+
+class TestRuleRegistry:
+    """Test suite for custom registries."""
+
+    def test_custom_rules(self):
+        """Test registering node and comment rules on a fresh registry."""
+        registry = RuleRegistry()
+
+        @registry.node_rule("no-assert", ast.Assert, severity="error")
+        def no_assert(node):
+            return "assert is stripped with -O"
+
+        @registry.comment_rule("no-hack")
+        def no_hack(text):
+            return "hack" if "HACK" in text else None
+
+        findings = ReviewEngine(registry).review("assert x  # HACK\nprint(x)\n")
+        assert [(f.rule, f.severity) for f in findings] == [("no-assert", "error"), ("no-hack", "info")]
+        assert registry.rule_ids == ["no-assert", "no-hack"]
+
+    def test_new_rule_invalidates_cache(self):
+        """Test that registering a rule after a review is picked up."""
+        registry = RuleRegistry()
+        engine = ReviewEngine(registry)
+        assert engine.review("assert x\n") == []
+
+        registry.node_rule("no-assert", ast.Assert)(lambda node: "no asserts")
+        assert rules_and_lines(engine.review("assert x\n")) == [("no-assert", 1)]
+
+    def test_invalid_severity(self):
+        """Test that unknown severities are rejected."""
+        with pytest.raises(ValueError):
+            RuleRegistry().node_rule("x", ast.Call, severity="fatal")
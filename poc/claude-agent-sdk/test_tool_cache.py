@@ -0,0 +1,163 @@
+"""
+Test suite for tool_cache.py.
+
+Handlers are plain async functions, so this runs without claude_agent_sdk.
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import pytest
+
+from tool_cache import ToolCache, canonical_key, file_version
+
+
+def counting_tool(cache, **memoize):
+    calls = []
+
+    @cache.memoize(**memoize)
+    async def echo(args):
+        calls.append(args)
+        if args.get("fail"):
+            return {"content": [{"type": "text", "text": "bad"}], "is_error": True}
+        return {"content": [{"type": "text", "text": str(args.get("text"))}]}
+
+    return echo, calls
+
+
+def call(handler, args):
+    return asyncio.run(handler(args))
+
+
+class TestMemoize:
+    """Test the handler decorator."""
+
+    def test_hit_independent_of_argument_order(self):
+        cache = ToolCache()
+        echo, calls = counting_tool(cache)
+        first = call(echo, {"text": "a", "language": "python"})
+        assert call(echo, {"language": "python", "text": "a"}) == first
+        assert len(calls) == 1
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries, stats.hit_ratio) == (1, 1, 1, 0.5)
+        assert echo.__name__ == "echo" and echo.cache is cache
+
+    def test_results_are_copies(self):
+        cache = ToolCache()
+        echo, _ = counting_tool(cache)
+        call(echo, {"text": "a"})["content"].clear()
+        assert call(echo, {"text": "a"})["content"] == [{"type": "text", "text": "a"}]
+
+    def test_errors_and_unserializable_args_are_not_cached(self):
+        cache = ToolCache()
+        echo, calls = counting_tool(cache)
+        call(echo, {"fail": True})
+        call(echo, {"fail": True})
+        call(echo, {"text": b"bytes"})
+        call(echo, {"text": float("nan")})
+        assert len(calls) == 4
+        assert cache.stats().entries == 0
+
+    def test_name_and_version_separate_entries(self):
+        cache = ToolCache()
+        v1, calls1 = counting_tool(cache, version="1")
+        v2, calls2 = counting_tool(cache, version="2")
+        renamed, calls3 = counting_tool(cache, name="other", version="1")
+        for handler in (v1, v2, renamed, v1):
+            call(handler, {"text": "a"})
+        assert (len(calls1), len(calls2), len(calls3)) == (1, 1, 1)
+
+    def test_wraps_tool_objects(self):
+        @dataclass
+        class Tool:
+            name: str
+            handler: Callable[..., Any]
+
+        calls = []
+
+        async def handler(args):
+            calls.append(args)
+            return {"content": []}
+
+        original = Tool("code_review", handler)
+        cached = ToolCache().memoize()(original)
+        call(cached.handler, {"code": "x"})
+        call(cached.handler, {"code": "x"})
+        assert len(calls) == 1
+        assert original.handler is handler and cached.name == "code_review"
+
+
+class TestToolCache:
+    """Test the byte budget and persistence."""
+
+    def test_lru_eviction_by_bytes(self):
+        result = {"text": "x" * 100}
+        size = len(b'{"text":""}') + 100
+        cache = ToolCache(max_bytes=3 * size)
+        for key in "abc":
+            cache.put(key, result)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("d", result)
+        assert cache.get("b") is None
+        assert all(cache.get(key) == result for key in "acd")
+        stats = cache.stats()
+        assert (stats.entries, stats.bytes, stats.evictions) == (3, 3 * size, 1)
+
+    def test_oversized_results_not_held(self):
+        cache = ToolCache(max_bytes=10)
+        cache.put("big", {"text": "x" * 100})
+        assert cache.get("big") is None
+        assert cache.stats().bytes == 0
+
+    def test_replacing_a_key_keeps_byte_count(self):
+        cache = ToolCache()
+        cache.put("k", {"v": 1})
+        cache.put("k", {"v": 22})
+        assert cache.stats().bytes == len(b'{"v":22}')
+
+    def test_disk_persistence(self, tmp_path):
+        echo, calls = counting_tool(ToolCache(path=tmp_path / "cache"))
+        call(echo, {"text": "a"})
+
+        restarted = ToolCache(path=tmp_path / "cache")
+        echo, calls = counting_tool(restarted)
+        assert call(echo, {"text": "a"})["content"][0]["text"] == "a"
+        assert calls == []
+        assert (restarted.stats().hits, restarted.stats().disk_hits, restarted.stats().entries) == (1, 1, 1)
+
+        # Corrupt files are treated as misses
+        for name in os.listdir(tmp_path / "cache"):
+            (tmp_path / "cache" / name).write_text("{truncated")
+        restarted = ToolCache(path=tmp_path / "cache")
+        echo, calls = counting_tool(restarted)
+        call(echo, {"text": "a"})
+        assert len(calls) == 1
+
+    def test_cache_clear(self, tmp_path):
+        cache = ToolCache(path=tmp_path)
+        cache.put("k", {"v": 1})
+        cache.cache_clear()
+        assert cache.stats().entries == 0
+        assert cache.get("k") == {"v": 1}  # still on disk
+        cache.cache_clear(disk=True)
+        assert cache.get("k") is None
+        assert os.listdir(tmp_path) == []
+
+    def test_invalid_budget(self):
+        with pytest.raises(ValueError):
+            ToolCache(max_bytes=0)
+
+
+def test_canonical_key_and_file_version(tmp_path):
+    assert canonical_key("t", {"a": [1, {"x": 1, "y": 2}]}) == canonical_key("t", {"a": [1, {"y": 2, "x": 1}]})
+    assert canonical_key("t", {"a": [1, 2]}) != canonical_key("t", {"a": [2, 1]})
+    assert canonical_key("t", {"a": 1}) != canonical_key("u", {"a": 1})
+
+    path = tmp_path / "rules.json"
+    path.write_text("[]")
+    before = file_version(path)
+    assert file_version(path) == before
+    path.write_text("[1]")
+    assert file_version(path) != before
@@ -0,0 +1,233 @@
+"""
+Opt-in result cache for deterministic MCP tools.
+
+A tool handler takes one JSON-like `args` dict and returns a JSON-like
+result. ToolCache.memoize() wraps such a handler so that a call whose
+arguments were seen before returns the stored result without running the
+tool. The key is a hash of the tool name, a version string and the
+arguments serialized canonically (sorted keys, no whitespace), so
+{"code": c, "language": "python"} and {"language": "python", "code": c}
+share an entry. Bump the version (see file_version()) when the tool's
+behaviour changes; old entries are then never looked up again.
+
+Results are stored as their JSON encoding, which is what the byte budget
+counts; least recently used results are evicted to stay under it. Every hit
+decodes a fresh copy, so callers may mutate what they get back. Results
+with "is_error" set are not cached, and arguments that are not JSON
+serializable bypass the cache.
+
+With a `path`, results are also written to that directory (one file per
+key, written atomically) and read back on a memory miss, so a new session
+starts warm. The directory is not bounded by max_bytes.
+
+Example:
+    >>> import asyncio
+    >>> cache = ToolCache(max_bytes=1 << 20)
+    >>> @cache.memoize(version="1")
+    ... async def shout(args):
+    ...     return {"content": [{"type": "text", "text": args["text"].upper()}]}
+    >>> asyncio.run(shout({"text": "hi"}))["content"][0]["text"]
+    'HI'
+    >>> asyncio.run(shout({"text": "hi"}))["content"][0]["text"]
+    'HI'
+    >>> cache.stats().hits, cache.stats().misses
+    (1, 1)
+"""
+
+import copy
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+ToolCacheStats = namedtuple(
+    "ToolCacheStats",
+    ["entries", "bytes", "max_bytes", "hits", "misses", "disk_hits", "evictions", "hit_ratio"],
+)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def canonical_key(tool: str, args: Any, version: str = "") -> str:
+    """
+    Hash of a tool call, independent of argument order.
+
+    Raises:
+        TypeError: If args is not JSON serializable.
+        ValueError: If args contains NaN or infinity.
+
+    Examples:
+        >>> canonical_key("t", {"a": 1, "b": [2]}) == canonical_key("t", {"b": [2], "a": 1})
+        True
+        >>> canonical_key("t", {"a": 1}) == canonical_key("t", {"a": 1}, version="2")
+        False
+    """
+    text = json.dumps([tool, version, args], sort_keys=True, separators=(",", ":"),
+                      ensure_ascii=False, allow_nan=False)
+    return hashlib.blake2b(text.encode("utf-8", errors="surrogatepass"), digest_size=20).hexdigest()
+
+
+def file_version(*paths: Union[str, os.PathLike]) -> str:
+    """A short hash of the given files' contents, for use as a memoize() version."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ToolCache:
+    """
+    Byte-bounded LRU cache of tool results, optionally persisted to a directory.
+
+    Args:
+        max_bytes: Upper bound on the encoded size of results held in memory.
+        path: Directory to persist results in (created if missing), or None.
+
+    Raises:
+        ValueError: If max_bytes is not positive.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, path: Optional[Union[str, os.PathLike]] = None):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.max_bytes = max_bytes
+        self.path = os.fspath(path) if path is not None else None
+        if self.path is not None:
+            os.makedirs(self.path, exist_ok=True)
+        # key -> result encoded as JSON
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def memoize(self, name: Optional[str] = None, version: str = ""):
+        """
+        Decorator caching an async tool handler's results.
+
+        Works below `@tool(...)` (wrapping the handler function) or above it
+        (wrapping the tool object's handler). The cache key uses `name`,
+        defaulting to the tool's name or the function's name.
+        """
+
+        def decorate(target):
+            if hasattr(target, "handler") and hasattr(target, "name"):
+                wrapped = copy.copy(target)
+                wrapped.handler = self._wrap(target.handler, name or target.name, version)
+                return wrapped
+            return self._wrap(target, name or target.__name__, version)
+
+        return decorate
+
+    def _wrap(self, handler: Handler, tool: str, version: str) -> Handler:
+        @functools.wraps(handler)
+        async def cached(args: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                key = canonical_key(tool, args, version)
+            except (TypeError, ValueError):
+                return await handler(args)
+            result = self.get(key)
+            if result is None:
+                result = await handler(args)
+                if not result.get("is_error"):
+                    self.put(key, result)
+            return result
+
+        cached.cache = self
+        return cached
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the result stored under key, or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return json.loads(data)
+
+        data = self._read(key) if self.path is not None else None
+        with self._lock:
+            if data is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._insert(key, data)
+        return json.loads(data)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a JSON-serializable result under key (and on disk, if persistent)."""
+        data = json.dumps(result, separators=(",", ":"), ensure_ascii=False).encode("utf-8", errors="surrogatepass")
+        with self._lock:
+            self._insert(key, data)
+        if self.path is not None:
+            self._write(key, data)
+
+    def _insert(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self._evictions += 1
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._file(key), "rb") as f:
+                data = f.read()
+            json.loads(data)
+        except (OSError, ValueError):
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        import tempfile
+
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=f".{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(data)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def stats(self) -> ToolCacheStats:
+        """Return entry count, bytes held, hit/miss/disk-hit/eviction counts and hit ratio."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return ToolCacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+                hits=self._hits,
+                misses=self._misses,
+                disk_hits=self._disk_hits,
+                evictions=self._evictions,
+                hit_ratio=self._hits / lookups if lookups else 0.0,
+            )
+
+    def cache_clear(self, disk: bool = False) -> None:
+        """Drop every result held in memory and reset the counters; with disk=True also delete persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._disk_hits = self._evictions = 0
+        if disk and self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    os.unlink(os.path.join(self.path, name))
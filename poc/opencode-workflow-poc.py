@@ -4,86 +4,157 @@ OpenCode Workflow PoC Script
 测试 "规划 → 审批 → 执行" 工作流的可行性
 """
 
-import subprocess
 import json
+import os
 import time
 import sys
+import uuid
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+from opencode_workflow import (
+    CLIDriver,
+    Driver,
+    MetricsRecorder,
+    OpenCodeRunError,
+    PlanCache,
+    PlanStore,
+    SessionIndex,
+    StepFinishEvent,
+    TextEvent,
+    ToolCallEvent,
+    ToolResultEvent,
+    plan_cache_key,
+    project_fingerprint,
+    to_event,
+)
+
+
+# 续接规划 session 执行时发送的指令
+CONTINUE_PROMPT = "The plan above has been approved. Execute it now."
+
+
+def event_to_json(event) -> Dict[str, Any]:
+    """json.dumps 的 default 钩子：类型化事件序列化为紧凑 dict"""
+    return event.to_dict()
+
 
 class OpenCodeWorkflowPoC:
     """OpenCode 工作流概念验证"""
 
-    def __init__(self, project_dir: str):
+    def __init__(
+        self,
+        project_dir: str,
+        opencode_cmd: Optional[list[str]] = None,
+        plan_cache: Optional[PlanCache] = None,
+        plan_store: Optional[PlanStore] = None,
+        session_index: Optional[SessionIndex] = None,
+        reuse_session: bool = True,
+        driver: Optional[Driver] = None,
+    ):
         self.project_dir = Path(project_dir)
-        self.plan_file = Path("/tmp/opencode_plan.json")
+        self.opencode_cmd = list(opencode_cmd or ["opencode"])
+        # 后端驱动：默认每个 phase 启动一次 CLI；可换成常驻服务或回放驱动
+        self.driver = driver or CLIDriver(self.opencode_cmd, cwd=self.project_dir)
+        # 每个任务一条记录，多个工作流进程可安全共享同一目录
+        self.plan_store = plan_store or PlanStore("/tmp/opencode_plans")
+        self.session_index = session_index or SessionIndex("/tmp/opencode_sessions.db")
+        # 传入 PlanCache(...) 启用计划缓存
+        self.plan_cache = plan_cache
         self.session_id: Optional[str] = None
-
-    def run_command(self, cmd: list[str], capture_output: bool = True) -> subprocess.CompletedProcess:
-        """执行命令并返回结果"""
-        print(f"🔧 Running: {' '.join(cmd)}")
-        result = subprocess.run(
-            cmd,
-            cwd=self.project_dir,
-            capture_output=capture_output,
-            text=True
-        )
-        return result
-
-    def phase1_planning(self, task_description: str) -> Dict[str, Any]:
+        # 执行阶段续接规划 session，而不是把整份计划重新发给新 session
+        self.reuse_session = reuse_session
+        self.metrics = MetricsRecorder()
+        self.metrics_file = Path("/tmp/opencode_metrics.jsonl")
+        self.prometheus_file = Path("/tmp/opencode_metrics.prom")
+
+    def stream_agent(self, agent: str, prompt: str, session_id: Optional[str] = None, on_invalid=None):
+        """通过驱动运行 agent：事件到达即可处理"""
+        print(f"🔧 Running: {self.driver.describe(agent, session_id)}")
+        return self.driver.run(agent, prompt, session_id=session_id, on_invalid=on_invalid)
+
+    def phase1_planning(self, task_description: str, task_id: Optional[str] = None) -> Dict[str, Any]:
         """Phase 1: 规划阶段 - 生成执行计划"""
+        task_id = task_id or uuid.uuid4().hex[:12]
         print("\n" + "="*60)
         print("📋 Phase 1: 规划阶段")
         print("="*60)
 
-        # 使用 plan agent + JSON 格式
-        cmd = ["opencode", "run", "--agent", "plan", "--format", "json", task_description]
-        result = self.run_command(cmd)
+        # 先查计划缓存：相同任务 + 相同 agent + 未变化的项目目录直接复用上次的计划
+        cache_key = None
+        cached = None
+        if self.plan_cache is not None:
+            cache_key = plan_cache_key(task_description, "plan", project_fingerprint(self.project_dir))
+            cached = self.plan_cache.get(cache_key)
+
+        if cached is not None:
+            print(f"\n📦 命中计划缓存 ({cache_key[:12]})，跳过 opencode 规划调用")
+            plan_text = cached["plan_text"]
+            events = [to_event(event) for event in cached["events"]]
+        else:
+            plan_text, events = self._stream_plan(task_description, task_id)
+            if self.plan_cache is not None:
+                self.plan_cache.put(cache_key, {
+                    "plan_text": plan_text,
+                    "events": [event.to_dict() for event in events],
+                })
+
+        # 保存解析后的计划；只有本次规划创建的 session 才能续接，
+        # 缓存事件里的 session 属于旧的运行，通常已经执行过该计划
+        session_id = None
+        if cached is None:
+            session_id = next((event.session_id for event in events if event.session_id), None)
+        plan_data = {
+            "task_id": task_id,
+            "session_id": session_id,
+            "task": task_description,
+            "plan_text": plan_text,
+            "events": events
+        }
 
-        if result.returncode != 0:
-            print(f"❌ Error: {result.stderr}")
-            sys.exit(1)
+        self.plan_store.put(plan_data)
+        self.session_id = plan_data["session_id"]
+        if plan_data["session_id"]:
+            self.session_index.record_task(task_id, plan_data["session_id"], agent="plan")
+        print(f"\n✅ 计划已保存到: {self.plan_store.data_path} (task_id={task_id})")
+        print(f"\n📋 提取的计划内容:\n{'-'*60}\n{plan_text}\n{'-'*60}")
+
+        return plan_data
 
-        # 解析 JSON 事件流
-        output = result.stdout
+    def _stream_plan(self, task_description: str, task_id: str) -> tuple[str, list]:
+        """运行 plan agent 并逐个处理事件，返回 (计划文本, 事件列表)"""
+        def warn_invalid(line: str):
+            print(f"  ⚠️  无法解析行: {line[:50]}...")
+
+        # 解析 JSON 事件流（边读边处理）
         print(f"\n📄 OpenCode JSON 事件流:")
 
         plan_text = ""
         events = []
 
-        for line in output.strip().split('\n'):
-            if not line.strip():
-                continue
-            try:
-                event = json.loads(line)
+        with self.stream_agent("plan", task_description, on_invalid=warn_invalid) as stream:
+            for event in stream:
                 events.append(event)
+                self.metrics.observe_event(task_id, "plan", event)
 
                 # 提取 text 类型的事件（包含计划内容）
-                if event.get("type") == "text":
-                    text_content = event.get("part", {}).get("text", "")
-                    plan_text += text_content
-                    print(f"  📝 {event['type']}: {text_content[:100]}...")
-                elif event.get("type") == "step_finish":
-                    tokens = event.get("part", {}).get("tokens", {})
-                    print(f"  ✅ {event['type']}: tokens={tokens}")
+                if isinstance(event, TextEvent):
+                    plan_text += event.text
+                    print(f"  📝 {event.type}: {event.text[:100]}...")
+                elif isinstance(event, StepFinishEvent):
+                    print(f"  ✅ {event.type}: tokens={event.tokens}")
                 else:
-                    print(f"  🔹 {event['type']}")
-            except json.JSONDecodeError:
-                print(f"  ⚠️  无法解析行: {line[:50]}...")
+                    print(f"  🔹 {event.type}")
 
-        # 保存解析后的计划
-        plan_data = {
-            "task": task_description,
-            "plan_text": plan_text,
-            "events": events
-        }
+        if stream.returncode != 0:
+            print(f"❌ Error: {stream.stderr}")
+            sys.exit(1)
 
-        self.plan_file.write_text(json.dumps(plan_data, indent=2))
-        print(f"\n✅ 计划已保存到: {self.plan_file}")
-        print(f"\n📋 提取的计划内容:\n{'-'*60}\n{plan_text}\n{'-'*60}")
+        self.metrics.observe_first_output("plan", stream.first_output_latency)
+        if stream.first_output_latency is not None:
+            print(f"\n⏱️  首个输出事件耗时: {stream.first_output_latency:.3f}s")
 
-        return plan_data
+        return plan_text, events
 
     def phase2_approval(self, plan: Dict[str, Any], auto_approve: bool = True) -> bool:
         """Phase 2: 审批阶段 - 人工审查"""
@@ -99,7 +170,7 @@ class OpenCodeWorkflowPoC:
         if plan_text:
             print(plan_text)
         else:
-            print(json.dumps(plan, indent=2)[:500] + "...")
+            print(json.dumps(plan, indent=2, default=event_to_json)[:500] + "...")
 
         print("-" * 60)
 
@@ -123,77 +194,92 @@ class OpenCodeWorkflowPoC:
         print("="*60)
 
         # 提取任务描述
+        task_id = plan.get("task_id", "")
         task = plan.get("task", "")
         plan_text = plan.get("plan_text", "")
+        plan_session_id = plan.get("session_id") if self.reuse_session else None
 
-        # 构建执行指令
-        execution_prompt = f"Execute this plan:\n{plan_text}\n\nOriginal task: {task}"
+        # 构建执行指令：续接规划 session 时计划已在上下文中，只需发送简短指令
+        if plan_session_id:
+            execution_prompt = CONTINUE_PROMPT
+        else:
+            execution_prompt = f"Execute this plan:\n{plan_text}\n\nOriginal task: {task}"
 
         print(f"\n🔹 使用 build agent 执行计划...")
         print(f"执行指令: {execution_prompt[:100]}...")
+        if plan_session_id:
+            print(f"🔗 续接规划 session: {plan_session_id}")
 
-        # 使用 build agent 执行
-        cmd = ["opencode", "run", "--agent", "build", "--format", "json", execution_prompt]
-        result = self.run_command(cmd)
-
-        if result.returncode != 0:
-            print(f"❌ 执行失败: {result.stderr}")
-            return False
-
-        # 解析执行结果
-        output = result.stdout
+        # 解析执行结果（事件到达即输出，不保留历史事件）
         print(f"\n📄 执行结果 (JSON 事件流):")
 
-        for line in output.strip().split('\n'):
-            if not line.strip():
-                continue
-            try:
-                event = json.loads(line)
-                event_type = event.get("type")
-
-                if event_type == "text":
-                    text = event.get("part", {}).get("text", "")
-                    print(f"  📝 {text[:100]}...")
-                elif event_type == "tool_call":
-                    tool = event.get("part", {}).get("tool", {})
-                    print(f"  🔧 Tool call: {tool.get('name', 'unknown')}")
-                elif event_type == "tool_result":
+        session_id = None
+        with self.stream_agent("build", execution_prompt, session_id=plan_session_id) as stream:
+            for event in stream:
+                self.metrics.observe_event(task_id, "execute", event)
+                session_id = session_id or event.session_id
+                if isinstance(event, TextEvent):
+                    print(f"  📝 {event.text[:100]}...")
+                elif isinstance(event, ToolCallEvent):
+                    print(f"  🔧 Tool call: {event.name}")
+                elif isinstance(event, ToolResultEvent):
                     print(f"  ✅ Tool result received")
-                elif event_type == "step_finish":
-                    tokens = event.get("part", {}).get("tokens", {})
-                    print(f"  ✅ Step finished: tokens={tokens}")
+                elif isinstance(event, StepFinishEvent):
+                    print(f"  ✅ Step finished: tokens={event.tokens}")
                 else:
-                    print(f"  🔹 {event_type}")
-            except json.JSONDecodeError:
-                pass
+                    print(f"  🔹 {event.type}")
+
+        if stream.returncode != 0:
+            print(f"❌ 执行失败: {stream.stderr}")
+            return False
+
+        self.metrics.observe_first_output("execute", stream.first_output_latency)
+        if stream.first_output_latency is not None:
+            print(f"⏱️  首个输出事件耗时: {stream.first_output_latency:.3f}s")
+
+        if session_id:
+            self.session_id = session_id
+            if task_id:
+                self.session_index.record_task(task_id, session_id, agent="build")
 
         print(f"\n✅ 执行完成")
         return True
 
-    def phase4_persistence_test(self) -> bool:
-        """Phase 4: 持久性测试 - 验证 session list 功能"""
+    def phase4_persistence_test(self, task_id: Optional[str] = None) -> bool:
+        """Phase 4: 持久性测试 - 验证 session list 功能并增量更新本地 session 索引"""
         print("\n" + "="*60)
         print("💾 Phase 4: Session 管理测试")
         print("="*60)
 
-        # 测试 session list
+        # 测试 session list：流式解析输出，逐个合并到本地索引
         print(f"\n🔹 测试 session list...")
-        result = self.run_command(["opencode", "session", "list", "--format", "json"])
+        print(f"🔧 Running: [{self.driver.name}] session list --format json")
 
-        if result.returncode == 0:
-            print(f"✅ 成功获取 session 列表")
-            try:
-                sessions = json.loads(result.stdout)
-                print(f"📋 Session 数量: {len(sessions) if isinstance(sessions, list) else 'N/A'}")
-                print(f"内容预览:\n{json.dumps(sessions, indent=2)[:500]}...")
-                return True
-            except json.JSONDecodeError:
-                print(f"输出:\n{result.stdout[:500]}...")
-                return True
-        else:
-            print(f"❌ 获取 session 列表失败: {result.stderr}")
+        parse_error = None
+        changed = 0
+        try:
+            with self.driver.session_list() as stream:
+                try:
+                    changed = self.session_index.sync_from_stream(stream)
+                except ValueError as e:
+                    parse_error = e
+        except OpenCodeRunError as e:
+            print(f"❌ 获取 session 列表失败: {e.stderr}")
             return False
 
+        print(f"✅ 成功获取 session 列表")
+        if parse_error is not None:
+            print(f"⚠️  无法解析 session 列表: {parse_error}")
+            return True
+
+        print(f"📋 Session 数量: {self.session_index.count()} (本次新增/更新 {changed})")
+        page = self.session_index.query(limit=5)
+        for session in page.items:
+            print(f"  • {session.id}  {session.title[:60]}")
+        if task_id is not None:
+            print(f"🔗 任务 {task_id} 的最新 session: {self.session_index.latest_for_task(task_id)}")
+        return True
+
     def run_poc(self, task_description: str, auto_approve: bool = True):
         """运行完整的 PoC 流程"""
         print("\n" + "="*60)
@@ -202,21 +288,30 @@ class OpenCodeWorkflowPoC:
         print(f"项目目录: {self.project_dir}")
         print(f"任务描述: {task_description}")
 
+        task_id = uuid.uuid4().hex[:12]
+        # 每次运行独立统计，导出时追加为 JSONL 中的一行
+        self.metrics = MetricsRecorder(run_id=task_id)
+
         try:
             # Phase 1: 规划
-            plan = self.phase1_planning(task_description)
+            with self.metrics.phase(task_id, "plan"):
+                plan = self.phase1_planning(task_description, task_id=task_id)
 
             # Phase 2: 审批
-            if not self.phase2_approval(plan, auto_approve=auto_approve):
+            with self.metrics.phase(task_id, "approval"):
+                approved = self.phase2_approval(plan, auto_approve=auto_approve)
+            if not approved:
                 print("\n❌ PoC 终止：计划未获批准")
                 return
 
             # Phase 3: 执行
-            execution_success = self.phase3_execution(plan)
+            with self.metrics.phase(task_id, "execute"):
+                execution_success = self.phase3_execution(plan)
 
             # Phase 4: 持久性测试
             if execution_success:
-                persistence_success = self.phase4_persistence_test()
+                with self.metrics.phase(task_id, "sessions"):
+                    persistence_success = self.phase4_persistence_test(task_id)
 
             # 总结
             print("\n" + "="*60)
@@ -227,6 +322,10 @@ class OpenCodeWorkflowPoC:
             print(f"{'✅' if execution_success else '❌'} Phase 3 (执行): {'成功' if execution_success else '失败'}")
             if execution_success:
                 print(f"{'✅' if persistence_success else '❌'} Phase 4 (持久性): {'成功' if persistence_success else '失败'}")
+            if self.plan_cache is not None:
+                stats = self.plan_cache.stats()
+                print(f"📦 计划缓存: hits={stats['hits']}, misses={stats['misses']}, evictions={stats['evictions']}")
+            self.report_metrics(task_id)
 
         except KeyboardInterrupt:
             print("\n\n⚠️  PoC 被用户中断")
@@ -234,6 +333,29 @@ class OpenCodeWorkflowPoC:
             print(f"\n\n❌ PoC 执行出错: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            # 中断或失败的运行同样导出，便于分析耗时分布
+            try:
+                self.export_metrics()
+            finally:
+                # 关闭驱动：ServerDriver 的常驻 opencode serve 进程随本次运行结束
+                self.driver.close()
+
+    def report_metrics(self, task_id: str):
+        """打印本任务各 phase 的耗时与 token 用量"""
+        print(f"\n⏱️  耗时与 token 用量 (task {task_id}):")
+        for (metric_task, phase), seconds in self.metrics.durations.items():
+            if metric_task != task_id:
+                continue
+            usage = self.metrics.tokens.get((task_id, phase))
+            tokens = f", tokens={usage.total}, cost={usage.cost:.4f}" if usage else ""
+            print(f"  {phase:<10} {seconds:.2f}s{tokens}")
+
+    def export_metrics(self):
+        """追加本次运行的 JSONL 记录，并用全部历史记录刷新 Prometheus 文本文件"""
+        self.metrics.export_jsonl(self.metrics_file)
+        MetricsRecorder.from_jsonl(self.metrics_file).export_prometheus(self.prometheus_file)
+        print(f"\n📈 Metrics 已导出: {self.metrics_file}, {self.prometheus_file}")
 
 
 def main():
@@ -245,8 +367,11 @@ def main():
     # 创建测试项目目录
     Path(project_dir).mkdir(parents=True, exist_ok=True)
 
-    # 运行 PoC
-    poc = OpenCodeWorkflowPoC(project_dir)
+    # 设置 OPENCODE_RECORD_DIR 时把每次 run 的原始事件流录制为回放 fixture
+    driver = CLIDriver(cwd=project_dir, record_dir=os.environ.get("OPENCODE_RECORD_DIR"))
+
+    # 运行 PoC（启用计划缓存：同一任务在未变化的项目上不再重复规划）
+    poc = OpenCodeWorkflowPoC(project_dir, plan_cache=PlanCache("/tmp/opencode_plan_cache"), driver=driver)
     poc.run_poc(task_description)
 
 
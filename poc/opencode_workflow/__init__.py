@@ -0,0 +1,55 @@
+"""
+OpenCode 工作流 PoC 的可复用组件
+
+被 `opencode-workflow-poc.py` 直接导入（脚本所在目录即 `poc/`）。
+"""
+
+from .async_runner import AsyncOpenCodeRunner, OpenCodeRunError, TaskResult, run_tasks
+from .drivers import CLIDriver, Driver, ReplayDriver, ReplayStream, ServerDriver
+from .events import EventStream, iter_events, parse_line
+from .metrics import LatencyHistogram, MetricsRecorder, TokenUsage
+from .models import (
+    Event,
+    OtherEvent,
+    StepFinishEvent,
+    TextEvent,
+    ToolCallEvent,
+    ToolResultEvent,
+    to_event,
+)
+from .plan_cache import PlanCache, plan_cache_key, project_fingerprint
+from .plan_store import PlanStore
+from .session_index import SessionIndex, SessionPage, SessionRecord, iter_json_array
+
+__all__ = [
+    "AsyncOpenCodeRunner",
+    "CLIDriver",
+    "Driver",
+    "Event",
+    "EventStream",
+    "LatencyHistogram",
+    "MetricsRecorder",
+    "OpenCodeRunError",
+    "OtherEvent",
+    "PlanCache",
+    "PlanStore",
+    "ReplayDriver",
+    "ReplayStream",
+    "ServerDriver",
+    "SessionIndex",
+    "SessionPage",
+    "SessionRecord",
+    "StepFinishEvent",
+    "TaskResult",
+    "TextEvent",
+    "TokenUsage",
+    "ToolCallEvent",
+    "ToolResultEvent",
+    "iter_events",
+    "iter_json_array",
+    "parse_line",
+    "plan_cache_key",
+    "project_fingerprint",
+    "run_tasks",
+    "to_event",
+]
@@ -0,0 +1,192 @@
+"""
+OpenCode 异步工作流执行器
+
+基于 `asyncio.create_subprocess_exec`，同时运行多条"规划 → 审批 → 执行"流水线，
+支持并发上限、单任务超时与取消。
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Union
+
+from .events import parse_line
+from .models import Event, TextEvent, to_event
+
+# 单行事件的长度上限（asyncio 默认 64 KiB，长文本事件会超过）
+LINE_LIMIT = 16 * 1024 * 1024
+
+ApproveCallback = Callable[[str, str], Union[bool, Awaitable[bool]]]
+EventCallback = Callable[[str, Event], None]
+
+
+class OpenCodeRunError(RuntimeError):
+    """opencode 子进程以非零退出码结束"""
+
+    def __init__(self, returncode: int, stderr: str):
+        super().__init__(f"opencode exited with {returncode}: {stderr.strip()}")
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+@dataclass
+class TaskResult:
+    """单条流水线的执行结果"""
+
+    task: str
+    status: str  # ok / rejected / failed / timeout / cancelled
+    plan_text: str = ""
+    error: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class AsyncOpenCodeRunner:
+    """并发驱动多条 OpenCode 流水线"""
+
+    def __init__(
+        self,
+        project_dir: Union[str, Path],
+        opencode_cmd: Optional[List[str]] = None,
+        concurrency: int = 4,
+        task_timeout: Optional[float] = None,
+        approve: Optional[ApproveCallback] = None,
+        on_event: Optional[EventCallback] = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.project_dir = Path(project_dir)
+        self.opencode_cmd = list(opencode_cmd or ["opencode"])
+        self.concurrency = concurrency
+        self.task_timeout = task_timeout
+        self.approve = approve
+        self.on_event = on_event
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def run_agent(self, task: str, agent: str, prompt: str) -> List[TextEvent]:
+        """运行一次 `opencode run --agent <agent>`，边读边解析，只保留 text 事件"""
+        cmd = [*self.opencode_cmd, "run", "--agent", agent, "--format", "json", prompt]
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=self.project_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT,
+        )
+        texts: List[TextEvent] = []
+
+        async def read_stdout():
+            async for raw in process.stdout:
+                try:
+                    raw_event = parse_line(raw.decode("utf-8", errors="replace"))
+                except json.JSONDecodeError:
+                    continue
+                if raw_event is None:
+                    continue
+                event = to_event(raw_event)
+                if self.on_event is not None:
+                    self.on_event(task, event)
+                if isinstance(event, TextEvent):
+                    texts.append(event)
+
+        try:
+            _, stderr = await asyncio.gather(read_stdout(), process.stderr.read())
+            returncode = await process.wait()
+        finally:
+            # 超时或取消时杀掉子进程，避免遗留孤儿进程
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+        if returncode != 0:
+            raise OpenCodeRunError(returncode, stderr.decode("utf-8", errors="replace"))
+        return texts
+
+    async def plan(self, task: str) -> str:
+        """Phase 1: 规划，返回计划文本"""
+        texts = await self.run_agent(task, "plan", task)
+        return "".join(event.text for event in texts)
+
+    async def execute(self, task: str, plan_text: str) -> None:
+        """Phase 3: 使用 build agent 执行计划"""
+        execution_prompt = f"Execute this plan:\n{plan_text}\n\nOriginal task: {task}"
+        await self.run_agent(task, "build", execution_prompt)
+
+    async def _approved(self, task: str, plan_text: str) -> bool:
+        """Phase 2: 审批，未配置回调时自动批准"""
+        if self.approve is None:
+            return True
+        decision = self.approve(task, plan_text)
+        if inspect.isawaitable(decision):
+            decision = await decision
+        return bool(decision)
+
+    async def _pipeline(self, task: str, result: TaskResult) -> None:
+        result.plan_text = await self.plan(task)
+        if not await self._approved(task, result.plan_text):
+            result.status = "rejected"
+            return
+        await self.execute(task, result.plan_text)
+        result.status = "ok"
+
+    async def run_pipeline(self, task: str) -> TaskResult:
+        """运行单条流水线（受并发上限与超时约束），错误不外抛而记录在结果中"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        result = TaskResult(task=task, status="failed")
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._pipeline(task, result), self.task_timeout)
+            except asyncio.TimeoutError:
+                result.status = "timeout"
+                result.error = f"timed out after {self.task_timeout}s"
+            except OpenCodeRunError as e:
+                result.status = "failed"
+                result.error = str(e)
+            except Exception as e:
+                # 找不到 opencode、审批回调抛错等：只让本任务失败，不拖垮整批
+                result.status = "failed"
+                result.error = repr(e)
+            finally:
+                result.elapsed = time.perf_counter() - started
+        return result
+
+    def start(self, tasks: List[str]) -> List["asyncio.Task[TaskResult]"]:
+        """为每个任务创建 asyncio.Task，调用方可单独取消"""
+        return [asyncio.create_task(self.run_pipeline(task)) for task in tasks]
+
+    async def gather(self, tasks: List[str], handles: List["asyncio.Task[TaskResult]"]) -> List[TaskResult]:
+        """等待全部流水线结束；被单独取消的任务记为 cancelled"""
+        try:
+            if handles:
+                await asyncio.wait(handles)
+        except asyncio.CancelledError:
+            for handle in handles:
+                handle.cancel()
+            await asyncio.gather(*handles, return_exceptions=True)
+            raise
+
+        results = []
+        for task, handle in zip(tasks, handles):
+            if handle.cancelled():
+                results.append(TaskResult(task=task, status="cancelled"))
+            else:
+                results.append(handle.result())
+        return results
+
+    async def run_many(self, tasks: List[str]) -> List[TaskResult]:
+        """并发运行多条流水线，结果顺序与输入一致"""
+        return await self.gather(tasks, self.start(tasks))
+
+
+def run_tasks(project_dir: Union[str, Path], tasks: List[str], **kwargs) -> List[TaskResult]:
+    """同步入口：在新事件循环中运行 run_many"""
+    return asyncio.run(AsyncOpenCodeRunner(project_dir, **kwargs).run_many(tasks))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+异步执行器 vs 顺序执行的吞吐对比（tasks/min）
+
+使用 fake_opencode.py 模拟 opencode，无需真实模型调用:
+  cd poc && python -m opencode_workflow.bench_async --tasks 16 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from .async_runner import AsyncOpenCodeRunner
+from .plan_store import PlanStore
+from .session_index import SessionIndex
+
+FAKE_OPENCODE = [sys.executable, str(Path(__file__).with_name("fake_opencode.py"))]
+WORKFLOW_SCRIPT = Path(__file__).resolve().parent.parent / "opencode-workflow-poc.py"
+
+
+def load_workflow_class():
+    """按文件路径加载 opencode-workflow-poc.py（文件名含连字符，无法直接 import）"""
+    spec = importlib.util.spec_from_file_location("opencode_workflow_poc", WORKFLOW_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.OpenCodeWorkflowPoC
+
+
+def bench_sequential(project_dir: str, tasks: list[str]) -> float:
+    """顺序路径：阻塞式 OpenCodeWorkflowPoC 逐个执行，返回耗时（秒）"""
+    poc = load_workflow_class()(
+        project_dir,
+        opencode_cmd=FAKE_OPENCODE,
+        plan_store=PlanStore(Path(project_dir) / ".plans"),
+        session_index=SessionIndex(Path(project_dir) / ".sessions.db"),
+    )
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for task in tasks:
+            plan = poc.phase1_planning(task)
+            poc.phase2_approval(plan, auto_approve=True)
+            poc.phase3_execution(plan)
+    return time.perf_counter() - started
+
+
+def bench_async(project_dir: str, tasks: list[str], concurrency: int) -> float:
+    """异步路径：AsyncOpenCodeRunner 并发执行，返回耗时（秒）"""
+    runner = AsyncOpenCodeRunner(project_dir, opencode_cmd=FAKE_OPENCODE, concurrency=concurrency)
+    started = time.perf_counter()
+    results = asyncio.run(runner.run_many(tasks))
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise RuntimeError(f"{len(failed)} pipelines failed: {failed[0].error}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=16, help="任务数")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="并发上限（可多个）")
+    parser.add_argument("--delay", type=float, default=0.2, help="每次 opencode run 的模拟耗时（秒）")
+    args = parser.parse_args()
+
+    os.environ["FAKE_OPENCODE_DELAY"] = str(args.delay)
+    tasks = [f"Task #{i}: add two numbers" for i in range(args.tasks)]
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        rows = [("sequential", bench_sequential(project_dir, tasks))]
+        for concurrency in args.concurrency:
+            rows.append((f"async x{concurrency}", bench_async(project_dir, tasks, concurrency)))
+
+    baseline = rows[0][1]
+    print(f"{'mode':<14}{'seconds':>10}{'tasks/min':>12}{'speedup':>10}")
+    for name, elapsed in rows:
+        print(f"{name:<14}{elapsed:>10.2f}{len(tasks) / elapsed * 60:>12.1f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
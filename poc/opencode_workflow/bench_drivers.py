@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+各后端驱动的单 phase 耗时对比：每次启动 CLI vs 常驻服务 vs 进程内回放
+
+fake_opencode.py 用 FAKE_OPENCODE_STARTUP 模拟后端冷启动（加载配置、provider、LSP 等）；
+CLI 驱动每个 phase 都付一次，服务驱动只在 serve 时付一次:
+  cd poc && python -m opencode_workflow.bench_drivers --tasks 5 --startup 0.3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from .bench_async import FAKE_OPENCODE, load_workflow_class
+from .drivers import CLIDriver, Driver, ReplayDriver, ServerDriver
+from .plan_store import PlanStore
+from .session_index import SessionIndex
+
+
+def record_streams(project_dir: str) -> ReplayDriver:
+    """用 CLI 驱动跑一次规划与执行，把原始事件作为回放驱动的录制内容"""
+    streams = {}
+    for agent in ("plan", "build"):
+        with CLIDriver(FAKE_OPENCODE, cwd=project_dir).run(agent, "Add two numbers") as stream:
+            streams[agent] = [event.to_dict() for event in stream]
+    return ReplayDriver(streams)
+
+
+def bench_driver(project_dir: str, driver: Driver, tasks: int) -> dict:
+    """逐个任务执行 规划 + 执行，返回每个 phase 的耗时中位数（秒）"""
+    root = Path(project_dir)
+    poc = load_workflow_class()(
+        project_dir,
+        driver=driver,
+        plan_store=PlanStore(root / ".plans"),
+        session_index=SessionIndex(root / ".sessions.db"),
+    )
+    phases = []
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index in range(tasks):
+            phase_started = time.perf_counter()
+            plan = poc.phase1_planning(f"Task #{index}: add two numbers")
+            phases.append(time.perf_counter() - phase_started)
+            phase_started = time.perf_counter()
+            poc.phase3_execution(plan)
+            phases.append(time.perf_counter() - phase_started)
+    return {"phase": statistics.median(phases), "total": time.perf_counter() - started}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=5, help="任务数（每个任务 2 个 phase）")
+    parser.add_argument("--startup", type=float, default=0.3, help="模拟的后端冷启动耗时（秒）")
+    parser.add_argument("--delay", type=float, default=0.05, help="每次 run 的模拟生成耗时（秒）")
+    args = parser.parse_args()
+
+    os.environ["FAKE_OPENCODE_STARTUP"] = str(args.startup)
+    os.environ["FAKE_OPENCODE_DELAY"] = str(args.delay)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as project_dir:
+        rows.append(("cli", bench_driver(project_dir, CLIDriver(FAKE_OPENCODE, cwd=project_dir), args.tasks)))
+        with ServerDriver(FAKE_OPENCODE, cwd=project_dir) as driver:
+            # 服务启动（只发生一次）计入总耗时
+            started = time.perf_counter()
+            driver.start()
+            row = bench_driver(project_dir, driver, args.tasks)
+            row["total"] = time.perf_counter() - started
+            rows.append(("server", row))
+        rows.append(("replay", bench_driver(project_dir, record_streams(project_dir), args.tasks)))
+
+    baseline = rows[0][1]["phase"]
+    print(f"{'driver':<10}{'per phase':>12}{'total':>10}{'speedup':>10}")
+    for name, row in rows:
+        print(f"{name:<10}{row['phase'] * 1000:>10.1f}ms{row['total']:>9.2f}s{baseline / row['phase']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+事件保留内存对比：原始 dict 列表 vs 类型化 slots 事件列表
+
+  cd poc && python -m opencode_workflow.bench_events --events 10000 50000
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from .models import to_event
+
+
+def synthetic_lines(count: int) -> list[str]:
+    """按 text / tool_call / tool_result / step_finish 轮转生成 opencode 事件行"""
+    session = "ses_01JBENCHMARK000000000000"
+    templates = [
+        {"type": "step_start", "sessionID": session, "part": {"type": "step-start", "id": "prt_0"}},
+        {"type": "text", "sessionID": session, "part": {"type": "text", "id": "prt_1", "text": "Step: create add.py\n"}},
+        {"type": "tool_call", "sessionID": session, "part": {"type": "tool", "id": "prt_2", "callID": "call_0", "tool": {"name": "write"}}},
+        {"type": "tool_result", "sessionID": session, "part": {"type": "tool", "id": "prt_3", "callID": "call_0", "output": "ok"}},
+        {
+            "type": "step_finish",
+            "sessionID": session,
+            "part": {"type": "step-finish", "id": "prt_4", "cost": 0.0012,
+                     "tokens": {"input": 1200, "output": 80, "reasoning": 0, "cache": {"read": 900, "write": 0}}},
+        },
+    ]
+    return [json.dumps(templates[i % len(templates)]) for i in range(count)]
+
+
+def measure(lines: list[str], convert) -> tuple[int, float]:
+    """返回（保留的字节数，耗时秒）"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    events = [convert(json.loads(line)) for line in lines]
+    elapsed = time.perf_counter() - started
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del events
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, nargs="+", default=[10_000, 50_000], help="事件数（可多个）")
+    args = parser.parse_args()
+
+    print(f"{'events':>8}{'dict MiB':>11}{'typed MiB':>11}{'saving':>9}{'dict s':>9}{'typed s':>9}")
+    for count in args.events:
+        lines = synthetic_lines(count)
+        dict_bytes, dict_time = measure(lines, lambda raw: raw)
+        typed_bytes, typed_time = measure(lines, to_event)
+        print(
+            f"{count:>8}{dict_bytes / 2**20:>11.2f}{typed_bytes / 2**20:>11.2f}"
+            f"{dict_bytes / typed_bytes:>8.1f}x{dict_time:>9.3f}{typed_time:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+事件处理吞吐（events/s）：回放录制的事件流，测量解析、展示与持久化路径
+
+每个规模先生成一份录制 fixture，再全速回放三条路径:
+  parse    回放 + 逐行解析为类型化事件
+  plan     phase1_planning：解析 + 打印 + 保留事件 + 写入 PlanStore
+  execute  phase3_execution：解析 + 打印 + metrics 统计（不保留事件）
+
+  cd poc && python -m opencode_workflow.bench_replay --sizes 100 10000 500000
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from .bench_async import load_workflow_class
+from .bench_events import synthetic_lines
+from .drivers import ReplayDriver
+from .plan_store import PlanStore
+from .recording import StreamRecorder
+from .session_index import SessionIndex
+
+
+def write_fixture(directory: Path, agent: str, count: int) -> Path:
+    """生成一份 count 个事件的录制文件，事件间隔 1ms"""
+    recorder = StreamRecorder(directory / f"{agent}-{count}.jsonl.gz", {"agent": agent})
+    for index, line in enumerate(synthetic_lines(count)):
+        recorder.write(index / 1000, line + "\n")
+    return recorder.finish(0)
+
+
+def bench_size(directory: Path, count: int) -> dict:
+    """返回各路径的 events/s"""
+    fixtures = directory / str(count)
+    driver = ReplayDriver.from_recordings([write_fixture(fixtures, "plan", count), write_fixture(fixtures, "build", count)])
+    poc = load_workflow_class()(
+        directory,
+        driver=driver,
+        plan_store=PlanStore(fixtures / "plans"),
+        session_index=SessionIndex(fixtures / "sessions.db"),
+    )
+
+    rates = {}
+    started = time.perf_counter()
+    with driver.run("plan", "bench") as stream:
+        for _ in stream:
+            pass
+    rates["parse"] = count / (time.perf_counter() - started)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        plan = poc.phase1_planning("bench")
+        rates["plan"] = count / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        poc.phase3_execution(plan)
+        rates["execute"] = count / (time.perf_counter() - started)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 500_000], help="每次 run 的事件数（可多个）")
+    args = parser.parse_args()
+
+    print(f"{'events':>9}{'parse ev/s':>14}{'plan ev/s':>14}{'execute ev/s':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            rates = bench_size(Path(directory), count)
+            print(f"{count:>9}{rates['parse']:>14,.0f}{rates['plan']:>14,.0f}{rates['execute']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
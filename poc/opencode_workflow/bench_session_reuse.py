@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+执行阶段续接规划 session vs 新 session 重发计划：token 与延迟对比
+
+使用 fake_opencode.py 模拟 opencode；新 session 需要重新预填充系统提示与整份计划，
+续接 session 时历史上下文走缓存，只发送一句执行指令:
+  cd poc && python -m opencode_workflow.bench_session_reuse --runs 5 --plan-chars 4000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from .bench_async import FAKE_OPENCODE, load_workflow_class
+from .plan_store import PlanStore
+from .session_index import SessionIndex
+
+
+def bench_mode(project_dir: str, task: str, reuse_session: bool, runs: int) -> dict:
+    """执行 runs 次 规划 + 执行，返回执行阶段的 token 与延迟统计"""
+    root = Path(project_dir)
+    poc = load_workflow_class()(
+        project_dir,
+        opencode_cmd=FAKE_OPENCODE,
+        plan_store=PlanStore(root / ".plans"),
+        session_index=SessionIndex(root / ".sessions.db"),
+        reuse_session=reuse_session,
+    )
+    elapsed = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            plan = poc.phase1_planning(task)
+            started = time.perf_counter()
+            poc.phase3_execution(plan)
+            elapsed.append(time.perf_counter() - started)
+
+    usage = poc.metrics.tokens_by_phase()["execute"]
+    first_output = poc.metrics.first_output_latency["execute"]
+    return {
+        "input": usage.input / runs,
+        "cache_read": usage.cache_read / runs,
+        "first_output": first_output.quantile(0.5),
+        "elapsed": statistics.median(elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="每种模式的执行次数")
+    parser.add_argument("--plan-chars", type=int, default=4000, help="计划文本总字符数")
+    parser.add_argument("--prefill-ms", type=float, default=20.0, help="每 1000 个未缓存输入 token 的预填充耗时（毫秒）")
+    parser.add_argument("--delay", type=float, default=0.05, help="每次 opencode run 的生成耗时（秒）")
+    args = parser.parse_args()
+
+    events = 4
+    os.environ["FAKE_OPENCODE_DELAY"] = str(args.delay)
+    os.environ["FAKE_OPENCODE_EVENTS"] = str(events)
+    os.environ["FAKE_OPENCODE_TEXT_CHARS"] = str(max(args.plan_chars // events, 1))
+    os.environ["FAKE_OPENCODE_PREFILL_MS_PER_KTOK"] = str(args.prefill_ms)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as project_dir:
+        os.environ["FAKE_OPENCODE_STATE"] = str(Path(project_dir) / ".fake_state")
+        for name, reuse in (("new session", False), ("reuse session", True)):
+            rows.append((name, bench_mode(project_dir, "Add two numbers", reuse, args.runs)))
+
+    print(f"{'mode':<16}{'input tok':>11}{'cached tok':>12}{'first out':>11}{'execute':>10}")
+    for name, row in rows:
+        print(
+            f"{name:<16}{row['input']:>11.0f}{row['cache_read']:>12.0f}"
+            f"{row['first_output'] * 1000:>9.1f}ms{row['elapsed'] * 1000:>8.1f}ms"
+        )
+    baseline, reused = rows[0][1], rows[1][1]
+    print(f"\n执行阶段未缓存输入 token 减少 {1 - reused['input'] / baseline['input']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+OpenCode 后端驱动
+
+工作流只依赖驱动接口，不直接拼命令行:
+- CLIDriver:    每次 run 启动一个 `opencode run` 进程（原有行为）
+- ServerDriver: 启动一次 `opencode serve` 并保持常驻，之后的 run 通过 `--attach <url>`
+                复用已初始化的后端，省去每个 phase 的后端冷启动
+- ReplayDriver: 进程内回放事先录制的事件流，确定性、无需 opencode，用于测试与离线基准
+
+CLIDriver / ServerDriver 设置 record_dir 后会把每次 run 的原始输出录制为 fixture，
+ReplayDriver.from_recordings() 再按录制时的节奏或全速回放。
+
+驱动的 run() 返回与 EventStream 相同形状的对象：`with` 使用、迭代产出类型化事件，
+结束后可读取 returncode / first_output_latency / stderr。
+"""
+
+import io
+import json
+import re
+import select
+import subprocess
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .async_runner import OpenCodeRunError
+from .events import FIRST_OUTPUT_TYPES, EventStream, iter_events
+from .models import Event, to_event
+from .recording import SUFFIX, Recording, StreamRecorder, recording_path
+
+# `opencode serve` 启动后输出的监听地址
+SERVER_URL_RE = re.compile(r"https?://[^\s]+")
+
+
+class Driver(ABC):
+    """驱动基类；子类实现 run() 与 session_list()"""
+
+    name = "driver"
+
+    @abstractmethod
+    def run(
+        self,
+        agent: str,
+        prompt: str,
+        session_id: Optional[str] = None,
+        on_invalid: Optional[Callable[[str], None]] = None,
+    ):
+        """运行一次 agent，返回可迭代的事件流（上下文管理器）"""
+
+    @abstractmethod
+    def session_list(self) -> ContextManager[IO[str]]:
+        """返回产出 `session list --format json` 文本流的上下文管理器；失败时抛出 OpenCodeRunError"""
+
+    def describe(self, agent: str, session_id: Optional[str] = None) -> str:
+        """日志中展示的调用描述"""
+        suffix = f" --session {session_id}" if session_id else ""
+        return f"[{self.name}] run --agent {agent}{suffix}"
+
+    def close(self) -> None:
+        """释放驱动持有的资源（常驻进程等）；可重复调用"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class CLIDriver(Driver):
+    """每次调用启动一个 opencode CLI 进程"""
+
+    name = "cli"
+
+    def __init__(
+        self,
+        opencode_cmd: Optional[List[str]] = None,
+        cwd: Optional[Union[str, Path]] = None,
+        record_dir: Optional[Union[str, Path]] = None,
+    ):
+        self.opencode_cmd = list(opencode_cmd or ["opencode"])
+        self.cwd = cwd
+        self.record_dir = Path(record_dir) if record_dir is not None else None
+
+    def run_args(self) -> List[str]:
+        """`run` 子命令之后、agent 参数之前的额外参数"""
+        return []
+
+    def command(self, agent: str, prompt: str, session_id: Optional[str] = None) -> List[str]:
+        cmd = [*self.opencode_cmd, "run", *self.run_args(), "--agent", agent]
+        if session_id:
+            cmd += ["--session", session_id]
+        return [*cmd, "--format", "json", prompt]
+
+    def run(self, agent, prompt, session_id=None, on_invalid=None) -> EventStream:
+        recorder = None
+        if self.record_dir is not None:
+            meta = {"agent": agent, "prompt": prompt, "session_id": session_id, "driver": self.name}
+            recorder = StreamRecorder(recording_path(self.record_dir, agent), meta)
+        cmd = self.command(agent, prompt, session_id)
+        return EventStream(cmd, cwd=self.cwd, on_invalid=on_invalid, typed=True, recorder=recorder)
+
+    def describe(self, agent: str, session_id: Optional[str] = None) -> str:
+        return " ".join(self.command(agent, "<prompt>", session_id))
+
+    @contextmanager
+    def session_list(self) -> Iterator[IO[str]]:
+        cmd = [*self.opencode_cmd, "session", "list", "--format", "json"]
+        with tempfile.TemporaryFile(mode="w+") as stderr, subprocess.Popen(
+            cmd, cwd=self.cwd, stdout=subprocess.PIPE, stderr=stderr, text=True
+        ) as process:
+            try:
+                yield process.stdout
+            finally:
+                # 调用方可能只读了一部分（如解析失败），排空剩余输出让进程退出
+                for _ in process.stdout:
+                    pass
+            returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                raise OpenCodeRunError(returncode, stderr.read())
+
+
+class ServerDriver(CLIDriver):
+    """常驻 `opencode serve`，run 通过 `--attach` 连接到同一个已预热的后端"""
+
+    name = "server"
+
+    def __init__(
+        self,
+        opencode_cmd: Optional[List[str]] = None,
+        cwd: Optional[Union[str, Path]] = None,
+        hostname: str = "127.0.0.1",
+        port: int = 0,
+        startup_timeout: float = 30.0,
+        record_dir: Optional[Union[str, Path]] = None,
+    ):
+        super().__init__(opencode_cmd, cwd, record_dir)
+        self.hostname = hostname
+        self.port = port
+        self.startup_timeout = startup_timeout
+        self.url: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr: Optional[IO[bytes]] = None
+
+    def start(self) -> str:
+        """启动服务并等待监听地址，返回 URL；已启动时直接返回"""
+        if self._process is not None and self._process.poll() is None:
+            return self.url
+        cmd = [*self.opencode_cmd, "serve", "--hostname", self.hostname, "--port", str(self.port)]
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(cmd, cwd=self.cwd, stdout=subprocess.PIPE, stderr=self._stderr, bufsize=0)
+        try:
+            self.url = self._wait_for_url()
+        except BaseException:
+            self.close()
+            raise
+        # 之后的日志输出不再关心，但必须持续排空，避免服务阻塞在写 stdout 上
+        threading.Thread(target=self._drain_stdout, args=(self._process.stdout,), daemon=True).start()
+        return self.url
+
+    def _wait_for_url(self) -> str:
+        stdout = self._process.stdout
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([stdout], [], [], remaining)[0]:
+                raise TimeoutError(f"opencode serve did not report a URL within {self.startup_timeout}s")
+            line = stdout.readline()
+            if not line:
+                self._stderr.seek(0)
+                raise OpenCodeRunError(self._process.wait(), self._stderr.read().decode("utf-8", errors="replace"))
+            match = SERVER_URL_RE.search(line.decode("utf-8", errors="replace"))
+            if match:
+                return match.group(0)
+
+    @staticmethod
+    def _drain_stdout(stdout: IO[bytes]) -> None:
+        while stdout.read(65536):
+            pass
+
+    def run_args(self) -> List[str]:
+        return ["--attach", self.start()]
+
+    def close(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.terminate()
+                try:
+                    self._process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._process.kill()
+                    self._process.wait()
+            self._process = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+
+class ReplayStream:
+    """按 EventStream 的接口回放一段原始事件"""
+
+    def __init__(self, raw_events: Iterable[Dict[str, Any]], returncode: int = 0, stderr: str = ""):
+        self._raw_events = raw_events
+        self._returncode = returncode
+        self._stderr = stderr
+        self._started_at = 0.0
+        self.returncode: Optional[int] = None
+        self.first_output_latency: Optional[float] = None
+        self.event_count = 0
+
+    def __enter__(self) -> "ReplayStream":
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.returncode = self._returncode
+
+    def __iter__(self) -> Iterator[Event]:
+        for raw in self._raw_events:
+            self.event_count += 1
+            if self.first_output_latency is None and raw.get("type") in FIRST_OUTPUT_TYPES:
+                self.first_output_latency = time.perf_counter() - self._started_at
+            yield to_event(raw)
+
+    def wait(self) -> int:
+        self.returncode = self._returncode
+        return self.returncode
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr
+
+
+class ReplayDriver(Driver):
+    """进程内回放录制的事件流
+
+    streams 按 agent 提供录制内容：可以是一段事件列表或一个 Recording（每次 run 都回放它），
+    也可以是多段组成的列表（依次回放，用完后重复最后一段）。
+    Recording 按 speed 回放原始行并走完整的逐行解析：None 为全速，1.0 为录制时的节奏。
+    所有调用记录在 calls 中，便于测试断言。
+    """
+
+    name = "replay"
+
+    def __init__(
+        self,
+        streams: Mapping[str, Any],
+        sessions: Optional[List[Dict[str, Any]]] = None,
+        returncode: int = 0,
+        speed: Optional[float] = None,
+    ):
+        self.streams = {agent: self._as_runs(recorded) for agent, recorded in streams.items()}
+        self.sessions = sessions or []
+        self.returncode = returncode
+        self.speed = speed
+        self.calls: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_recordings(
+        cls,
+        paths: Union[str, Path, Iterable[Union[str, Path]]],
+        speed: Optional[float] = None,
+        sessions: Optional[List[Dict[str, Any]]] = None,
+    ) -> "ReplayDriver":
+        """从录制文件（或包含录制文件的目录）构建；同一 agent 的多次录制按文件名顺序回放"""
+        if isinstance(paths, (str, Path)) and Path(paths).is_dir():
+            paths = sorted(Path(paths).glob(f"*{SUFFIX}"))
+        elif isinstance(paths, (str, Path)):
+            paths = [paths]
+        streams: Dict[str, List[Recording]] = {}
+        for path in paths:
+            recording = Recording(path)
+            streams.setdefault(recording.agent, []).append(recording)
+        return cls(streams, sessions=sessions, speed=speed)
+
+    @staticmethod
+    def _as_runs(recorded: Any) -> List[Any]:
+        if isinstance(recorded, Recording) or (recorded and isinstance(recorded[0], dict)):
+            return [recorded]
+        return list(recorded)
+
+    def run(self, agent, prompt, session_id=None, on_invalid=None) -> ReplayStream:
+        runs = self.streams.get(agent)
+        if not runs:
+            raise KeyError(f"no recorded stream for agent {agent!r}")
+        index = sum(1 for call in self.calls if call["agent"] == agent)
+        self.calls.append({"agent": agent, "prompt": prompt, "session_id": session_id})
+        recorded = runs[min(index, len(runs) - 1)]
+        if isinstance(recorded, Recording):
+            raw_events = iter_events(recorded.iter_lines(self.speed), on_invalid)
+            return ReplayStream(raw_events, recorded.returncode, recorded.stderr)
+        stderr = "" if self.returncode == 0 else f"replayed failure ({self.returncode})"
+        return ReplayStream(recorded, self.returncode, stderr)
+
+    @contextmanager
+    def session_list(self) -> Iterator[IO[str]]:
+        yield io.StringIO(json.dumps(self.sessions))
@@ -0,0 +1,135 @@
+"""
+OpenCode JSON 事件流增量解析
+
+逐行消费 `opencode run --format json` 的 stdout，事件到达即产出，
+不再等进程退出后一次性 split 整个输出。
+"""
+
+import json
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Union
+
+from .models import Event, to_event
+from .recording import StreamRecorder
+
+# 首个"有内容"事件的类型，用于统计首事件延迟
+FIRST_OUTPUT_TYPES = frozenset({"text", "tool_call"})
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """解析单行 JSON 事件，空行返回 None，非法行抛出 JSONDecodeError"""
+    line = line.strip()
+    if not line:
+        return None
+    event = json.loads(line)
+    if not isinstance(event, dict):
+        raise json.JSONDecodeError("event is not a JSON object", line, 0)
+    return event
+
+
+def iter_events(
+    stream: IO[str],
+    on_invalid: Optional[Callable[[str], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """从文本流逐行产出事件，内存占用只与单行长度相关"""
+    for line in stream:
+        try:
+            event = parse_line(line)
+        except json.JSONDecodeError:
+            if on_invalid is not None:
+                on_invalid(line)
+            continue
+        if event is not None:
+            yield event
+
+
+class EventStream:
+    """基于 Popen 管道的事件流：`with` 启动进程，迭代即得到实时事件"""
+
+    def __init__(
+        self,
+        cmd: list[str],
+        cwd: Optional[Union[str, Path]] = None,
+        on_invalid: Optional[Callable[[str], None]] = None,
+        typed: bool = False,
+        recorder: Optional[StreamRecorder] = None,
+    ):
+        self.cmd = cmd
+        self.cwd = cwd
+        self.on_invalid = on_invalid
+        self.typed = typed
+        # 录制原始 stdout 行及其时间偏移，供离线回放
+        self.recorder = recorder
+        self.returncode: Optional[int] = None
+        self.first_output_latency: Optional[float] = None
+        self.event_count = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._started_at = 0.0
+        self._stderr_chunks: list[str] = []
+        self._stderr_thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "EventStream":
+        self._started_at = time.perf_counter()
+        self._process = subprocess.Popen(
+            self.cmd,
+            cwd=self.cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        # stderr 单独线程排空，避免管道写满导致子进程阻塞
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._process is None:
+            return
+        if self._process.poll() is None and exc_type is not None:
+            # 消费方中途异常退出，不再等待子进程自然结束
+            self._process.terminate()
+        self.wait()
+
+    def __iter__(self) -> Iterator[Union[Dict[str, Any], Event]]:
+        """逐个产出事件；`typed=True` 时产出 models 中的类型化事件"""
+        if self._process is None:
+            raise RuntimeError("EventStream must be used as a context manager")
+        lines = self._process.stdout
+        if self.recorder is not None:
+            lines = self.recorder.tee(lines, self._started_at)
+        for event in iter_events(lines, self.on_invalid):
+            self.event_count += 1
+            if self.first_output_latency is None and event.get("type") in FIRST_OUTPUT_TYPES:
+                self.first_output_latency = time.perf_counter() - self._started_at
+            yield to_event(event) if self.typed else event
+
+    def wait(self) -> int:
+        """等待进程结束并回收管道，返回退出码"""
+        assert self._process is not None
+        if self._process.stdout is not None:
+            # 丢弃未消费的剩余输出（录制时仍写入录制文件），保证进程能退出
+            for line in self._process.stdout:
+                if self.recorder is not None:
+                    self.recorder.write(time.perf_counter() - self._started_at, line)
+            self._process.stdout.close()
+        self.returncode = self._process.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join()
+        if self.recorder is not None:
+            self.recorder.finish(self.returncode, self.stderr, time.perf_counter() - self._started_at)
+            self.recorder = None
+        return self.returncode
+
+    @property
+    def stderr(self) -> str:
+        return "".join(self._stderr_chunks)
+
+    def _drain_stderr(self) -> None:
+        assert self._process is not None and self._process.stderr is not None
+        for chunk in self._process.stderr:
+            self._stderr_chunks.append(chunk)
+        self._process.stderr.close()
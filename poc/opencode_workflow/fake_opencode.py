@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+模拟 opencode CLI，用于离线测试与基准测试
+
+支持:
+  fake_opencode.py run [--attach <url>] --agent <agent> [--session <id>] --format json <prompt>
+  fake_opencode.py serve [--hostname <host>] [--port <port>]
+  fake_opencode.py session list --format json
+
+通过环境变量调节行为:
+  FAKE_OPENCODE_DELAY               每次 run 的总耗时（秒，默认 0.1）
+  FAKE_OPENCODE_STARTUP             后端冷启动耗时（秒，默认 0）；serve 只付一次，run --attach 不付
+  FAKE_OPENCODE_EVENTS              每次 run 输出的 text 事件数（默认 3）
+  FAKE_OPENCODE_EXIT                run 的退出码（默认 0）
+  FAKE_OPENCODE_TEXT_CHARS          每个 text 事件的字符数（默认为短文本）
+  FAKE_OPENCODE_PREFILL_MS_PER_KTOK 每 1000 个未缓存输入 token 的首输出延迟（毫秒，默认 0）
+  FAKE_OPENCODE_STATE               保存 session 历史 token 数的目录（用于模拟 --session 续接）
+  FAKE_OPENCODE_SESSIONS            session list 输出的 JSON 文件路径（默认输出空列表）
+"""
+
+import json
+import os
+import signal
+import socket
+import sys
+import time
+import uuid
+
+# 新 session 的系统提示 + 项目上下文 token 数
+SYSTEM_PROMPT_TOKENS = 2000
+
+
+def emit(event: dict):
+    print(json.dumps(event), flush=True)
+
+
+def run(args: list[str]) -> int:
+    agent = "build"
+    session_id = None
+    attach_url = None
+    positional = []
+    i = 0
+    while i < len(args):
+        if args[i] in ("--agent", "--format", "--session", "-s", "--attach"):
+            if args[i] == "--attach":
+                attach_url = args[i + 1]
+            elif args[i] == "--agent":
+                agent = args[i + 1]
+            elif args[i] in ("--session", "-s"):
+                session_id = args[i + 1]
+            i += 2
+            continue
+        positional.append(args[i])
+        i += 1
+    prompt = " ".join(positional)
+
+    delay = float(os.environ.get("FAKE_OPENCODE_DELAY", "0.1"))
+    text_events = int(os.environ.get("FAKE_OPENCODE_EVENTS", "3"))
+    text_chars = int(os.environ.get("FAKE_OPENCODE_TEXT_CHARS", "0"))
+    prefill_ms = float(os.environ.get("FAKE_OPENCODE_PREFILL_MS_PER_KTOK", "0"))
+    exit_code = int(os.environ.get("FAKE_OPENCODE_EXIT", "0"))
+    state_dir = os.environ.get("FAKE_OPENCODE_STATE")
+
+    # 独立运行时每次都要初始化后端；连接到常驻服务时这部分开销已在 serve 中付过
+    if attach_url is None:
+        time.sleep(float(os.environ.get("FAKE_OPENCODE_STARTUP", "0")))
+    elif not _server_alive(attach_url):
+        print(f"cannot connect to {attach_url}", file=sys.stderr)
+        return 1
+
+    # 新 session 需要完整构建上下文；继续已有 session 时历史上下文走缓存
+    prompt_tokens = len(prompt) // 4
+    if session_id is None:
+        session_id = f"ses_fake_{uuid.uuid4().hex[:16]}"
+        history_tokens = 0
+        uncached_tokens, cached_tokens = SYSTEM_PROMPT_TOKENS + prompt_tokens, 0
+    else:
+        history_tokens = _load_history(state_dir, session_id)
+        uncached_tokens, cached_tokens = prompt_tokens, SYSTEM_PROMPT_TOKENS + history_tokens
+
+    emit({"type": "step_start", "sessionID": session_id, "part": {"type": "step-start"}})
+    time.sleep(prefill_ms * uncached_tokens / 1000 / 1000)
+    output_tokens = 0
+    for index in range(text_events):
+        time.sleep(delay / max(text_events, 1))
+        text = f"[{agent}] step {index + 1}\n"
+        if text_chars > len(text):
+            text = text[:-1] + "." * (text_chars - len(text)) + "\n"
+        output_tokens += max(len(text) // 4, 1)
+        emit({"type": "text", "sessionID": session_id, "part": {"type": "text", "text": text}})
+    emit({
+        "type": "step_finish",
+        "sessionID": session_id,
+        "part": {
+            "type": "step-finish",
+            "tokens": {"input": uncached_tokens, "output": output_tokens, "cache": {"read": cached_tokens, "write": 0}},
+        },
+    })
+    _save_history(state_dir, session_id, history_tokens + prompt_tokens + output_tokens)
+
+    if exit_code:
+        print(f"fake opencode failure ({exit_code})", file=sys.stderr)
+    return exit_code
+
+
+def serve(args: list[str]) -> int:
+    """监听一个 TCP 端口并报告 URL，直到被终止"""
+    hostname, port = "127.0.0.1", 0
+    for flag, value in zip(args, args[1:]):
+        if flag == "--hostname":
+            hostname = value
+        elif flag == "--port":
+            port = int(value)
+
+    time.sleep(float(os.environ.get("FAKE_OPENCODE_STARTUP", "0")))
+    server = socket.create_server((hostname, port))
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"opencode server listening on http://{hostname}:{server.getsockname()[1]}", flush=True)
+    while True:
+        connection, _ = server.accept()
+        connection.close()
+
+
+def _server_alive(url: str) -> bool:
+    host, _, port = url.split("://", 1)[-1].rstrip("/").rpartition(":")
+    try:
+        socket.create_connection((host, int(port)), timeout=1).close()
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _load_history(state_dir, session_id: str) -> int:
+    if not state_dir:
+        return 0
+    try:
+        with open(os.path.join(state_dir, f"{session_id}.json"), encoding="utf-8") as f:
+            return json.load(f)["history_tokens"]
+    except FileNotFoundError:
+        return 0
+
+
+def _save_history(state_dir, session_id: str, history_tokens: int):
+    if not state_dir:
+        return
+    os.makedirs(state_dir, exist_ok=True)
+    with open(os.path.join(state_dir, f"{session_id}.json"), "w", encoding="utf-8") as f:
+        json.dump({"history_tokens": history_tokens}, f)
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    if args[:1] == ["run"]:
+        return run(args[1:])
+    if args[:1] == ["serve"]:
+        return serve(args[1:])
+    if args[:2] == ["session", "list"]:
+        sessions_file = os.environ.get("FAKE_OPENCODE_SESSIONS")
+        if sessions_file:
+            with open(sessions_file, encoding="utf-8") as f:
+                sys.stdout.write(f.read())
+        else:
+            print(json.dumps([]))
+        return 0
+    print(f"unsupported command: {' '.join(args)}", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Token 与延迟统计
+
+按 phase / task 累计 step_finish 的 token 用量，记录每个 phase 与每次工具调用的耗时，
+导出为 JSON Lines（每次运行追加一行，便于跨运行汇总）和 Prometheus 文本格式。
+
+跨运行汇总:
+  cd poc && python -m opencode_workflow.metrics /tmp/opencode_metrics.jsonl --prometheus out.prom
+"""
+
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .models import Event, StepFinishEvent, ToolCallEvent, ToolResultEvent
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class TokenUsage:
+    """token 用量累计"""
+
+    input: int = 0
+    output: int = 0
+    reasoning: int = 0
+    cache_read: int = 0
+    cache_write: int = 0
+    cost: float = 0.0
+
+    def add_event(self, event: StepFinishEvent) -> None:
+        self.input += event.input_tokens
+        self.output += event.output_tokens
+        self.reasoning += event.reasoning_tokens
+        self.cache_read += event.cache_read_tokens
+        self.cache_write += event.cache_write_tokens
+        self.cost += event.cost
+
+    def merge(self, other: "TokenUsage") -> None:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    @property
+    def total(self) -> int:
+        return self.input + self.output + self.reasoning
+
+
+class LatencyHistogram:
+    """保留原始样本（秒），按需计算分位数"""
+
+    def __init__(self, samples: Optional[List[float]] = None):
+        self.samples: List[float] = list(samples or [])
+
+    def observe(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def sum(self) -> float:
+        return sum(self.samples)
+
+    def quantile(self, q: float) -> float:
+        """nearest-rank 分位数，无样本时返回 NaN"""
+        if not self.samples:
+            return math.nan
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(q * len(ordered)))
+        return ordered[rank - 1]
+
+    def summary(self) -> Dict[str, float]:
+        result = {"count": self.count, "sum": self.sum}
+        for q in QUANTILES:
+            result[f"p{int(q * 100)}"] = self.quantile(q)
+        return result
+
+
+class MetricsRecorder:
+    """一次运行（一个进程）内的 token 与延迟统计"""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        # (task_id, phase) -> TokenUsage
+        self.tokens: Dict[Tuple[str, str], TokenUsage] = {}
+        # (task_id, phase) -> 累计秒数
+        self.durations: Dict[Tuple[str, str], float] = {}
+        self.phase_latency: Dict[str, LatencyHistogram] = {}
+        self.tool_latency: Dict[str, LatencyHistogram] = {}
+        # 启动 opencode 到首个 text / tool_call 事件的耗时
+        self.first_output_latency: Dict[str, LatencyHistogram] = {}
+        self._open_tool_calls: Dict[Tuple[str, Optional[str]], Tuple[str, float]] = {}
+
+    @contextmanager
+    def phase(self, task_id: str, phase: str) -> Iterator[None]:
+        """统计一个 phase 的墙钟耗时（异常退出同样记录）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phase_latency.setdefault(phase, LatencyHistogram()).observe(elapsed)
+            self.durations[(task_id, phase)] = self.durations.get((task_id, phase), 0.0) + elapsed
+
+    def observe_event(self, task_id: str, phase: str, event: Event) -> None:
+        """从事件流中提取 token 用量与工具调用耗时"""
+        if isinstance(event, StepFinishEvent):
+            self.tokens.setdefault((task_id, phase), TokenUsage()).add_event(event)
+        elif isinstance(event, ToolCallEvent):
+            self._open_tool_calls[(task_id, event.call_id)] = (event.name, time.perf_counter())
+        elif isinstance(event, ToolResultEvent):
+            opened = self._open_tool_calls.pop((task_id, event.call_id), None)
+            if opened is not None:
+                name, started = opened
+                self.tool_latency.setdefault(name, LatencyHistogram()).observe(time.perf_counter() - started)
+
+    def observe_first_output(self, phase: str, seconds: Optional[float]) -> None:
+        """记录一次 opencode run 的首输出延迟（无输出时忽略）"""
+        if seconds is not None:
+            self.first_output_latency.setdefault(phase, LatencyHistogram()).observe(seconds)
+
+    def tokens_by_phase(self) -> Dict[str, TokenUsage]:
+        return self._group_tokens(lambda key: key[1])
+
+    def tokens_by_task(self) -> Dict[str, TokenUsage]:
+        return self._group_tokens(lambda key: key[0])
+
+    def _group_tokens(self, pick) -> Dict[str, TokenUsage]:
+        grouped: Dict[str, TokenUsage] = {}
+        for key, usage in self.tokens.items():
+            grouped.setdefault(pick(key), TokenUsage()).merge(usage)
+        return grouped
+
+    def to_record(self) -> Dict[str, Any]:
+        """序列化为一条 JSONL 记录（保留原始延迟样本，便于跨运行重新计算分位数）"""
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "tokens": [
+                {"task_id": task_id, "phase": phase, **asdict(usage)}
+                for (task_id, phase), usage in self.tokens.items()
+            ],
+            "durations": [
+                {"task_id": task_id, "phase": phase, "seconds": seconds}
+                for (task_id, phase), seconds in self.durations.items()
+            ],
+            "phase_latency": {name: hist.samples for name, hist in self.phase_latency.items()},
+            "tool_latency": {name: hist.samples for name, hist in self.tool_latency.items()},
+            "first_output_latency": {name: hist.samples for name, hist in self.first_output_latency.items()},
+        }
+
+    def merge_record(self, record: Dict[str, Any]) -> None:
+        """合并一条 to_record() 产出的记录"""
+        for row in record.get("tokens", []):
+            row = dict(row)
+            key = (row.pop("task_id"), row.pop("phase"))
+            self.tokens.setdefault(key, TokenUsage()).merge(TokenUsage(**row))
+        for row in record.get("durations", []):
+            key = (row["task_id"], row["phase"])
+            self.durations[key] = self.durations.get(key, 0.0) + row["seconds"]
+        for target, source in ((self.phase_latency, record.get("phase_latency", {})),
+                               (self.tool_latency, record.get("tool_latency", {})),
+                               (self.first_output_latency, record.get("first_output_latency", {}))):
+            for name, samples in source.items():
+                target.setdefault(name, LatencyHistogram()).samples.extend(samples)
+
+    @classmethod
+    def from_jsonl(cls, path: Union[str, Path]) -> "MetricsRecorder":
+        """汇总 JSONL 文件中的所有运行记录"""
+        merged = cls(run_id="aggregate")
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    merged.merge_record(json.loads(line))
+        return merged
+
+    def export_jsonl(self, path: Union[str, Path]) -> None:
+        """追加本次运行的记录（O_APPEND + 单次 write，多个进程并发追加时行不会交错）"""
+        line = json.dumps(self.to_record(), separators=(",", ":")) + "\n"
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def to_prometheus(self) -> str:
+        """渲染为 Prometheus 文本格式（token 用 counter，延迟用 summary）"""
+        lines = [
+            "# HELP opencode_tokens_total Tokens reported by step_finish events.",
+            "# TYPE opencode_tokens_total counter",
+        ]
+        for phase, usage in sorted(self.tokens_by_phase().items()):
+            for kind in ("input", "output", "reasoning", "cache_read", "cache_write"):
+                lines.append(f'opencode_tokens_total{{phase="{_escape(phase)}",kind="{kind}"}} {getattr(usage, kind)}')
+        lines += [
+            "# HELP opencode_cost_total Cost reported by step_finish events.",
+            "# TYPE opencode_cost_total counter",
+        ]
+        for phase, usage in sorted(self.tokens_by_phase().items()):
+            lines.append(f'opencode_cost_total{{phase="{_escape(phase)}"}} {usage.cost}')
+        lines += _summary_lines("opencode_phase_duration_seconds", "Wall-clock time per workflow phase.",
+                                "phase", self.phase_latency)
+        lines += _summary_lines("opencode_tool_call_duration_seconds", "Time from tool_call to tool_result.",
+                                "tool", self.tool_latency)
+        lines += _summary_lines("opencode_first_output_seconds", "Time from spawning opencode to the first output event.",
+                                "phase", self.first_output_latency)
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: Union[str, Path]) -> None:
+        """原子写入 Prometheus 文本文件（适配 node_exporter textfile collector）"""
+        path = Path(path)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _summary_lines(name: str, help_text: str, label: str, histograms: Dict[str, LatencyHistogram]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+    for key, hist in sorted(histograms.items()):
+        value = _escape(key)
+        for q in QUANTILES:
+            lines.append(f'{name}{{{label}="{value}",quantile="{q}"}} {hist.quantile(q)}')
+        lines.append(f'{name}_sum{{{label}="{value}"}} {hist.sum}')
+        lines.append(f'{name}_count{{{label}="{value}"}} {hist.count}')
+    return lines
+
+
+def print_report(metrics: MetricsRecorder) -> None:
+    """打印按 phase 汇总的 token 与延迟"""
+    print(f"{'phase':<10}{'tokens':>10}{'cost':>10}{'runs':>6}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}")
+    usage_by_phase = metrics.tokens_by_phase()
+    for phase in sorted(set(usage_by_phase) | set(metrics.phase_latency)):
+        usage = usage_by_phase.get(phase, TokenUsage())
+        hist = metrics.phase_latency.get(phase, LatencyHistogram())
+        print(f"{phase:<10}{usage.total:>10}{usage.cost:>10.4f}{hist.count:>6}"
+              f"{hist.quantile(0.5):>9.3f}{hist.quantile(0.95):>9.3f}{hist.quantile(0.99):>9.3f}")
+    for tool, hist in sorted(metrics.tool_latency.items()):
+        print(f"  tool {tool:<16} n={hist.count:<5} p50={hist.quantile(0.5):.3f}s p95={hist.quantile(0.95):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jsonl", help="export_jsonl 写出的文件")
+    parser.add_argument("--prometheus", help="同时写出汇总后的 Prometheus 文本文件")
+    args = parser.parse_args()
+
+    metrics = MetricsRecorder.from_jsonl(args.jsonl)
+    print_report(metrics)
+    if args.prometheus:
+        metrics.export_prometheus(args.prometheus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+OpenCode 事件的类型化表示
+
+用 `__slots__` dataclass 取代原始 dict：每个事件只保留工作流用得到的字段，
+按 `type` 查表分发构造，调用方用 isinstance 区分事件而不是层层 `.get()`。
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Dict, Optional, Union
+
+
+def _intern(value: Any) -> Optional[str]:
+    # 同一 run 内 sessionID / 工具名高度重复，驻留后所有事件共享同一个 str
+    return sys.intern(value) if isinstance(value, str) else None
+
+
+@dataclass(slots=True)
+class TextEvent:
+    """模型输出的文本片段"""
+
+    type: ClassVar[str] = "text"
+    text: str
+    session_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "sessionID": self.session_id, "part": {"text": self.text}}
+
+
+@dataclass(slots=True)
+class ToolCallEvent:
+    """工具调用开始"""
+
+    type: ClassVar[str] = "tool_call"
+    name: str
+    call_id: Optional[str] = None
+    session_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        part = {"tool": {"name": self.name}, "callID": self.call_id}
+        return {"type": self.type, "sessionID": self.session_id, "part": part}
+
+
+@dataclass(slots=True)
+class ToolResultEvent:
+    """工具调用结果"""
+
+    type: ClassVar[str] = "tool_result"
+    call_id: Optional[str] = None
+    output: str = ""
+    session_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        part = {"callID": self.call_id, "output": self.output}
+        return {"type": self.type, "sessionID": self.session_id, "part": part}
+
+
+@dataclass(slots=True)
+class StepFinishEvent:
+    """一个推理步骤结束，携带 token 用量"""
+
+    type: ClassVar[str] = "step_finish"
+    input_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost: float = 0.0
+    session_id: Optional[str] = None
+
+    @property
+    def tokens(self) -> Dict[str, Any]:
+        """还原为 opencode `part.tokens` 的结构"""
+        return {
+            "input": self.input_tokens,
+            "output": self.output_tokens,
+            "reasoning": self.reasoning_tokens,
+            "cache": {"read": self.cache_read_tokens, "write": self.cache_write_tokens},
+        }
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens + self.reasoning_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        part = {"tokens": self.tokens, "cost": self.cost}
+        return {"type": self.type, "sessionID": self.session_id, "part": part}
+
+
+@dataclass(slots=True)
+class OtherEvent:
+    """工作流不关心内容的事件（step_start 等），只保留类型"""
+
+    type: str
+    session_id: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.type, "sessionID": self.session_id}
+
+
+Event = Union[TextEvent, ToolCallEvent, ToolResultEvent, StepFinishEvent, OtherEvent]
+
+
+def _text(part: Dict[str, Any], session_id: Optional[str]) -> TextEvent:
+    return TextEvent(part.get("text", ""), session_id)
+
+
+def _tool_call(part: Dict[str, Any], session_id: Optional[str]) -> ToolCallEvent:
+    tool = part.get("tool", {})
+    # 兼容 `tool: {"name": ...}` 与 `tool: "name"` 两种结构；缺失或非字符串的名称记为 unknown
+    name = tool.get("name") if isinstance(tool, dict) else tool
+    return ToolCallEvent(_intern(name) or "unknown", part.get("callID"), session_id)
+
+
+def _tool_result(part: Dict[str, Any], session_id: Optional[str]) -> ToolResultEvent:
+    output = part.get("output")
+    if output is None:
+        output = part.get("state", {}).get("output", "")
+    return ToolResultEvent(part.get("callID"), output if isinstance(output, str) else str(output), session_id)
+
+
+def _step_finish(part: Dict[str, Any], session_id: Optional[str]) -> StepFinishEvent:
+    tokens = part.get("tokens", {})
+    cache = tokens.get("cache", {})
+    return StepFinishEvent(
+        input_tokens=tokens.get("input", 0),
+        output_tokens=tokens.get("output", 0),
+        reasoning_tokens=tokens.get("reasoning", 0),
+        cache_read_tokens=cache.get("read", 0),
+        cache_write_tokens=cache.get("write", 0),
+        cost=part.get("cost", 0.0),
+        session_id=session_id,
+    )
+
+
+_BUILDERS: Dict[str, Callable[[Dict[str, Any], Optional[str]], Event]] = {
+    TextEvent.type: _text,
+    ToolCallEvent.type: _tool_call,
+    ToolResultEvent.type: _tool_result,
+    StepFinishEvent.type: _step_finish,
+}
+
+
+def to_event(raw: Dict[str, Any]) -> Event:
+    """把 json.loads 得到的原始 dict 转换为类型化事件"""
+    event_type = raw.get("type")
+    session_id = _intern(raw.get("sessionID"))
+    builder = _BUILDERS.get(event_type)
+    if builder is None:
+        return OtherEvent(_intern(event_type) or "unknown", session_id)
+    return builder(raw.get("part") or {}, session_id)
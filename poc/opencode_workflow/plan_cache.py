@@ -0,0 +1,159 @@
+"""
+内容寻址的规划结果缓存
+
+key = sha256(任务文本, agent 名, 项目目录指纹)。同一任务在未变化的项目上再次规划时，
+直接返回上次的计划，省去一次完整的模型往返。
+
+每个条目是 `<cache_dir>/<key[:2]>/<key>.json`，原子写入；文件 mtime 兼作 LRU 时钟，
+过期（TTL）与超出条目数 / 字节数上限的条目在写入时淘汰。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# 指纹计算时跳过的目录（VCS 元数据、依赖与缓存）
+DEFAULT_IGNORED_DIRS = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".opencode"})
+
+
+def project_fingerprint(
+    project_dir: Union[str, Path],
+    hash_contents: bool = False,
+    ignored_dirs: Iterable[str] = DEFAULT_IGNORED_DIRS,
+) -> str:
+    """项目目录指纹：默认基于 (相对路径, 大小, mtime_ns)，hash_contents=True 时基于文件内容"""
+    root = Path(project_dir)
+    ignored = frozenset(ignored_dirs)
+    digest = hashlib.sha256()
+
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in ignored)
+        for name in sorted(filenames):
+            path = Path(dirpath, name)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+            if hash_contents:
+                digest.update(_file_digest(path))
+            else:
+                digest.update(f":{stat.st_size}:{stat.st_mtime_ns}".encode())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> bytes:
+    file_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.digest()
+
+
+def plan_cache_key(task: str, agent: str, fingerprint: str) -> str:
+    """组合 key；先编码为 JSON 数组，避免字段拼接产生歧义"""
+    payload = json.dumps([task, agent, fingerprint], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PlanCache:
+    """带 TTL 与 LRU 淘汰的持久化计划缓存"""
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        ttl: Optional[float] = 7 * 24 * 3600,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """命中返回缓存的计划并刷新其 LRU 时间；未命中或已过期返回 None"""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        now = time.time()
+        if self._expired(entry.get("created_at", 0), now):
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path, (now, now))
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return entry["plan"]
+
+    def put(self, key: str, plan: Dict[str, Any]) -> None:
+        """原子写入条目，然后按 TTL / 容量淘汰"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"created_at": time.time(), "plan": plan}, separators=(",", ":"))
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """删除过期条目，再按 mtime 从旧到新淘汰直到满足容量上限，返回删除数"""
+        now = time.time()
+        entries: List[Tuple[float, int, Path]] = []
+        removed = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            # mtime >= created_at，超过 TTL 未被访问的条目必然已过期
+            if self._expired(stat.st_mtime, now):
+                removed += self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, size, path = entries.pop(0)
+            total_bytes -= size
+            removed += self._remove(path)
+        return removed
+
+    def _remove(self, path: Path) -> int:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return 0
+        self.evictions += 1
+        return 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
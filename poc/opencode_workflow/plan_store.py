@@ -0,0 +1,190 @@
+"""
+持久化计划存储
+
+取代单个 `/tmp/opencode_plan.json`：每个任务一条记录，追加写入 JSONL 数据文件，
+另有一个追加写入的索引文件（task_id → 偏移量/长度）用于按 task_id 直接定位。
+
+并发与崩溃安全:
+- 写入方持有 `.lock` 的 flock 排他锁，同一主机上多个工作流进程串行追加
+- 先写数据并 fsync，再写索引行；索引行完整出现即代表记录已落盘
+- 崩溃留下的半行数据在下一次写入时截断；丢失的索引可由 rebuild_index() 从数据文件重建
+- 读取方无需加锁，只消费以换行结尾的完整索引行
+"""
+
+import fcntl
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+DATA_FILE = "plans.jsonl"
+INDEX_FILE = "plans.idx"
+LOCK_FILE = ".lock"
+
+
+def _encode(value: Any) -> Any:
+    """json.dumps 的 default 钩子：类型化事件等对象通过 to_dict() 序列化"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return to_dict()
+
+
+class PlanStore:
+    """按 task_id 存取计划记录的追加式存储"""
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.data_path = self.root / DATA_FILE
+        self.index_path = self.root / INDEX_FILE
+        self.lock_path = self.root / LOCK_FILE
+        # task_id -> (offset, length)，同一 task_id 以最后一次写入为准
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._index_pos = 0
+        # 已读索引文件的 inode；rebuild_index() 会整体替换索引文件
+        self._index_ino: Optional[int] = None
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def put(self, record: Dict[str, Any]) -> Tuple[int, int]:
+        """追加一条记录（必须包含 task_id），返回 (偏移量, 长度)"""
+        task_id = record["task_id"]
+        if not task_id or "\t" in task_id or "\n" in task_id:
+            raise ValueError(f"invalid task_id: {task_id!r}")
+        record = {"created_at": time.time(), **record}
+        line = (json.dumps(record, separators=(",", ":"), ensure_ascii=False, default=_encode) + "\n").encode("utf-8")
+
+        with self._locked():
+            data_fd = os.open(self.data_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                offset = self._discard_torn_tail(data_fd)
+                os.pwrite(data_fd, line, offset)
+                os.fsync(data_fd)
+            finally:
+                os.close(data_fd)
+
+            index_fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                index_end = self._discard_torn_tail(index_fd)
+                os.pwrite(index_fd, f"{task_id}\t{offset}\t{len(line)}\n".encode("utf-8"), index_end)
+                os.fsync(index_fd)
+            finally:
+                os.close(index_fd)
+
+        self._index[task_id] = (offset, len(line))
+        return offset, len(line)
+
+    @staticmethod
+    def _discard_torn_tail(fd: int) -> int:
+        """截断崩溃留下的不完整末行，返回可追加的文件末尾偏移"""
+        size = os.fstat(fd).st_size
+        if size == 0 or os.pread(fd, 1, size - 1) == b"\n":
+            return size
+        # 向前查找最后一个换行符
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            chunk = os.pread(fd, end - start, start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                size = start + newline + 1
+                break
+            end = start
+        else:
+            size = 0
+        os.ftruncate(fd, size)
+        return size
+
+    def _refresh_index(self) -> None:
+        """增量读取其他进程新追加的索引行；索引文件被替换或变短时从头重读"""
+        try:
+            with open(self.index_path, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_ino != self._index_ino or stat.st_size < self._index_pos:
+                    self._index.clear()
+                    self._index_pos = 0
+                    self._index_ino = stat.st_ino
+                f.seek(self._index_pos)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._index_pos += len(line)
+                    try:
+                        task_id, offset, length = line.decode("utf-8").rstrip("\n").split("\t")
+                        self._index[task_id] = (int(offset), int(length))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """按 task_id 读取最新记录，不存在返回 None"""
+        # 每次都增量刷新：其他进程可能刚为同一 task_id 写入了更新的记录
+        self._refresh_index()
+        location = self._index.get(task_id)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.data_path, "rb") as f:
+            raw = os.pread(f.fileno(), length, offset)
+        return json.loads(raw)
+
+    def __contains__(self, task_id: str) -> bool:
+        self._refresh_index()
+        return task_id in self._index
+
+    def __len__(self) -> int:
+        self._refresh_index()
+        return len(self._index)
+
+    def task_ids(self) -> list[str]:
+        """所有 task_id，按首次写入顺序"""
+        self._refresh_index()
+        return list(self._index)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """顺序扫描数据文件中的全部记录（包括同一 task_id 的历史版本）"""
+        try:
+            with open(self.data_path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def rebuild_index(self) -> int:
+        """从数据文件重建索引（索引丢失或损坏时使用），返回记录数"""
+        with self._locked():
+            entries = []
+            offset = 0
+            try:
+                with open(self.data_path, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break
+                        task_id = json.loads(line)["task_id"]
+                        entries.append(f"{task_id}\t{offset}\t{len(line)}\n")
+                        offset += len(line)
+            except FileNotFoundError:
+                pass
+
+            tmp_path = self.index_path.with_suffix(".idx.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(entries)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.index_path)
+
+        self._refresh_index()
+        return len(entries)
@@ -0,0 +1,143 @@
+"""
+OpenCode 事件流录制与回放
+
+录制文件是 gzip 压缩的 JSONL:
+  第 1 行  头部 {"format": "opencode-recording", "version": 1, "meta": {...},
+                 "returncode": 0, "stderr": "", "lines": N, "duration": 1.23}
+  其余行  [offset_seconds, raw_line]  —— stdout 原始行（含无法解析的行）及其相对进程启动的时间
+
+录制时先写入未压缩的临时文件，进程结束后再一次性写出带完整头部的 gzip 文件，
+因此回放时无需读到末尾就能知道退出码与行数；录制中途崩溃不会留下半个 fixture。
+
+  python -m opencode_workflow.recording info fixtures/*.jsonl.gz
+"""
+
+import argparse
+import gzip
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+FORMAT = "opencode-recording"
+VERSION = 1
+SUFFIX = ".jsonl.gz"
+
+
+class StreamRecorder:
+    """把一次 run 的 stdout 行连同时间偏移写入录制文件"""
+
+    def __init__(self, path: Union[str, Path], meta: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.meta = meta or {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lines = 0
+        self._last_offset = 0.0
+        self._buffer = tempfile.TemporaryFile(mode="w+", encoding="utf-8")
+
+    def write(self, offset: float, line: str) -> None:
+        self._buffer.write(json.dumps([round(offset, 6), line], ensure_ascii=False) + "\n")
+        self._lines += 1
+        self._last_offset = offset
+
+    def tee(self, lines: Iterable[str], started_at: float) -> Iterator[str]:
+        """透传行的同时录制，offset 相对 started_at（perf_counter）"""
+        for line in lines:
+            self.write(time.perf_counter() - started_at, line)
+            yield line
+
+    def finish(self, returncode: int, stderr: str = "", duration: Optional[float] = None) -> Path:
+        """写出最终的 gzip 文件（原子替换），返回路径"""
+        header = {
+            "format": FORMAT,
+            "version": VERSION,
+            "meta": self.meta,
+            "returncode": returncode,
+            "stderr": stderr,
+            "lines": self._lines,
+            "duration": self._last_offset if duration is None else duration,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as out:
+                out.write((json.dumps(header, ensure_ascii=False) + "\n").encode("utf-8"))
+                self._buffer.seek(0)
+                for line in self._buffer:
+                    out.write(line.encode("utf-8"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        finally:
+            self._buffer.close()
+        return self.path
+
+
+class Recording:
+    """已录制的一次 run；打开时只读头部，回放时流式解压"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{self.path} is not an opencode recording")
+        if header.get("version") != VERSION:
+            raise ValueError(f"unsupported recording version: {header.get('version')}")
+        self.meta: Dict[str, Any] = header["meta"]
+        self.returncode: int = header["returncode"]
+        self.stderr: str = header["stderr"]
+        self.lines: int = header["lines"]
+        self.duration: float = header["duration"]
+
+    @property
+    def agent(self) -> Optional[str]:
+        return self.meta.get("agent")
+
+    def iter_entries(self) -> Iterator[Tuple[float, str]]:
+        """逐条产出 (offset, raw_line)"""
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            f.readline()
+            for entry in f:
+                offset, line = json.loads(entry)
+                yield offset, line
+
+    def iter_lines(self, speed: Optional[float] = None) -> Iterator[str]:
+        """产出原始行；speed=None 全速回放，1.0 按录制时的节奏，2.0 两倍速"""
+        if speed is None:
+            for _, line in self.iter_entries():
+                yield line
+            return
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        started = time.perf_counter()
+        for offset, line in self.iter_entries():
+            delay = offset / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            yield line
+
+
+def recording_path(directory: Union[str, Path], agent: str) -> Path:
+    """按时间排序的唯一文件名：<毫秒时间戳>-<agent>-<随机后缀>.jsonl.gz"""
+    return Path(directory) / f"{time.time_ns() // 1_000_000:013d}-{agent}-{os.urandom(4).hex()}{SUFFIX}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    info = subparsers.add_parser("info", help="打印录制文件的头部信息")
+    info.add_argument("paths", nargs="+")
+    args = parser.parse_args()
+
+    print(f"{'file':<48}{'agent':<8}{'lines':>9}{'seconds':>10}{'exit':>6}")
+    for path in args.paths:
+        recording = Recording(path)
+        print(f"{Path(path).name:<48}{recording.agent or '-':<8}{recording.lines:>9}"
+              f"{recording.duration:>10.3f}{recording.returncode:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+本地 session 索引
+
+把 `opencode session list --format json` 的输出增量写入本地 SQLite：
+- 流式解析 JSON 数组，逐个 session 处理，不把整个列表读入内存
+- 只更新 updated 时间变化的 session
+- 支持按时间 / agent 过滤与 keyset 分页
+- 记录 task_id → session_id，编排层可直接回答"任务 X 的最新 session"
+"""
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    agent TEXT,
+    directory TEXT,
+    created REAL NOT NULL DEFAULT 0,
+    updated REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated DESC, id DESC);
+CREATE INDEX IF NOT EXISTS sessions_agent ON sessions (agent, updated DESC);
+CREATE TABLE IF NOT EXISTS task_sessions (
+    task_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    agent TEXT,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (task_id, session_id)
+);
+CREATE INDEX IF NOT EXISTS task_sessions_task ON task_sessions (task_id, recorded_at DESC);
+"""
+
+Timestamp = Union[float, int, datetime]
+Cursor = Tuple[float, str]
+
+
+def iter_json_array(stream: IO[str], chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """增量解析顶层 JSON 数组，逐个产出元素"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        pos = 0
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                if buffer[pos] == "," and not started:
+                    raise ValueError("expected a JSON array")
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                break
+            # 元素恰好停在缓冲区末尾时（如被截断的数字）等下一块再确认
+            if end == len(buffer) and not eof:
+                break
+            yield item
+            pos = end
+
+        buffer = buffer[pos:]
+
+    if started:
+        raise ValueError("truncated JSON array")
+
+
+def _seconds(value: Any) -> float:
+    """opencode 的时间戳是毫秒；统一转换为秒"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if not isinstance(value, (int, float)):
+        return 0.0
+    return value / 1000.0 if value > 1e11 else float(value)
+
+
+@dataclass
+class SessionRecord:
+    """索引中的一个 session"""
+
+    id: str
+    title: str
+    agent: Optional[str]
+    directory: Optional[str]
+    created: float
+    updated: float
+
+    @property
+    def cursor(self) -> Cursor:
+        return (self.updated, self.id)
+
+
+@dataclass
+class SessionPage:
+    """一页查询结果；next_cursor 为 None 表示没有下一页"""
+
+    items: List[SessionRecord]
+    next_cursor: Optional[Cursor]
+
+
+class SessionIndex:
+    """基于 SQLite 的 session 索引"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        # WAL：多个工作流进程并发读，写入互不阻塞读取
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SessionIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def sync(self, sessions: Iterable[Dict[str, Any]]) -> int:
+        """合并 session 列表，只写入新增或 updated 变化的条目，返回写入条数"""
+        known = dict(self._conn.execute("SELECT id, updated FROM sessions"))
+        changed = 0
+        with self._conn:
+            for session in sessions:
+                if not isinstance(session, dict) or not session.get("id"):
+                    continue
+                times = session.get("time") or {}
+                created = _seconds(times.get("created", session.get("created")))
+                updated = _seconds(times.get("updated", session.get("updated"))) or created
+                if known.get(session["id"]) == updated:
+                    continue
+                self._conn.execute(
+                    """
+                    INSERT INTO sessions (id, title, agent, directory, created, updated)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        title = excluded.title,
+                        agent = COALESCE(excluded.agent, sessions.agent),
+                        directory = excluded.directory,
+                        -- record_task() 的占位行以记录时间作为 created，以 session list 为准
+                        created = CASE WHEN excluded.created > 0 THEN excluded.created ELSE sessions.created END,
+                        updated = excluded.updated
+                    """,
+                    (session["id"], session.get("title") or "", session.get("agent"),
+                     session.get("directory"), created, updated),
+                )
+                changed += 1
+        return changed
+
+    def sync_from_stream(self, stream: IO[str]) -> int:
+        """直接消费 `opencode session list --format json` 的输出流"""
+        return self.sync(iter_json_array(stream))
+
+    def record_task(self, task_id: str, session_id: str, agent: Optional[str] = None) -> None:
+        """记录任务使用的 session（工作流在事件流中拿到 sessionID 时调用）"""
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO task_sessions (task_id, session_id, agent, recorded_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (task_id, session_id) DO UPDATE SET recorded_at = excluded.recorded_at
+                """,
+                (task_id, session_id, agent, now),
+            )
+            # session 尚未出现在 session list 中时先占位，便于按 agent 查询
+            self._conn.execute(
+                """
+                INSERT INTO sessions (id, agent, created, updated) VALUES (?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET agent = COALESCE(sessions.agent, excluded.agent)
+                """,
+                (session_id, agent, now, now),
+            )
+
+    def latest_for_task(self, task_id: str) -> Optional[str]:
+        """任务最近一次使用的 session_id"""
+        row = self._conn.execute(
+            "SELECT session_id FROM task_sessions WHERE task_id = ? ORDER BY recorded_at DESC LIMIT 1",
+            (task_id,),
+        ).fetchone()
+        return row["session_id"] if row else None
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        row = self._conn.execute("SELECT * FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return SessionRecord(**dict(row)) if row else None
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def query(
+        self,
+        agent: Optional[str] = None,
+        since: Optional[Timestamp] = None,
+        until: Optional[Timestamp] = None,
+        limit: int = 20,
+        cursor: Optional[Cursor] = None,
+    ) -> SessionPage:
+        """按 updated 倒序分页查询；cursor 取上一页的 next_cursor"""
+        clauses = []
+        params: List[Any] = []
+        if agent is not None:
+            clauses.append("agent = ?")
+            params.append(agent)
+        if since is not None:
+            clauses.append("updated >= ?")
+            params.append(_seconds(since))
+        if until is not None:
+            clauses.append("updated < ?")
+            params.append(_seconds(until))
+        if cursor is not None:
+            clauses.append("(updated < ? OR (updated = ? AND id < ?))")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT * FROM sessions {where} ORDER BY updated DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+
+        items = [SessionRecord(**dict(row)) for row in rows[:limit]]
+        next_cursor = items[-1].cursor if len(rows) > limit else None
+        return SessionPage(items, next_cursor)
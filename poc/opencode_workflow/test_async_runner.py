@@ -0,0 +1,142 @@
+"""
+Tests for the asyncio OpenCode runner, driven by fake_opencode.py.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from opencode_workflow.async_runner import AsyncOpenCodeRunner, TaskResult, run_tasks
+
+FAKE_OPENCODE = [sys.executable, str(Path(__file__).with_name("fake_opencode.py"))]
+
+
+@pytest.fixture
+def fast_fake(monkeypatch):
+    """Make every fake opencode run take roughly 0.2 seconds."""
+    monkeypatch.setenv("FAKE_OPENCODE_DELAY", "0.2")
+    monkeypatch.setenv("FAKE_OPENCODE_EVENTS", "2")
+
+
+class TestAsyncOpenCodeRunner:
+    """Test suite for AsyncOpenCodeRunner."""
+
+    def test_pipeline_collects_plan_text(self, tmp_path, fast_fake):
+        """Test that a pipeline plans, approves and executes a task."""
+        results = run_tasks(tmp_path, ["add numbers"], opencode_cmd=FAKE_OPENCODE)
+
+        assert len(results) == 1
+        assert results[0].ok
+        assert results[0].plan_text == "[plan] step 1\n[plan] step 2\n"
+
+    def test_results_keep_input_order(self, tmp_path, fast_fake):
+        """Test that results are returned in task order."""
+        tasks = [f"task {i}" for i in range(5)]
+        results = run_tasks(tmp_path, tasks, opencode_cmd=FAKE_OPENCODE, concurrency=5)
+
+        assert [r.task for r in results] == tasks
+        assert all(r.ok for r in results)
+
+    def test_concurrency_runs_pipelines_in_parallel(self, tmp_path, fast_fake):
+        """Test that concurrent pipelines finish faster than back-to-back runs."""
+        started = time.perf_counter()
+        run_tasks(tmp_path, [f"task {i}" for i in range(4)], opencode_cmd=FAKE_OPENCODE, concurrency=4)
+        elapsed = time.perf_counter() - started
+
+        # 4 pipelines x 2 runs x 0.2s would take 1.6s sequentially
+        assert elapsed < 1.4
+
+    def test_concurrency_limit_is_respected(self, tmp_path, fast_fake):
+        """Test that no more than `concurrency` pipelines run at once."""
+        active = 0
+        peak = 0
+
+        async def approve(task, plan_text):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+            return True
+
+        runner = AsyncOpenCodeRunner(tmp_path, opencode_cmd=FAKE_OPENCODE, concurrency=2, approve=approve)
+        results = asyncio.run(runner.run_many([f"task {i}" for i in range(6)]))
+
+        assert all(r.ok for r in results)
+        assert peak <= 2
+
+    def test_rejected_plan_skips_execution(self, tmp_path, fast_fake):
+        """Test that a rejected plan is not executed."""
+        seen_agents = []
+
+        def on_event(task, event):
+            if event.type == "text":
+                seen_agents.append(event.text.split("]")[0])
+
+        runner = AsyncOpenCodeRunner(
+            tmp_path, opencode_cmd=FAKE_OPENCODE, approve=lambda task, plan: False, on_event=on_event
+        )
+        result = asyncio.run(runner.run_pipeline("task"))
+
+        assert result.status == "rejected"
+        assert set(seen_agents) == {"[plan"}
+
+    def test_timeout(self, tmp_path, fast_fake):
+        """Test that a pipeline exceeding task_timeout is reported as timeout."""
+        results = run_tasks(tmp_path, ["slow"], opencode_cmd=FAKE_OPENCODE, task_timeout=0.1)
+
+        assert results[0].status == "timeout"
+        assert results[0].elapsed < 1.0
+
+    def test_failure_is_recorded(self, tmp_path, fast_fake, monkeypatch):
+        """Test that a non-zero opencode exit marks the task as failed."""
+        monkeypatch.setenv("FAKE_OPENCODE_EXIT", "3")
+        results = run_tasks(tmp_path, ["broken"], opencode_cmd=FAKE_OPENCODE)
+
+        assert results[0].status == "failed"
+        assert "exited with 3" in results[0].error
+
+    def test_unexpected_errors_are_recorded(self, tmp_path, fast_fake):
+        """Test that a missing binary or a raising approve callback fails only its own task."""
+        missing = run_tasks(tmp_path, ["a", "b"], opencode_cmd=[str(tmp_path / "no-such-opencode")])
+
+        assert [r.status for r in missing] == ["failed", "failed"]
+        assert "FileNotFoundError" in missing[0].error
+
+        def approve(task, plan_text):
+            if task == "bad":
+                raise KeyError(task)
+            return True
+
+        results = run_tasks(tmp_path, ["good", "bad"], opencode_cmd=FAKE_OPENCODE, approve=approve)
+
+        assert [r.status for r in results] == ["ok", "failed"]
+        assert results[1].error == "KeyError('bad')"
+
+    def test_single_task_can_be_cancelled(self, tmp_path, fast_fake):
+        """Test that cancelling one handle leaves the others running."""
+
+        async def scenario():
+            runner = AsyncOpenCodeRunner(tmp_path, opencode_cmd=FAKE_OPENCODE, concurrency=3)
+            tasks = ["a", "b", "c"]
+            handles = runner.start(tasks)
+            await asyncio.sleep(0.05)
+            handles[1].cancel()
+            return await runner.gather(tasks, handles)
+
+        results = asyncio.run(scenario())
+
+        assert [r.status for r in results] == ["ok", "cancelled", "ok"]
+
+    def test_invalid_concurrency(self, tmp_path):
+        """Test that a concurrency below 1 raises ValueError."""
+        with pytest.raises(ValueError):
+            AsyncOpenCodeRunner(tmp_path, concurrency=0)
+
+    def test_task_result_ok_property(self):
+        """Test the TaskResult.ok convenience property."""
+        assert TaskResult(task="t", status="ok").ok
+        assert not TaskResult(task="t", status="timeout").ok
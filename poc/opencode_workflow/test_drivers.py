@@ -0,0 +1,177 @@
+"""
+Tests for the backend driver layer.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from opencode_workflow.async_runner import OpenCodeRunError
+from opencode_workflow.bench_async import FAKE_OPENCODE, load_workflow_class
+from opencode_workflow.drivers import CLIDriver, Driver, ReplayDriver, ServerDriver
+from opencode_workflow.models import StepFinishEvent, TextEvent
+from opencode_workflow.plan_store import PlanStore
+from opencode_workflow.session_index import SessionIndex
+
+PLAN_EVENTS = [
+    {"type": "step_start", "sessionID": "ses_rec", "part": {"type": "step-start"}},
+    {"type": "text", "sessionID": "ses_rec", "part": {"type": "text", "text": "1. write add.py\n"}},
+    {"type": "step_finish", "sessionID": "ses_rec", "part": {"tokens": {"input": 100, "output": 5}}},
+]
+BUILD_EVENTS = [
+    {"type": "text", "sessionID": "ses_rec", "part": {"type": "text", "text": "done\n"}},
+    {"type": "step_finish", "sessionID": "ses_rec", "part": {"tokens": {"input": 10, "output": 1}}},
+]
+
+
+def make_poc(tmp_path, driver):
+    return load_workflow_class()(
+        tmp_path,
+        driver=driver,
+        plan_store=PlanStore(tmp_path / "plans"),
+        session_index=SessionIndex(tmp_path / "sessions.db"),
+    )
+
+
+def run_workflow(poc):
+    with contextlib.redirect_stdout(io.StringIO()):
+        plan = poc.phase1_planning("add numbers")
+        executed = poc.phase3_execution(plan)
+        listed = poc.phase4_persistence_test(plan["task_id"])
+    return plan, executed, listed
+
+
+class TestDriver:
+    """Test suite for the Driver base class."""
+
+    def test_is_abstract(self):
+        """Test that a driver must implement run() and session_list()."""
+
+        class RunOnly(Driver):
+            def run(self, agent, prompt, session_id=None, on_invalid=None):
+                return iter(())
+
+        with pytest.raises(TypeError):
+            Driver()
+        with pytest.raises(TypeError):
+            RunOnly()
+
+
+class TestCLIDriver:
+    """Test suite for CLIDriver."""
+
+    def test_command_layout(self):
+        """Test that the run command matches the opencode CLI."""
+        driver = CLIDriver(["opencode"])
+
+        assert driver.command("build", "go", session_id="ses_1") == [
+            "opencode", "run", "--agent", "build", "--session", "ses_1", "--format", "json", "go",
+        ]
+
+    def test_session_list_failure_raises(self, tmp_path, monkeypatch):
+        """Test that a failing session list surfaces as OpenCodeRunError."""
+        driver = CLIDriver([*FAKE_OPENCODE, "bogus"], cwd=tmp_path)
+
+        with pytest.raises(OpenCodeRunError):
+            with driver.session_list() as stream:
+                stream.read()
+
+
+class TestServerDriver:
+    """Test suite for ServerDriver against the fake opencode server."""
+
+    def test_runs_attach_to_one_server(self, tmp_path):
+        """Test that every run reuses the same long-lived server."""
+        with ServerDriver(FAKE_OPENCODE, cwd=tmp_path) as driver:
+            plan, executed, listed = run_workflow(make_poc(tmp_path, driver))
+            server = driver._process
+
+            assert driver.url.startswith("http://127.0.0.1:")
+            assert driver.command("plan", "x")[len(FAKE_OPENCODE):len(FAKE_OPENCODE) + 3] == ["run", "--attach", driver.url]
+            assert executed and listed
+            assert driver._process is server
+
+        assert server.poll() is not None
+
+    def test_run_poc_closes_server(self, tmp_path):
+        """Test that a full PoC run stops the server it started."""
+        driver = ServerDriver(FAKE_OPENCODE, cwd=tmp_path)
+        poc = make_poc(tmp_path, driver)
+        poc.metrics_file, poc.prometheus_file = tmp_path / "metrics.jsonl", tmp_path / "metrics.prom"
+        servers = []
+        start = driver.start
+
+        def tracking_start():
+            url = start()
+            servers.append(driver._process)
+            return url
+
+        driver.start = tracking_start
+        with contextlib.redirect_stdout(io.StringIO()):
+            poc.run_poc("add numbers")
+
+        assert servers and driver._process is None
+        assert all(server.poll() is not None for server in servers)
+
+    def test_startup_failure_raises(self, tmp_path):
+        """Test that a server that exits without a URL is reported."""
+        driver = ServerDriver([*FAKE_OPENCODE, "bogus"], cwd=tmp_path)
+
+        with pytest.raises(OpenCodeRunError):
+            driver.start()
+
+
+class TestReplayDriver:
+    """Test suite for ReplayDriver."""
+
+    def test_workflow_runs_offline(self, tmp_path):
+        """Test that the full workflow runs from recorded streams."""
+        sessions = [{"id": "ses_rec", "title": "recorded", "time": {"created": 1, "updated": 2}}]
+        driver = ReplayDriver({"plan": PLAN_EVENTS, "build": BUILD_EVENTS}, sessions=sessions)
+        poc = make_poc(tmp_path, driver)
+
+        plan, executed, listed = run_workflow(poc)
+
+        assert plan["plan_text"] == "1. write add.py\n"
+        assert plan["session_id"] == "ses_rec"
+        assert executed and listed
+        assert [call["agent"] for call in driver.calls] == ["plan", "build"]
+        assert driver.calls[1]["session_id"] == "ses_rec"
+        assert poc.metrics.tokens_by_phase()["plan"].input == 100
+        assert poc.session_index.get("ses_rec").title == "recorded"
+
+    def test_runs_are_replayed_in_order(self):
+        """Test that several recordings for one agent are replayed in turn."""
+        first = [{"type": "text", "part": {"text": "a"}}]
+        second = [{"type": "text", "part": {"text": "b"}}]
+        driver = ReplayDriver({"plan": [first, second]})
+
+        texts = []
+        for _ in range(3):
+            with driver.run("plan", "task") as stream:
+                texts.extend(event.text for event in stream if isinstance(event, TextEvent))
+
+        assert texts == ["a", "b", "b"]
+
+    def test_replayed_failure(self, tmp_path):
+        """Test that a recorded non-zero exit fails execution."""
+        driver = ReplayDriver({"build": BUILD_EVENTS}, returncode=1)
+        poc = make_poc(tmp_path, driver)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert not poc.phase3_execution({"task_id": "t1", "task": "x", "plan_text": "p"})
+
+    def test_unknown_agent(self):
+        """Test that running an agent without a recording is an error."""
+        with pytest.raises(KeyError):
+            ReplayDriver({"plan": PLAN_EVENTS}).run("build", "x")
+
+    def test_events_are_typed(self):
+        """Test that replayed events are converted to typed events."""
+        with ReplayDriver({"plan": PLAN_EVENTS}).run("plan", "x") as stream:
+            events = list(stream)
+
+        assert isinstance(events[-1], StepFinishEvent)
+        assert stream.returncode == 0
+        assert stream.first_output_latency is not None
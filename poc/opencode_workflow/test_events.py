@@ -0,0 +1,114 @@
+"""
+Tests for the incremental OpenCode event stream parser.
+"""
+
+import io
+import json
+import sys
+
+import pytest
+
+from opencode_workflow.events import EventStream, iter_events, parse_line
+
+
+# Emits one text event immediately, then stalls before finishing
+SLOW_EMITTER = """
+import json, sys, time
+print(json.dumps({"type": "step_start"}), flush=True)
+print(json.dumps({"type": "text", "part": {"text": "hello"}}), flush=True)
+time.sleep(0.5)
+print("not json", flush=True)
+print(json.dumps({"type": "step_finish", "part": {"tokens": {"input": 3}}}), flush=True)
+print("boom", file=sys.stderr)
+sys.exit(int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+"""
+
+
+class TestParseLine:
+    """Test suite for parse_line."""
+
+    def test_blank_line_returns_none(self):
+        """Test that blank lines are skipped."""
+        assert parse_line("   \n") is None
+
+    def test_valid_event(self):
+        """Test that a JSON object line is decoded."""
+        assert parse_line('{"type": "text"}\n') == {"type": "text"}
+
+    def test_invalid_line_raises(self):
+        """Test that malformed lines raise JSONDecodeError."""
+        with pytest.raises(json.JSONDecodeError):
+            parse_line("not json")
+
+    def test_non_object_raises(self):
+        """Test that non-object JSON values are rejected."""
+        with pytest.raises(json.JSONDecodeError):
+            parse_line("[1, 2]")
+
+
+class TestIterEvents:
+    """Test suite for iter_events."""
+
+    def test_skips_blank_and_reports_invalid(self):
+        """Test that blank lines are dropped and invalid lines reported."""
+        stream = io.StringIO('{"type": "a"}\n\ngarbage\n{"type": "b"}\n')
+        invalid = []
+
+        events = list(iter_events(stream, on_invalid=invalid.append))
+
+        assert [e["type"] for e in events] == ["a", "b"]
+        assert invalid == ["garbage\n"]
+
+    def test_is_lazy(self):
+        """Test that lines are consumed one event at a time."""
+        stream = io.StringIO('{"type": "a"}\n{"type": "b"}\n')
+        iterator = iter_events(stream)
+
+        assert next(iterator)["type"] == "a"
+        # The second line has not been consumed yet
+        assert stream.tell() < len(stream.getvalue())
+
+
+class TestEventStream:
+    """Test suite for EventStream over a real subprocess pipe."""
+
+    def test_events_arrive_before_process_exit(self):
+        """Test that events are yielded while the process is still running."""
+        invalid = []
+        with EventStream([sys.executable, "-c", SLOW_EMITTER], on_invalid=invalid.append) as stream:
+            events = []
+            for event in stream:
+                events.append(event)
+                if event["type"] == "text":
+                    # The emitter is still sleeping at this point
+                    assert stream._process.poll() is None
+
+        assert [e["type"] for e in events] == ["step_start", "text", "step_finish"]
+        assert invalid == ["not json\n"]
+        assert stream.returncode == 0
+        assert stream.event_count == 3
+        assert stream.first_output_latency is not None
+        assert stream.first_output_latency < 0.5
+        assert "boom" in stream.stderr
+
+    def test_nonzero_exit_code(self):
+        """Test that the process exit code is recorded."""
+        with EventStream([sys.executable, "-c", SLOW_EMITTER, "3"]) as stream:
+            for _ in stream:
+                pass
+
+        assert stream.returncode == 3
+
+    def test_early_break_still_reaps_process(self):
+        """Test that breaking out of the loop still waits for the process."""
+        with EventStream([sys.executable, "-c", SLOW_EMITTER]) as stream:
+            for event in stream:
+                break
+
+        assert stream.returncode == 0
+
+    def test_iterating_outside_context_raises(self):
+        """Test that iterating an unstarted stream raises RuntimeError."""
+        stream = EventStream([sys.executable, "-c", "pass"])
+        with pytest.raises(RuntimeError):
+            iter(stream).__next__()
@@ -0,0 +1,136 @@
+"""
+Tests for token and latency accounting.
+"""
+
+import json
+import math
+
+import pytest
+
+from opencode_workflow.metrics import LatencyHistogram, MetricsRecorder, TokenUsage
+from opencode_workflow.models import StepFinishEvent, TextEvent, ToolCallEvent, ToolResultEvent, to_event
+
+
+def step(input_tokens, output_tokens, cost=0.0):
+    return StepFinishEvent(input_tokens=input_tokens, output_tokens=output_tokens, cost=cost)
+
+
+class TestLatencyHistogram:
+    """Test suite for LatencyHistogram."""
+
+    def test_quantiles_use_nearest_rank(self):
+        """Test p50/p95/p99 on 1..100."""
+        hist = LatencyHistogram([float(i) for i in range(100, 0, -1)])
+
+        assert hist.quantile(0.5) == 50.0
+        assert hist.quantile(0.95) == 95.0
+        assert hist.quantile(0.99) == 99.0
+        assert hist.summary()["count"] == 100
+
+    def test_empty_histogram_is_nan(self):
+        """Test that an empty histogram reports NaN quantiles."""
+        assert math.isnan(LatencyHistogram().quantile(0.5))
+
+
+class TestMetricsRecorder:
+    """Test suite for MetricsRecorder."""
+
+    def test_tokens_per_phase_and_task(self):
+        """Test that step_finish tokens are totalled per phase and per task."""
+        metrics = MetricsRecorder()
+        metrics.observe_event("t1", "plan", step(10, 5, cost=0.01))
+        metrics.observe_event("t1", "execute", step(20, 7))
+        metrics.observe_event("t2", "plan", step(1, 1))
+        metrics.observe_event("t2", "plan", TextEvent("ignored"))
+
+        by_phase = metrics.tokens_by_phase()
+        by_task = metrics.tokens_by_task()
+
+        assert by_phase["plan"] == TokenUsage(input=11, output=6, cost=0.01)
+        assert by_phase["execute"].total == 27
+        assert by_task["t1"].total == 42
+        assert by_task["t2"].total == 2
+
+    def test_phase_timer_records_on_error(self):
+        """Test that a phase is timed even when it raises."""
+        metrics = MetricsRecorder()
+        with pytest.raises(RuntimeError):
+            with metrics.phase("t1", "plan"):
+                raise RuntimeError("boom")
+
+        assert metrics.phase_latency["plan"].count == 1
+        assert ("t1", "plan") in metrics.durations
+
+    def test_tool_call_latency_pairs_by_call_id(self):
+        """Test that tool latency is measured from call to matching result."""
+        metrics = MetricsRecorder()
+        metrics.observe_event("t1", "execute", ToolCallEvent("bash", "c1"))
+        metrics.observe_event("t1", "execute", ToolCallEvent("write", "c2"))
+        metrics.observe_event("t1", "execute", ToolResultEvent("c2"))
+        metrics.observe_event("t1", "execute", ToolResultEvent("unknown"))
+
+        assert metrics.tool_latency["write"].count == 1
+        assert "bash" not in metrics.tool_latency
+
+    def test_non_string_tool_name_is_exported_as_unknown(self, tmp_path):
+        """Test that a parsed tool call without a string name does not break sorting or export."""
+        metrics = MetricsRecorder()
+        for call_id, name in (("c1", None), ("c2", "bash"), ("c3", 3)):
+            call = to_event({"type": "tool_call", "part": {"callID": call_id, "tool": {"name": name}}})
+            metrics.observe_event("t1", "execute", call)
+            metrics.observe_event("t1", "execute", ToolResultEvent(call_id))
+
+        assert sorted(metrics.tool_latency) == ["bash", "unknown"]
+        assert metrics.tool_latency["unknown"].count == 2
+        metrics.export_prometheus(tmp_path / "metrics.prom")
+        assert 'tool="unknown"' in (tmp_path / "metrics.prom").read_text()
+
+    def test_jsonl_round_trip_aggregates_runs(self, tmp_path):
+        """Test that several exported runs merge back into one aggregate."""
+        path = tmp_path / "metrics.jsonl"
+        for run in range(3):
+            metrics = MetricsRecorder(run_id=f"run{run}")
+            metrics.observe_event(f"t{run}", "plan", step(10, 1))
+            with metrics.phase(f"t{run}", "plan"):
+                pass
+            metrics.export_jsonl(path)
+
+        lines = path.read_text().splitlines()
+        aggregate = MetricsRecorder.from_jsonl(path)
+
+        assert [json.loads(line)["run_id"] for line in lines] == ["run0", "run1", "run2"]
+        assert aggregate.tokens_by_phase()["plan"].total == 33
+        assert aggregate.phase_latency["plan"].count == 3
+        assert len(aggregate.tokens_by_task()) == 3
+
+    def test_first_output_latency_round_trip(self, tmp_path):
+        """Test that first-output latency survives export and ignores missing samples."""
+        path = tmp_path / "metrics.jsonl"
+        metrics = MetricsRecorder()
+        metrics.observe_first_output("execute", 0.25)
+        metrics.observe_first_output("execute", None)
+        metrics.export_jsonl(path)
+
+        aggregate = MetricsRecorder.from_jsonl(path)
+
+        assert aggregate.first_output_latency["execute"].samples == [0.25]
+        assert 'opencode_first_output_seconds_count{phase="execute"} 1' in aggregate.to_prometheus()
+
+    def test_prometheus_export(self, tmp_path):
+        """Test the Prometheus text exposition output."""
+        metrics = MetricsRecorder()
+        metrics.observe_event("t1", "plan", step(10, 5, cost=0.25))
+        metrics.phase_latency["plan"] = LatencyHistogram([1.0, 2.0, 3.0])
+        metrics.tool_latency['we"ird'] = LatencyHistogram([0.5])
+        path = tmp_path / "metrics.prom"
+
+        metrics.export_prometheus(path)
+        text = path.read_text()
+
+        assert "# TYPE opencode_tokens_total counter" in text
+        assert 'opencode_tokens_total{phase="plan",kind="input"} 10' in text
+        assert 'opencode_cost_total{phase="plan"} 0.25' in text
+        assert 'opencode_phase_duration_seconds{phase="plan",quantile="0.5"} 2.0' in text
+        assert 'opencode_phase_duration_seconds_count{phase="plan"} 3' in text
+        assert 'opencode_tool_call_duration_seconds_sum{tool="we\\"ird"} 0.5' in text
+        assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,97 @@
+"""
+Tests for the typed OpenCode event model.
+"""
+
+import json
+
+import pytest
+
+from opencode_workflow.models import (
+    OtherEvent,
+    StepFinishEvent,
+    TextEvent,
+    ToolCallEvent,
+    ToolResultEvent,
+    to_event,
+)
+
+
+class TestToEvent:
+    """Test suite for to_event dispatch."""
+
+    def test_text_event(self):
+        """Test that text events keep their text and session id."""
+        event = to_event({"type": "text", "sessionID": "ses_1", "part": {"text": "hi"}})
+
+        assert event == TextEvent("hi", "ses_1")
+
+    @pytest.mark.parametrize("tool", [{"name": "bash"}, "bash"])
+    def test_tool_call_accepts_both_tool_shapes(self, tool):
+        """Test that tool_call supports dict and string tool names."""
+        event = to_event({"type": "tool_call", "part": {"tool": tool, "callID": "c1"}})
+
+        assert isinstance(event, ToolCallEvent)
+        assert event.name == "bash"
+        assert event.call_id == "c1"
+
+    @pytest.mark.parametrize("part", [{}, {"tool": {"name": None}}, {"tool": {"name": 7}}, {"tool": None}, {"tool": ""}])
+    def test_tool_call_without_string_name_is_unknown(self, part):
+        """Test that missing or non-string tool names become "unknown"."""
+        assert to_event({"type": "tool_call", "part": part}).name == "unknown"
+
+    def test_tool_result_reads_state_output(self):
+        """Test that tool_result falls back to part.state.output."""
+        event = to_event({"type": "tool_result", "part": {"callID": "c1", "state": {"output": "done"}}})
+
+        assert event == ToolResultEvent("c1", "done")
+
+    def test_step_finish_tokens(self):
+        """Test that step_finish flattens token counts into slots."""
+        raw = {
+            "type": "step_finish",
+            "part": {"cost": 0.5, "tokens": {"input": 10, "output": 5, "reasoning": 2, "cache": {"read": 7}}},
+        }
+        event = to_event(raw)
+
+        assert isinstance(event, StepFinishEvent)
+        assert event.total_tokens == 17
+        assert event.cache_read_tokens == 7
+        assert event.tokens["cache"] == {"read": 7, "write": 0}
+        assert event.cost == 0.5
+
+    def test_unknown_type_becomes_other_event(self):
+        """Test that unrecognised events keep only their type."""
+        assert to_event({"type": "step_start", "part": {"big": "x" * 100}}) == OtherEvent("step_start")
+        assert to_event({}) == OtherEvent("unknown")
+
+    def test_missing_part_uses_defaults(self):
+        """Test that a null part does not break construction."""
+        assert to_event({"type": "text", "part": None}) == TextEvent("")
+
+
+class TestEventObjects:
+    """Test suite for event instances."""
+
+    def test_events_have_no_instance_dict(self):
+        """Test that events are slotted and carry no per-instance __dict__."""
+        for event in (TextEvent("a"), ToolCallEvent("b"), ToolResultEvent(), StepFinishEvent(), OtherEvent("x")):
+            assert not hasattr(event, "__dict__")
+
+    def test_to_dict_round_trips(self):
+        """Test that to_dict output parses back to an equal event."""
+        events = [
+            TextEvent("plan", "ses_1"),
+            ToolCallEvent("write", "c1", "ses_1"),
+            ToolResultEvent("c1", "ok", "ses_1"),
+            StepFinishEvent(input_tokens=3, output_tokens=4, cost=0.1, session_id="ses_1"),
+            OtherEvent("step_start", "ses_1"),
+        ]
+        for event in events:
+            assert to_event(json.loads(json.dumps(event.to_dict()))) == event
+
+    def test_session_id_is_interned(self):
+        """Test that repeated session ids share a single string object."""
+        first = to_event(json.loads('{"type": "text", "sessionID": "ses_shared_id"}'))
+        second = to_event(json.loads('{"type": "text", "sessionID": "ses_shared_id"}'))
+
+        assert first.session_id is second.session_id
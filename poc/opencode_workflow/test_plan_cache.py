@@ -0,0 +1,162 @@
+"""
+Tests for the content-addressed plan cache.
+"""
+
+import contextlib
+import io
+import os
+import time
+
+import pytest
+
+from opencode_workflow.bench_async import FAKE_OPENCODE, load_workflow_class
+from opencode_workflow.plan_cache import PlanCache, plan_cache_key, project_fingerprint
+from opencode_workflow.plan_store import PlanStore
+from opencode_workflow.session_index import SessionIndex
+
+PLAN = {"plan_text": "1. write add.py", "events": [{"type": "text", "part": {"text": "1. write add.py"}}]}
+
+
+class TestProjectFingerprint:
+    """Test suite for project_fingerprint."""
+
+    def test_stable_for_unchanged_tree(self, tmp_path):
+        """Test that an untouched tree yields the same fingerprint."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+
+        assert project_fingerprint(tmp_path) == project_fingerprint(tmp_path)
+
+    def test_changes_when_file_changes(self, tmp_path):
+        """Test that editing a file changes both fingerprint modes."""
+        target = tmp_path / "a.py"
+        target.write_text("x = 1\n")
+        before = project_fingerprint(tmp_path), project_fingerprint(tmp_path, hash_contents=True)
+
+        target.write_text("x = 22\n")
+
+        assert project_fingerprint(tmp_path) != before[0]
+        assert project_fingerprint(tmp_path, hash_contents=True) != before[1]
+
+    def test_content_mode_ignores_mtime(self, tmp_path):
+        """Test that hash_contents=True only depends on file contents."""
+        target = tmp_path / "a.py"
+        target.write_text("x = 1\n")
+        before = project_fingerprint(tmp_path, hash_contents=True)
+
+        os.utime(target, (1, 1))
+
+        assert project_fingerprint(tmp_path, hash_contents=True) == before
+
+    def test_ignored_dirs_are_skipped(self, tmp_path):
+        """Test that VCS and cache directories do not affect the fingerprint."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+        before = project_fingerprint(tmp_path)
+
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+
+        assert project_fingerprint(tmp_path) == before
+
+
+class TestPlanCache:
+    """Test suite for PlanCache."""
+
+    def test_key_depends_on_every_component(self):
+        """Test that task, agent and fingerprint all change the key."""
+        base = plan_cache_key("task", "plan", "fp")
+
+        assert base != plan_cache_key("task2", "plan", "fp")
+        assert base != plan_cache_key("task", "build", "fp")
+        assert base != plan_cache_key("task", "plan", "fp2")
+        assert plan_cache_key("a\0b", "c", "fp") != plan_cache_key("a", "b\0c", "fp")
+
+    def test_miss_then_hit(self, tmp_path):
+        """Test that a stored plan is returned and counted as a hit."""
+        cache = PlanCache(tmp_path)
+
+        assert cache.get("k" * 64) is None
+        cache.put("k" * 64, PLAN)
+
+        assert cache.get("k" * 64) == PLAN
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+    def test_entries_persist_across_instances(self, tmp_path):
+        """Test that a new cache instance sees earlier entries."""
+        PlanCache(tmp_path).put("a" * 64, PLAN)
+
+        assert PlanCache(tmp_path).get("a" * 64) == PLAN
+
+    def test_ttl_expiry(self, tmp_path):
+        """Test that expired entries are treated as misses and removed."""
+        cache = PlanCache(tmp_path, ttl=0.05)
+        cache.put("a" * 64, PLAN)
+        time.sleep(0.1)
+
+        assert cache.get("a" * 64) is None
+        assert cache.stats()["evictions"] == 1
+        assert not list(tmp_path.glob("*/*.json"))
+
+    def test_lru_eviction_by_entry_count(self, tmp_path):
+        """Test that the least recently used entry is evicted first."""
+        cache = PlanCache(tmp_path, max_entries=2)
+        cache.put("a" * 64, PLAN)
+        cache.put("b" * 64, PLAN)
+        # Make "a" older than "b", then touch it so "b" becomes the LRU entry
+        os.utime(cache._path("a" * 64), (1, 1))
+        os.utime(cache._path("b" * 64), (2, 2))
+        cache.get("a" * 64)
+
+        cache.put("c" * 64, PLAN)
+
+        assert cache.get("b" * 64) is None
+        assert cache.get("a" * 64) == PLAN
+        assert cache.get("c" * 64) == PLAN
+
+    def test_eviction_by_byte_budget(self, tmp_path):
+        """Test that the byte budget bounds the total cache size."""
+        cache = PlanCache(tmp_path, max_bytes=300)
+        big = {"plan_text": "x" * 200, "events": []}
+        cache.put("a" * 64, big)
+        os.utime(cache._path("a" * 64), (1, 1))
+        cache.put("b" * 64, big)
+
+        assert cache.get("a" * 64) is None
+        assert cache.get("b" * 64) == big
+
+
+class TestWorkflowPlanCache:
+    """Test the plan cache wired into OpenCodeWorkflowPoC.phase1_planning."""
+
+    @pytest.fixture
+    def poc(self, tmp_path):
+        project = tmp_path / "project"
+        project.mkdir()
+        (project / "main.py").write_text("print('hi')\n")
+        return load_workflow_class()(
+            project,
+            opencode_cmd=FAKE_OPENCODE,
+            plan_cache=PlanCache(tmp_path / "cache"),
+            plan_store=PlanStore(tmp_path / "plans"),
+            session_index=SessionIndex(tmp_path / "sessions.db"),
+        )
+
+    def test_second_plan_is_served_from_cache(self, poc, monkeypatch):
+        """Test that re-planning the same task skips the opencode call."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = poc.phase1_planning("add numbers")
+            # A failing opencode proves the second plan never spawns it
+            monkeypatch.setenv("FAKE_OPENCODE_EXIT", "1")
+            second = poc.phase1_planning("add numbers")
+
+        assert second["plan_text"] == first["plan_text"]
+        assert second["events"] == first["events"]
+        assert poc.plan_cache.stats()["hits"] == 1
+
+    def test_project_change_invalidates_plan(self, poc):
+        """Test that editing the project forces a fresh planning call."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            poc.phase1_planning("add numbers")
+            (poc.project_dir / "new.py").write_text("y = 2\n")
+            poc.phase1_planning("add numbers")
+
+        assert poc.plan_cache.stats() == {"hits": 0, "misses": 2, "evictions": 0}
@@ -0,0 +1,132 @@
+"""
+Tests for the append-only, crash-safe plan store.
+"""
+
+import multiprocessing
+
+import pytest
+
+from opencode_workflow.models import TextEvent
+from opencode_workflow.plan_store import PlanStore
+
+
+def _writer(root, worker, count):
+    store = PlanStore(root)
+    for i in range(count):
+        store.put({"task_id": f"w{worker}-{i}", "plan_text": "x" * (i * 37 % 500)})
+
+
+class TestPlanStore:
+    """Test suite for PlanStore."""
+
+    def test_put_and_get(self, tmp_path):
+        """Test that a record can be read back by task id."""
+        store = PlanStore(tmp_path)
+        store.put({"task_id": "t1", "plan_text": "plan", "events": [TextEvent("plan", "ses_1")]})
+
+        record = store.get("t1")
+
+        assert record["plan_text"] == "plan"
+        assert record["events"] == [{"type": "text", "sessionID": "ses_1", "part": {"text": "plan"}}]
+        assert "created_at" in record
+        assert store.get("missing") is None
+
+    def test_latest_version_wins(self, tmp_path):
+        """Test that re-putting a task id returns the newest record."""
+        store = PlanStore(tmp_path)
+        store.put({"task_id": "t1", "plan_text": "v1"})
+        store.put({"task_id": "t1", "plan_text": "v2"})
+
+        assert store.get("t1")["plan_text"] == "v2"
+        assert len(store) == 1
+        assert [r["plan_text"] for r in store.iter_records()] == ["v1", "v2"]
+
+    def test_other_instances_see_new_records(self, tmp_path):
+        """Test that a reader picks up records appended by another writer."""
+        reader = PlanStore(tmp_path)
+        assert reader.get("t1") is None
+
+        PlanStore(tmp_path).put({"task_id": "t1", "plan_text": "plan"})
+
+        assert reader.get("t1")["plan_text"] == "plan"
+        assert "t1" in reader
+
+    def test_reader_sees_newer_version_from_other_writer(self, tmp_path):
+        """Test that last write wins even for a task id the reader has already indexed."""
+        reader = PlanStore(tmp_path)
+        reader.put({"task_id": "t1", "plan_text": "v1"})
+        assert reader.get("t1")["plan_text"] == "v1"
+
+        PlanStore(tmp_path).put({"task_id": "t1", "plan_text": "v2"})
+
+        assert reader.get("t1")["plan_text"] == "v2"
+
+    def test_reader_follows_index_rebuilt_by_other_process(self, tmp_path):
+        """Test that a replaced index file is re-read from the start."""
+        writer = PlanStore(tmp_path)
+        for i in range(5):
+            writer.put({"task_id": f"task-{i}", "plan_text": str(i)})
+        reader = PlanStore(tmp_path)
+        assert len(reader) == 5
+
+        writer.index_path.unlink()
+        writer.put({"task_id": "t5", "plan_text": "5"})
+        assert reader.get("t5")["plan_text"] == "5"  # shorter index than already read
+        PlanStore(tmp_path).rebuild_index()
+
+        assert len(reader) == 6
+        assert reader.get("task-3")["plan_text"] == "3"
+        assert reader.get("t5")["plan_text"] == "5"
+
+    @pytest.mark.parametrize("task_id", ["", "a\tb", "a\nb"])
+    def test_invalid_task_id(self, tmp_path, task_id):
+        """Test that task ids that would corrupt the index are rejected."""
+        with pytest.raises(ValueError):
+            PlanStore(tmp_path).put({"task_id": task_id})
+
+    def test_torn_tail_is_discarded_on_next_write(self, tmp_path):
+        """Test that a half-written record left by a crash is truncated."""
+        store = PlanStore(tmp_path)
+        store.put({"task_id": "t1", "plan_text": "ok"})
+        with open(store.data_path, "ab") as f:
+            f.write(b'{"task_id":"t2","plan_te')
+        with open(store.index_path, "ab") as f:
+            f.write(b"t2\t99")
+
+        store.put({"task_id": "t3", "plan_text": "after crash"})
+        fresh = PlanStore(tmp_path)
+
+        assert fresh.get("t1")["plan_text"] == "ok"
+        assert fresh.get("t2") is None
+        assert fresh.get("t3")["plan_text"] == "after crash"
+        assert [r["task_id"] for r in fresh.iter_records()] == ["t1", "t3"]
+
+    def test_rebuild_index(self, tmp_path):
+        """Test that a lost index is rebuilt from the data file."""
+        store = PlanStore(tmp_path)
+        for i in range(5):
+            store.put({"task_id": f"t{i}", "plan_text": str(i)})
+        store.index_path.unlink()
+
+        fresh = PlanStore(tmp_path)
+        assert fresh.get("t3") is None
+        assert fresh.rebuild_index() == 5
+        assert fresh.get("t3")["plan_text"] == "3"
+
+    def test_concurrent_writers(self, tmp_path):
+        """Test that many processes can append to one store without loss."""
+        workers, per_worker = 4, 25
+        context = multiprocessing.get_context("fork")
+        processes = [context.Process(target=_writer, args=(tmp_path, w, per_worker)) for w in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+
+        store = PlanStore(tmp_path)
+
+        assert len(store) == workers * per_worker
+        for w in range(workers):
+            for i in range(per_worker):
+                assert store.get(f"w{w}-{i}")["plan_text"] == "x" * (i * 37 % 500)
@@ -0,0 +1,106 @@
+"""
+Tests for recording and replaying OpenCode event streams.
+"""
+
+import contextlib
+import gzip
+import io
+import json
+import time
+
+import pytest
+
+from opencode_workflow.bench_async import FAKE_OPENCODE, load_workflow_class
+from opencode_workflow.drivers import CLIDriver, ReplayDriver
+from opencode_workflow.models import TextEvent
+from opencode_workflow.plan_store import PlanStore
+from opencode_workflow.recording import Recording, StreamRecorder
+from opencode_workflow.session_index import SessionIndex
+
+
+def write_recording(path, lines, offsets, returncode=0, agent="plan"):
+    recorder = StreamRecorder(path, {"agent": agent})
+    for offset, line in zip(offsets, lines):
+        recorder.write(offset, line)
+    return recorder.finish(returncode, "boom" if returncode else "")
+
+
+class TestRecording:
+    """Test suite for StreamRecorder and Recording."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that lines, offsets and the exit status survive a round trip."""
+        lines = ['{"type": "text", "part": {"text": "a"}}\n', "not json\n"]
+        path = write_recording(tmp_path / "r.jsonl.gz", lines, [0.01, 0.02], returncode=3)
+
+        recording = Recording(path)
+
+        assert list(recording.iter_entries()) == [(0.01, lines[0]), (0.02, lines[1])]
+        assert (recording.returncode, recording.stderr, recording.lines, recording.agent) == (3, "boom", 2, "plan")
+        assert json.loads(gzip.open(path, "rt").readline())["format"] == "opencode-recording"
+        assert [p.name for p in tmp_path.iterdir()] == ["r.jsonl.gz"]
+
+    def test_rejects_foreign_files(self, tmp_path):
+        """Test that arbitrary gzip JSONL is not accepted as a recording."""
+        path = tmp_path / "other.jsonl.gz"
+        with gzip.open(path, "wt") as f:
+            f.write('{"hello": 1}\n')
+
+        with pytest.raises(ValueError):
+            Recording(path)
+
+    def test_original_timing_and_max_speed(self, tmp_path):
+        """Test that speed=1.0 honours offsets and speed=None does not wait."""
+        path = write_recording(tmp_path / "r.jsonl.gz", ["a\n", "b\n"], [0.0, 0.2])
+        recording = Recording(path)
+
+        started = time.perf_counter()
+        assert list(recording.iter_lines()) == ["a\n", "b\n"]
+        fast = time.perf_counter() - started
+
+        started = time.perf_counter()
+        list(recording.iter_lines(speed=1.0))
+        timed = time.perf_counter() - started
+
+        assert fast < 0.1
+        assert timed >= 0.2
+
+
+class TestRecordAndReplay:
+    """Test recording a live workflow and replaying it offline."""
+
+    def run_workflow(self, tmp_path, driver):
+        poc = load_workflow_class()(
+            tmp_path,
+            driver=driver,
+            plan_store=PlanStore(tmp_path / "plans"),
+            session_index=SessionIndex(tmp_path / "sessions.db"),
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            plan = poc.phase1_planning("add numbers")
+            assert poc.phase3_execution(plan)
+        return plan, poc
+
+    def test_recorded_workflow_replays_identically(self, tmp_path):
+        """Test that a replayed run yields the same plan and token counts."""
+        fixtures = tmp_path / "fixtures"
+        recorded_plan, recorded = self.run_workflow(tmp_path, CLIDriver(FAKE_OPENCODE, cwd=tmp_path, record_dir=fixtures))
+
+        replay = ReplayDriver.from_recordings(fixtures)
+        replayed_plan, replayed = self.run_workflow(tmp_path, replay)
+
+        assert len(list(fixtures.iterdir())) == 2
+        assert replayed_plan["plan_text"] == recorded_plan["plan_text"]
+        assert replayed_plan["session_id"] == recorded_plan["session_id"]
+        assert replayed.metrics.tokens_by_phase() == recorded.metrics.tokens_by_phase()
+
+    def test_invalid_lines_reach_on_invalid(self, tmp_path):
+        """Test that replay parses raw lines, including malformed ones."""
+        path = write_recording(tmp_path / "r.jsonl.gz", ['{"type": "text", "part": {"text": "a"}}\n', "oops\n"], [0, 0])
+        invalid = []
+
+        with ReplayDriver.from_recordings(path).run("plan", "x", on_invalid=invalid.append) as stream:
+            events = list(stream)
+
+        assert [event.text for event in events if isinstance(event, TextEvent)] == ["a"]
+        assert invalid == ["oops\n"]
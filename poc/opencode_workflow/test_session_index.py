@@ -0,0 +1,167 @@
+"""
+Tests for the local session index.
+"""
+
+import contextlib
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from opencode_workflow.bench_async import FAKE_OPENCODE, load_workflow_class
+from opencode_workflow.plan_store import PlanStore
+from opencode_workflow.session_index import SessionIndex, iter_json_array
+
+
+def session(index, updated_ms, agent=None):
+    data = {"id": f"ses_{index:04d}", "title": f"session {index}", "time": {"created": updated_ms, "updated": updated_ms}}
+    if agent:
+        data["agent"] = agent
+    return data
+
+
+class TinyChunkReader(io.StringIO):
+    """StringIO that returns at most a few characters per read, to split tokens."""
+
+    def read(self, size=-1):
+        return super().read(3)
+
+
+class TestIterJsonArray:
+    """Test suite for iter_json_array."""
+
+    def test_yields_items_across_chunk_boundaries(self):
+        """Test that items split across reads are decoded correctly."""
+        payload = json.dumps([{"id": "a", "n": 12345}, 67890, "text", [1, 2]])
+
+        assert list(iter_json_array(TinyChunkReader(payload))) == [{"id": "a", "n": 12345}, 67890, "text", [1, 2]]
+
+    def test_empty_array(self):
+        """Test that an empty array yields nothing."""
+        assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+    def test_is_lazy(self):
+        """Test that the first item is available before the array is complete."""
+        stream = io.StringIO('[{"id": "a"}, {"id": "b"}')
+        items = iter_json_array(stream, chunk_size=16)
+
+        assert next(items) == {"id": "a"}
+
+    @pytest.mark.parametrize("payload", ['{"id": "a"}', '[{"id": "a"}', "[{bad}]"])
+    def test_rejects_invalid_input(self, payload):
+        """Test that non-arrays, truncated and malformed input raise ValueError."""
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(payload)))
+
+
+class TestSessionIndex:
+    """Test suite for SessionIndex."""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        with SessionIndex(tmp_path / "sessions.db") as index:
+            yield index
+
+    def test_sync_is_incremental(self, index):
+        """Test that unchanged sessions are skipped on re-sync."""
+        sessions = [session(i, 1_700_000_000_000 + i) for i in range(10)]
+
+        assert index.sync(sessions) == 10
+        assert index.sync(sessions) == 0
+
+        sessions[3]["time"]["updated"] += 5000
+        sessions[3]["title"] = "renamed"
+
+        assert index.sync(sessions) == 1
+        assert index.get("ses_0003").title == "renamed"
+        assert index.count() == 10
+
+    def test_timestamps_are_converted_to_seconds(self, index):
+        """Test that millisecond timestamps are stored as seconds."""
+        index.sync([session(1, 1_700_000_000_000)])
+
+        assert index.get("ses_0001").updated == 1_700_000_000.0
+
+    def test_pagination_walks_all_sessions_newest_first(self, index):
+        """Test that cursor pagination covers every session exactly once."""
+        # Pairs of sessions share a timestamp so the id tiebreaker is exercised
+        index.sync([session(i, 1_700_000_000_000 + (i // 2) * 1000) for i in range(25)])
+
+        seen = []
+        cursor = None
+        while True:
+            page = index.query(limit=7, cursor=cursor)
+            seen.extend(s.id for s in page.items)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert len(seen) == 25
+        assert len(set(seen)) == 25
+        assert seen[0] == "ses_0024"
+        assert seen == [s.id for s in index.query(limit=100).items]
+
+    def test_filter_by_agent_and_date(self, index):
+        """Test filtering by agent and by an updated-time window."""
+        base = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+        day = 86_400_000
+        index.sync([
+            session(1, base, agent="plan"),
+            session(2, base + day, agent="build"),
+            session(3, base + 2 * day, agent="plan"),
+        ])
+
+        assert [s.id for s in index.query(agent="plan").items] == ["ses_0003", "ses_0001"]
+        window = index.query(since=datetime(2026, 1, 2, tzinfo=timezone.utc), until=base / 1000 + 2 * 86400)
+        assert [s.id for s in window.items] == ["ses_0002"]
+
+    def test_latest_for_task(self, index):
+        """Test that the most recently recorded session is returned for a task."""
+        index.record_task("task-1", "ses_plan", agent="plan")
+        index.record_task("task-1", "ses_build", agent="build")
+
+        assert index.latest_for_task("task-1") == "ses_build"
+        assert index.latest_for_task("unknown") is None
+        assert [s.id for s in index.query(agent="build").items] == ["ses_build"]
+
+    def test_sync_keeps_agent_recorded_by_workflow(self, index):
+        """Test that session list data does not erase a known agent."""
+        index.record_task("task-1", "ses_0001", agent="plan")
+        index.sync([session(1, 1_700_000_000_000)])
+
+        assert index.get("ses_0001").agent == "plan"
+        assert index.get("ses_0001").title == "session 1"
+
+    def test_sync_replaces_placeholder_created_time(self, index):
+        """Test that session list data overwrites the creation time of a record_task placeholder."""
+        index.record_task("task-1", "ses_0001", agent="plan")
+        index.record_task("task-1", "ses_0002", agent="build")
+        placeholder = index.get("ses_0002").created
+        index.sync([session(1, 1_700_000_000_000), {"id": "ses_0002", "time": {"updated": 1_700_000_000_000}}])
+
+        assert index.get("ses_0001").created == 1_700_000_000.0
+        # A listing without a creation time keeps the one already stored
+        assert index.get("ses_0002").created == placeholder
+
+
+class TestWorkflowSessionListing:
+    """Test phase4_persistence_test against fake opencode output."""
+
+    def test_phase4_indexes_session_list(self, tmp_path, monkeypatch):
+        """Test that phase 4 streams the session list into the index."""
+        sessions_file = tmp_path / "sessions.json"
+        sessions_file.write_text(json.dumps([session(i, 1_700_000_000_000 + i) for i in range(50)]))
+        monkeypatch.setenv("FAKE_OPENCODE_SESSIONS", str(sessions_file))
+        index = SessionIndex(tmp_path / "sessions.db")
+        poc = load_workflow_class()(
+            tmp_path, opencode_cmd=FAKE_OPENCODE, plan_store=PlanStore(tmp_path / "plans"), session_index=index
+        )
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            assert poc.phase4_persistence_test()
+
+        assert index.count() == 50
+        assert "ses_0049" in output.getvalue()
+        assert "本次新增/更新 50" in output.getvalue()
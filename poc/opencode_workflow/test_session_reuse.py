@@ -0,0 +1,83 @@
+"""
+Tests for continuing the planning session during execution.
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from opencode_workflow.bench_async import FAKE_OPENCODE, load_workflow_class
+from opencode_workflow.plan_cache import PlanCache
+from opencode_workflow.plan_store import PlanStore
+from opencode_workflow.session_index import SessionIndex
+
+
+@pytest.fixture
+def make_poc(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_OPENCODE_STATE", str(tmp_path / "state"))
+    monkeypatch.setenv("FAKE_OPENCODE_TEXT_CHARS", "400")
+    monkeypatch.setenv("FAKE_OPENCODE_DELAY", "0")
+
+    # 项目目录与 state/plans 分开，使计划缓存的项目指纹保持不变
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+
+    def make(reuse_session, plan_cache=None):
+        return load_workflow_class()(
+            project_dir,
+            opencode_cmd=FAKE_OPENCODE,
+            plan_cache=plan_cache,
+            plan_store=PlanStore(tmp_path / f"plans-{reuse_session}"),
+            session_index=SessionIndex(tmp_path / f"sessions-{reuse_session}.db"),
+            reuse_session=reuse_session,
+        )
+
+    return make
+
+
+def plan_and_execute(poc):
+    with contextlib.redirect_stdout(io.StringIO()):
+        plan = poc.phase1_planning("add numbers")
+        poc.phase3_execution(plan)
+    return plan
+
+
+class TestSessionReuse:
+    """Test suite for the reuse_session option of OpenCodeWorkflowPoC."""
+
+    def test_execution_continues_planning_session(self, make_poc):
+        """Test that execution runs in the session created by planning."""
+        poc = make_poc(True)
+        plan = plan_and_execute(poc)
+
+        assert plan["session_id"].startswith("ses_fake_")
+        assert poc.session_id == plan["session_id"]
+        assert poc.session_index.latest_for_task(plan["task_id"]) == plan["session_id"]
+
+    def test_reuse_sends_fewer_input_tokens(self, make_poc):
+        """Test that continuing the session avoids re-sending the plan."""
+        fresh, reused = make_poc(False), make_poc(True)
+        fresh_plan = plan_and_execute(fresh)
+        plan_and_execute(reused)
+
+        fresh_usage = fresh.metrics.tokens_by_phase()["execute"]
+        reused_usage = reused.metrics.tokens_by_phase()["execute"]
+
+        assert fresh.session_id != fresh_plan["session_id"]
+        assert reused_usage.input < fresh_usage.input / 10
+        assert reused_usage.cache_read > 0
+        assert reused.metrics.first_output_latency["execute"].count == 1
+
+    def test_cached_plan_does_not_continue_old_session(self, make_poc, tmp_path):
+        """Test that a plan cache hit executes in a new session with the plan pasted in."""
+        poc = make_poc(True, plan_cache=PlanCache(tmp_path / "plan-cache"))
+        first = plan_and_execute(poc)
+        second = plan_and_execute(poc)
+
+        assert poc.plan_cache.hits == 1
+        assert second["session_id"] is None
+        assert poc.session_id not in (None, first["session_id"])
+        # The plan is re-sent, so the second execution costs more input than the continued first one
+        executions = [usage for (task, phase), usage in poc.metrics.tokens.items() if phase == "execute"]
+        assert executions[1].input > executions[0].input